@@ -1,14 +1,18 @@
 from pathlib import Path
 
 from flask import Flask, jsonify, send_from_directory
+from sqlalchemy.exc import SQLAlchemyError
 
 from backend import models  # noqa: F401
 from backend.config import Config
-from backend.extensions import bcrypt, cors, db
+from backend.extensions import bcrypt, cors, db, milvus
 from backend.routes.auth import auth_bp
 from backend.routes.jobs import jobs_bp
 from backend.routes.applications import applications_bp
 from backend.routes.matching import matching_bp
+from backend.services.embedding_service import backend_status, preload, start_warmup
+from backend.services.embedding_worker import embedding_worker
+from backend.services.vector_index import get_vector_index, search_cache_stats
 
 
 def create_app(config_class: type[Config] = Config) -> Flask:
@@ -18,9 +22,29 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
     db.init_app(app)
     bcrypt.init_app(app)
+    milvus.init_app(app)
+    embedding_worker.init_app(app)
 
     with app.app_context():
         db.create_all()
+        if app.config.get("VECTOR_INDEX_PRELOAD"):
+            # Builds the in-process index from stored embeddings when Milvus is absent.
+            try:
+                get_vector_index()
+            except SQLAlchemyError:
+                # Usually a database that predates new columns; the index loads on first use.
+                db.session.rollback()
+                app.logger.exception(
+                    "Vector index preload failed; run `python -m backend.scripts.migrate_embeddings` "
+                    "if the database schema is out of date"
+                )
+
+    # The IVF_PQ check needs the embedding dimension unless MILVUS_DIMENSION is set.
+    if app.config.get("EMBEDDING_PRELOAD"):
+        preload(app)
+        milvus.check_dimension(app, backend_status()["dimension"])
+    elif app.config.get("EMBEDDING_WARMUP"):
+        start_warmup(app, on_ready=lambda backend: milvus.check_dimension(app, backend.dimension))
 
     app.register_blueprint(auth_bp, url_prefix=f"{app.config['API_PREFIX']}/auth")
     app.register_blueprint(jobs_bp, url_prefix=f"{app.config['API_PREFIX']}/jobs")
@@ -39,7 +63,13 @@ def create_app(config_class: type[Config] = Config) -> Flask:
 
     @app.get("/api/v1/health")
     def health() -> tuple[dict, int]:
-        return jsonify({"status": "ok"}), 200
+        # Report 503 while the model loads so the load balancer skips cold workers.
+        embedding = backend_status()
+        if embedding["status"] == "loading":
+            return jsonify({"status": "warming", "embedding": embedding}), 503
+        return jsonify(
+            {"status": "ok", "embedding": embedding, "searchCache": search_cache_stats()}
+        ), 200
 
     return app
 
@@ -30,9 +30,74 @@ class Config:
     MILVUS_URI = os.environ.get('MILVUS_URI') or ZILLIZ_URI
     MILVUS_TOKEN = os.environ.get('MILVUS_TOKEN') or ZILLIZ_TOKEN
     MILVUS_COLLECTION = os.environ.get('MILVUS_COLLECTION') or ZILLIZ_COLLECTION
+    # Partition-key buckets for new collections; jobs are routed by their state field
+    MILVUS_NUM_PARTITIONS = int(os.environ.get('MILVUS_NUM_PARTITIONS', 64))
+    # Vector size of new collections; 0 uses the embedding backend's dimension
+    MILVUS_DIMENSION = int(os.environ.get('MILVUS_DIMENSION', 0))
+    # FLAT, IVF_FLAT, IVF_SQ8, IVF_PQ or HNSW, with JSON build/search params, e.g. '{"nlist": 1024}'
+    MILVUS_INDEX_TYPE = os.environ.get('MILVUS_INDEX_TYPE', 'IVF_FLAT')
+    MILVUS_INDEX_PARAMS = os.environ.get('MILVUS_INDEX_PARAMS', '{}')
+    MILVUS_SEARCH_PARAMS = os.environ.get('MILVUS_SEARCH_PARAMS', '{}')
+    # auto: Milvus when it has a collection, else the in-process index; or milvus/local
+    VECTOR_INDEX = os.environ.get('VECTOR_INDEX', 'auto')
+    VECTOR_INDEX_PRELOAD = os.environ.get('VECTOR_INDEX_PRELOAD', 'true').lower() == 'true'
+    VECTOR_INDEX_SYNC_SECONDS = float(os.environ.get('VECTOR_INDEX_SYNC_SECONDS', 30))
+    # Buffered vector upserts are sent in batches of this many rows, or after this many seconds
+    VECTOR_WRITE_BATCH_SIZE = int(os.environ.get('VECTOR_WRITE_BATCH_SIZE', 500))
+    VECTOR_WRITE_MAX_DELAY = float(os.environ.get('VECTOR_WRITE_MAX_DELAY', 2.0))
+    # A failed batch is re-buffered and retried after this many seconds, doubling per failure
+    VECTOR_WRITE_RETRY_DELAY = float(os.environ.get('VECTOR_WRITE_RETRY_DELAY', 1.0))
+    # Repeat searches are answered from a TTL + LRU result cache; a size of 0 disables it
+    VECTOR_SEARCH_CACHE_SIZE = int(os.environ.get('VECTOR_SEARCH_CACHE_SIZE', 10000))
+    VECTOR_SEARCH_CACHE_TTL = float(os.environ.get('VECTOR_SEARCH_CACHE_TTL', 60))
+    # Recommendations fetch this multiple of the requested limit, so jobs deleted
+    # after they were indexed do not leave the page short
+    VECTOR_SEARCH_OVERFETCH = float(os.environ.get('VECTOR_SEARCH_OVERFETCH', 1.5))
+    # In-process index: exact (brute force) or hnsw (hnswlib graph, snapshotted to disk;
+    # falls back to exact when hnswlib is not installed)
+    VECTOR_INDEX_LOCAL = os.environ.get('VECTOR_INDEX_LOCAL', 'exact')
+    # Keep one local index per job state so candidates search their state plus national jobs
+    VECTOR_INDEX_PARTITION_BY_STATE = os.environ.get('VECTOR_INDEX_PARTITION_BY_STATE', 'true').lower() == 'true'
+    VECTOR_INDEX_HNSW_M = int(os.environ.get('VECTOR_INDEX_HNSW_M', 16))
+    VECTOR_INDEX_HNSW_EF_CONSTRUCTION = int(os.environ.get('VECTOR_INDEX_HNSW_EF_CONSTRUCTION', 200))
+    VECTOR_INDEX_HNSW_EF_SEARCH = int(os.environ.get('VECTOR_INDEX_HNSW_EF_SEARCH', 64))
+    # Rebuild an HNSW graph once deleted nodes exceed this share of it
+    VECTOR_INDEX_COMPACT_RATIO = float(os.environ.get('VECTOR_INDEX_COMPACT_RATIO', 0.2))
+    VECTOR_INDEX_SNAPSHOT_PATH = os.environ.get('VECTOR_INDEX_SNAPSHOT_PATH', os.path.join(
+        os.path.dirname(__file__), 'instance', 'vector_index'))
     
     # Embedding model settings
     EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    # One of: sbert, onnx (int8-quantized, see scripts/export_onnx_model.py), hashing
+    EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'sbert')
+    EMBEDDING_ONNX_PATH = os.environ.get('EMBEDDING_ONNX_PATH', os.path.join(
+        os.path.abspath(os.path.dirname(__file__)), 'instance', 'onnx-model'))
+    EMBEDDING_ONNX_THREADS = int(os.environ.get('EMBEDDING_ONNX_THREADS', 0))
+    EMBEDDING_MAX_SEQ_LENGTH = int(os.environ.get('EMBEDDING_MAX_SEQ_LENGTH', 256))
+    EMBEDDING_HASH_DIM = int(os.environ.get('EMBEDDING_HASH_DIM', 384))
+    # Long resumes/descriptions are split into token windows and pooled (mean or max)
+    EMBEDDING_CHUNK_TOKENS = int(os.environ.get('EMBEDDING_CHUNK_TOKENS', EMBEDDING_MAX_SEQ_LENGTH - 2))
+    EMBEDDING_CHUNK_OVERLAP = int(os.environ.get('EMBEDDING_CHUNK_OVERLAP', 50))
+    EMBEDDING_MAX_DOCUMENT_TOKENS = int(os.environ.get('EMBEDDING_MAX_DOCUMENT_TOKENS', 2048))
+    EMBEDDING_POOLING = os.environ.get('EMBEDDING_POOLING', 'mean')
+    # Load the embedding model on a background thread when the app starts
+    EMBEDDING_WARMUP = os.environ.get('EMBEDDING_WARMUP', 'true').lower() == 'true'
+    # Load the model before fork so gunicorn --preload workers share its pages
+    EMBEDDING_PRELOAD = os.environ.get('EMBEDDING_PRELOAD', 'false').lower() == 'true'
+    # Unix socket of a shared embedding server (python -m backend.scripts.embedding_server)
+    EMBEDDING_SERVER_SOCKET = os.environ.get('EMBEDDING_SERVER_SOCKET')
+    EMBEDDING_SERVER_MAX_WAIT_MS = float(os.environ.get('EMBEDDING_SERVER_MAX_WAIT_MS', 5))
+    EMBEDDING_BATCH_SIZE = int(os.environ.get('EMBEDDING_BATCH_SIZE', 64))
+    # Seconds before a backend that failed to load is tried again
+    EMBEDDING_BACKEND_RETRY_SECONDS = float(os.environ.get('EMBEDDING_BACKEND_RETRY_SECONDS', 30))
+    # Set EMBEDDING_CACHE_PATH to an empty string to disable the on-disk cache
+    EMBEDDING_CACHE_PATH = os.environ.get('EMBEDDING_CACHE_PATH', os.path.join(
+        os.path.abspath(os.path.dirname(__file__)), 'instance', 'embedding_cache.sqlite'))
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', 200000))
+    # Embed job/user writes on background threads instead of inside the request
+    EMBEDDING_ASYNC = os.environ.get('EMBEDDING_ASYNC', 'true').lower() == 'true'
+    EMBEDDING_WORKERS = int(os.environ.get('EMBEDDING_WORKERS', 1))
+    EMBEDDING_QUEUE_SIZE = int(os.environ.get('EMBEDDING_QUEUE_SIZE', 1000))
     
     # Application settings
     DEBUG = os.environ.get('FLASK_ENV') == 'development'
@@ -46,6 +111,12 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    EMBEDDING_CACHE_PATH = ''
+    EMBEDDING_ASYNC = False
+    EMBEDDING_BACKEND = 'hashing'
+    EMBEDDING_WARMUP = False
+    VECTOR_INDEX = 'local'
+    VECTOR_WRITE_BATCH_SIZE = 1
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -2,6 +2,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 
+from backend.services.milvus_client import Milvus
+
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 cors = CORS()
+milvus = Milvus()
@@ -0,0 +1,5 @@
+import os
+
+# With EMBEDDING_PRELOAD=true, create_app() loads the embedding model in the
+# master process and the forked workers share its pages copy-on-write.
+preload_app = os.environ.get("EMBEDDING_PRELOAD", "false").lower() == "true"
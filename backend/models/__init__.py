@@ -2,8 +2,9 @@ from backend.models.application import Application
 from backend.models.job import Job
 from backend.models.user import User
 from backend.models.audit_log import AllocationAudit
+from backend.models.job_quota_counter import JobQuotaCounter
 
-__all__ = ["User", "Job", "Application", "AllocationAudit"]
+__all__ = ["User", "Job", "Application", "AllocationAudit", "JobQuotaCounter"]
 
 
 
@@ -11,6 +11,9 @@ class Application(BaseModel):
     match_score = db.Column(db.Float)
     justification = db.Column(db.Text)
     match_metadata = db.Column("metadata", db.JSON, default=dict)
+    # Category counted in job_quota_counters while matched/selected, so a later
+    # change to the candidate's social_category decrements the right counter.
+    quota_category = db.Column(db.String(60))
 
     __table_args__ = (db.UniqueConstraint("user_id", "job_id", name="uq_user_job"),)
 
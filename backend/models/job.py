@@ -1,5 +1,6 @@
 from backend.extensions import db
 from backend.models.base import BaseModel
+from backend.models.types import Float32Vector
 
 
 class Job(BaseModel):
@@ -21,7 +22,13 @@ class Job(BaseModel):
     salary = db.Column(db.String(50))
     application_deadline = db.Column(db.DateTime)
     vector_id = db.Column(db.String(64))
-    embedding = db.Column(db.PickleType)
+    # Deferred so listing queries do not fetch vector blobs they never read.
+    embedding = db.deferred(db.Column(Float32Vector))
+    embedding_status = db.Column(db.String(20))
+    embedding_fingerprint = db.Column(db.String(64))
+    # Normalized reservation targets, valid while the version matches reservation_targets.json.
+    quota_targets = db.Column(db.JSON)
+    quota_targets_version = db.Column(db.String(16))
 
     applications = db.relationship("Application", backref="job", lazy=True)
 
@@ -0,0 +1,15 @@
+from backend.extensions import db
+
+
+class JobQuotaCounter(db.Model):
+    """Matched/selected applications per job and social category.
+
+    Kept in step with ``Application.status`` by ``QuotaService`` so quota
+    lookups read a few rows instead of counting applications.
+    """
+
+    __tablename__ = "job_quota_counters"
+
+    job_id = db.Column(db.String(36), primary_key=True)
+    category = db.Column(db.String(60), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
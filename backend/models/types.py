@@ -0,0 +1,28 @@
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class Float32Vector(TypeDecorator):
+    """Vector stored as raw little-endian float32 bytes.
+
+    Values load as a read-only ``np.ndarray`` viewing the fetched bytes (no
+    per-element boxing or copy). Lists and arrays are accepted on write.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        array = np.asarray(value, dtype="<f4")
+        if not array.size:
+            return None
+        return array.tobytes()
+
+    def process_result_value(self, value, dialect) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype="<f4")
@@ -1,5 +1,6 @@
 from backend.extensions import db
 from backend.models.base import BaseModel
+from backend.models.types import Float32Vector
 
 
 class User(BaseModel):
@@ -19,7 +20,9 @@ class User(BaseModel):
     resume_url = db.Column(db.String(255))
     avatar_url = db.Column(db.String(255))
     vector_id = db.Column(db.String(64))
-    embedding = db.Column(db.PickleType)
+    # Deferred so listing queries do not fetch vector blobs they never read.
+    embedding = db.deferred(db.Column(Float32Vector))
+    embedding_status = db.Column(db.String(20))
 
     jobs = db.relationship("Job", backref="employer", lazy=True)
     applications = db.relationship("Application", backref="candidate", lazy=True)
@@ -4,7 +4,9 @@ from pydantic import ValidationError
 from backend.extensions import db
 from backend.models import Application, Job
 from backend.schemas.application import ApplicationCreate
+from backend.services.embedding_worker import embedding_worker
 from backend.services.matching_service import MatchingService
+from backend.services.quota_service import quota_service
 from backend.utils.decorators import token_required
 from backend.utils.responses import error_response, success_response
 
@@ -97,8 +99,13 @@ def update_application_status(application_id: str):
     )
     if not application:
         return error_response("Application not found", 404)
+    previous = application.status
     application.status = status
+    moved = quota_service.record_status_change(application, previous)
     db.session.commit()
+    if moved:
+        # capacity_open in the job's vector metadata depends on the counters.
+        embedding_worker.submit("job", application.job_id)
     return success_response({"application": application.to_dict()})
 
 
@@ -6,7 +6,8 @@ from pydantic import ValidationError
 from backend.extensions import bcrypt, db
 from backend.models import User
 from backend.schemas.auth import LoginSchema, RegisterSchema, UpdateUserSchema
-from backend.services.embedding_service import encode_text
+from backend.services.embedding_service import user_embedding_text
+from backend.services.embedding_worker import EMBEDDING_PENDING, embedding_worker
 from backend.utils.decorators import token_required
 from backend.utils.jwt import create_token
 from backend.utils.responses import error_response, success_response
@@ -64,13 +65,14 @@ def register():
         user.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
         if request_data.get("resumeText"):
             user.resume_text = request_data["resumeText"]
-            user.embedding = encode_text(request_data["resumeText"])
-        elif request_data.get("skills"):
-            combined = " ".join(request_data["skills"])
-            user.embedding = encode_text(combined)
+        queued = bool(user_embedding_text(user))
+        if queued:
+            user.embedding_status = EMBEDDING_PENDING
 
         db.session.add(user)
         db.session.commit()
+        if queued:
+            embedding_worker.submit("user", user.id)
         return success_response(_user_payload(user), 201)
     except Exception as e:
         db.session.rollback()
@@ -140,13 +142,17 @@ def update_user():
         user.skills = updates["skills"] if updates["skills"] else []
     if "preferences" in updates:
         user.preferences = updates["preferences"] if updates["preferences"] else {}
+    queued = False
     if updates.get("resumeText"):
         user.resume_text = updates["resumeText"]
-        user.embedding = encode_text(updates["resumeText"])
+        user.embedding_status = EMBEDDING_PENDING
+        queued = True
     if updates.get("avatar"):
         user.avatar_url = updates["avatar"]
 
     db.session.commit()
+    if queued:
+        embedding_worker.submit("user", user.id)
     return success_response(_user_payload(user))
 
 
@@ -7,8 +7,14 @@ from sqlalchemy import func, or_
 from backend.extensions import db
 from backend.models import Job, Application
 from backend.schemas.job import JobBase
-from backend.services.embedding_service import encode_text
-from backend.services.milvus_client import MilvusClient
+from backend.services.embedding_worker import (
+    EMBEDDING_PENDING,
+    embedding_worker,
+    job_needs_embedding,
+)
+from backend.services.quota_service import quota_service
+from backend.services.vector_filters import job_vector_metadata
+from backend.services.vector_index import get_write_buffer
 from backend.utils.decorators import token_required
 from backend.utils.pagination import paginate
 from backend.utils.responses import error_response, success_response
@@ -54,29 +60,22 @@ def _apply_sort(query, sort):
     return query.order_by(mapping.get(sort, Job.created_at.desc()))
 
 
-def _encode_job(job: Job):
-    text = " ".join(
-        filter(
-            None,
-            [
-                job.position,
-                job.company,
-                job.job_description,
-                " ".join(job.skills_required or []),
-            ],
-        )
-    )
-    vector = encode_text(text)
-    if not vector:
-        return
+def _encode_job(job: Job) -> bool:
+    """Mark ``job`` for background re-embedding; returns ``True`` when queued.
+
+    Jobs whose embedding text is unchanged (status/salary edits) are skipped.
+    """
+    if not job_needs_embedding(job):
+        return False
+    job.embedding_status = EMBEDDING_PENDING
+    return True
+
 
-    job.embedding = vector
-    job.vector_id = job.id
+def _remove_vector(job_id: str) -> None:
     try:
-        client = MilvusClient()
-        client.upsert(job.id, vector, {"jobId": job.id, "company": job.company})
+        get_write_buffer().remove(job_id)
     except Exception:  # noqa: BLE001
-        # Milvus is optional. Continue silently in local dev.
+        # Milvus is optional; reconcile removes vectors left behind.
         pass
 
 
@@ -105,9 +104,12 @@ def create_job():
         salary=payload.salary,
         application_deadline=payload.applicationDeadline,
     )
-    _encode_job(job)
+    quota_service.store_targets(job)
+    queued = _encode_job(job)
     db.session.add(job)
     db.session.commit()
+    if queued:
+        embedding_worker.submit("job", job.id)
     return success_response({"job": job.to_dict()}, 201)
 
 
@@ -184,6 +186,7 @@ def update_job(job_id: str):
     except ValidationError as err:
         return error_response(err.errors(), 422)
 
+    metadata = job_vector_metadata(job)
     job.position = payload.position
     job.company = payload.company
     job.job_location = payload.jobLocation
@@ -198,8 +201,13 @@ def update_job(job_id: str):
     job.tags = payload.tags
     job.salary = payload.salary
     job.application_deadline = payload.applicationDeadline
-    _encode_job(job)
+    quota_service.store_targets(job)
+    queued = _encode_job(job)
     db.session.commit()
+    if queued or job_vector_metadata(job) != metadata:
+        # The worker re-queues an unchanged vector with fresh metadata, or
+        # removes it when the job was closed.
+        embedding_worker.submit("job", job.id)
     return success_response({"job": job.to_dict()})
 
 
@@ -211,6 +219,7 @@ def delete_job(job_id: str):
         return error_response("Job not found", 404)
     db.session.delete(job)
     db.session.commit()
+    _remove_vector(job_id)
     return success_response({"msg": "Job deleted"})
 
 
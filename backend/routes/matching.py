@@ -1,31 +1,105 @@
 from flask import Blueprint, request
 
+from backend.models import User
 from backend.services.audit_service import AuditService
-from backend.services.matching_service import MatchingService
+from backend.services.matching_service import MatchResult, MatchingService
+from backend.services.vector_filters import VectorFilter
 from backend.utils.decorators import token_required
-from backend.utils.responses import success_response
+from backend.utils.responses import error_response, success_response
 
 
 matching_bp = Blueprint("matching", __name__)
 
+MAX_BATCH_USERS = 500
+MAX_BATCH_LIMIT = 500
+
+
+def _filters_from_args(args) -> VectorFilter:
+    def values(name: str) -> list:
+        raw = args.get(name) or []
+        if isinstance(raw, str):
+            raw = raw.split(",")
+        return [value for value in raw if value]
+
+    return VectorFilter.open_now(
+        states=values("state"),
+        city=args.get("city") or None,
+        job_types=values("jobType"),
+        statuses=values("status"),
+        has_capacity=str(args.get("openOnly", "")).lower() == "true",
+    )
+
+
+def _filter_error(data: dict):
+    """Why the JSON filter values in ``data`` are unusable, or None."""
+    for name in ("state", "jobType", "status"):
+        raw = data.get(name)
+        if isinstance(raw, list):
+            raw = [value for value in raw if value]
+        if raw and not isinstance(raw, str) and not (
+            isinstance(raw, list) and all(isinstance(value, str) for value in raw)
+        ):
+            return f"{name} must be a string or a list of strings"
+    if data.get("city") and not isinstance(data["city"], str):
+        return "city must be a string"
+    return None
+
+
+def _serialize(result: MatchResult) -> dict:
+    return {
+        "job": result.job.to_dict(),
+        "score": result.score,
+        "reasons": result.reasons,
+        "diagnostics": result.diagnostics,
+    }
+
 
 @matching_bp.get("/recommendations")
 @token_required("applicant")
 def recommendations():
     limit = int(request.args.get("limit", 10))
     matcher = MatchingService()
-    results = matcher.find_matches(request.user, limit)
+    results = matcher.find_matches(request.user, limit, _filters_from_args(request.args))
     AuditService().log_matches(request.user.id, results)
-    payload = [
+    payload = [_serialize(result) for result in results]
+    return success_response({"recommendations": payload})
+
+
+@matching_bp.post("/recommendations/batch")
+@token_required("admin")
+def batch_recommendations():
+    """Recommendations for many applicants with one ANN call, for precomputation runs."""
+    data = request.get_json() or {}
+    user_ids = data.get("userIds") or []
+    if not isinstance(user_ids, list) or not user_ids:
+        return error_response("userIds must be a non-empty list", 400)
+    if len(user_ids) > MAX_BATCH_USERS:
+        return error_response(f"At most {MAX_BATCH_USERS} userIds per request", 400)
+    if not all(isinstance(user_id, str) for user_id in user_ids):
+        return error_response("userIds must be strings", 400)
+    problem = _filter_error(data)
+    if problem:
+        return error_response(problem, 400)
+    try:
+        limit = int(data.get("limit", 10))
+    except (TypeError, ValueError):
+        return error_response("limit must be an integer", 400)
+    if limit < 1:
+        return error_response("limit must be positive", 400)
+    limit = min(limit, MAX_BATCH_LIMIT)
+
+    users = User.query.filter(User.id.in_(user_ids), User.role == "applicant").all()
+    results = MatchingService().find_matches_many(users, limit, _filters_from_args(data))
+    found = {user.id for user in users}
+    return success_response(
         {
-            "job": result.job.to_dict(),
-            "score": result.score,
-            "reasons": result.reasons,
-            "diagnostics": result.diagnostics,
+            "recommendations": {
+                user_id: [_serialize(result) for result in matches]
+                for user_id, matches in results.items()
+            },
+            "missing": [user_id for user_id in user_ids if user_id not in found],
         }
-        for result in results
-    ]
-    return success_response({"recommendations": payload})
+    )
 
 
 @matching_bp.get("/audit/summary")
@@ -0,0 +1,58 @@
+import argparse
+import json
+
+from backend.app import create_app
+from backend.models import Job, User
+from backend.services.embedding_service import (
+    encode_documents,
+    get_cache,
+    job_embedding_text,
+    user_embedding_text,
+)
+
+
+def warm(batch_size: int) -> int:
+    """Embed every job and candidate text so later imports hit the cache."""
+    texts = [job_embedding_text(job) for job in Job.query.yield_per(batch_size)]
+    texts.extend(
+        user_embedding_text(user)
+        for user in User.query.filter_by(role="applicant").yield_per(batch_size)
+    )
+    texts = [text for text in texts if text]
+    for start in range(0, len(texts), batch_size):
+        encode_documents(texts[start : start + batch_size])
+    return len(texts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and maintain the on-disk embedding cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Print entry counts and size per model.")
+    prune_parser = subparsers.add_parser("prune", help="Evict least recently used vectors.")
+    prune_parser.add_argument(
+        "--max-entries",
+        type=int,
+        help="Entries to keep. Defaults to EMBEDDING_CACHE_MAX_ENTRIES.",
+    )
+    clear_parser = subparsers.add_parser("clear", help="Delete cached vectors.")
+    clear_parser.add_argument("--model", help="Only clear vectors for this model name.")
+    warm_parser = subparsers.add_parser("warm", help="Embed all jobs and candidates in the database.")
+    warm_parser.add_argument("--batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        cache = get_cache()
+        if cache is None:
+            parser.error("Embedding cache is disabled (EMBEDDING_CACHE_PATH is empty).")
+        if args.command == "prune":
+            print(f"Evicted {cache.prune(args.max_entries)} vectors")
+        elif args.command == "clear":
+            print(f"Deleted {cache.clear(args.model)} vectors")
+        elif args.command == "warm":
+            print(f"Warmed {warm(args.batch_size)} texts")
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import logging
+
+from backend.config import Config
+from backend.services.embedding_backends import create_backend
+from backend.services.embedding_server import EmbeddingServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve EMBEDDING_BACKEND to local gunicorn workers over a Unix socket."
+    )
+    parser.add_argument(
+        "--socket",
+        default=Config.EMBEDDING_SERVER_SOCKET or "/tmp/milvus-match-embeddings.sock",
+        help="Socket path; set the same path as EMBEDDING_SERVER_SOCKET for the API workers.",
+    )
+    parser.add_argument("--max-batch", type=int, default=Config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=Config.EMBEDDING_SERVER_MAX_WAIT_MS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # Load the model in this process rather than connecting to ourselves.
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config["EMBEDDING_SERVER_SOCKET"] = None
+    backend = create_backend(config)
+    if backend is None:
+        parser.error(f"Could not load embedding backend {config['EMBEDDING_BACKEND']!r}")
+
+    server = EmbeddingServer(args.socket, backend, args.max_batch, args.max_wait_ms)
+    print(f"Serving {backend.name} ({backend.dimension}d) on {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
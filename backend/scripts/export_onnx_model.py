@@ -0,0 +1,65 @@
+import argparse
+from pathlib import Path
+
+from backend.services.embedding_backends import ONNX_MODEL_FILE, ONNX_TOKENIZER_FILE
+
+
+def export(model_name: str, output_dir: Path, max_length: int) -> Path:
+    """Export the SBERT transformer to ONNX and quantize its weights to int8."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sbert = SentenceTransformer(model_name, device="cpu")
+    transformer = sbert[0].auto_model.eval()
+    tokenizer = sbert[0].tokenizer
+    tokenizer.save_pretrained(str(output_dir))
+    if not (output_dir / ONNX_TOKENIZER_FILE).exists():
+        raise RuntimeError(f"{model_name} has no fast tokenizer; cannot write {ONNX_TOKENIZER_FILE}")
+
+    sample = tokenizer(
+        ["export sample"], padding="max_length", max_length=max_length, return_tensors="pt"
+    )
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    float_path = output_dir / "model.fp32.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(float_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+    quantized_path = output_dir / ONNX_MODEL_FILE
+    quantize_dynamic(str(float_path), str(quantized_path), weight_type=QuantType.QInt8)
+    float_path.unlink()
+    return quantized_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export an SBERT model to an int8-quantized ONNX model for EMBEDDING_BACKEND=onnx."
+    )
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model name")
+    parser.add_argument(
+        "--output-dir",
+        default=str(Path(__file__).resolve().parents[1] / "instance" / "onnx-model"),
+        help="Directory to write model.int8.onnx and tokenizer.json to (EMBEDDING_ONNX_PATH).",
+    )
+    parser.add_argument("--max-length", type=int, default=256)
+    args = parser.parse_args()
+
+    path = export(args.model, Path(args.output_dir), args.max_length)
+    print(f"Wrote quantized model to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,14 @@ import pandas as pd
 from backend.app import create_app
 from backend.extensions import bcrypt, db
 from backend.models import Job, User
-from backend.services.embedding_service import encode_text
-from backend.services.milvus_client import MilvusClient
+from backend.services.embedding_service import (
+    embedding_fingerprint,
+    encode_documents,
+    job_embedding_text,
+)
+from backend.services.embedding_pool import ParallelEncoder
+from backend.services.vector_filters import job_vector_metadata_many
+from backend.services.vector_index import get_vector_index, get_write_buffer
 import uuid
 
 
@@ -57,13 +63,14 @@ def parse_salary(row: pd.Series) -> Optional[str]:
     return f"₹{int(min_value)} - ₹{int(max_value)} / month"
 
 
-def import_listings(clean_dir: Path):
+def import_listings(clean_dir: Path, encoder: Optional[ParallelEncoder] = None):
     listings_path = clean_dir / "listings.csv"
     if not listings_path.exists():
         raise FileNotFoundError(f"{listings_path} not found. Run the ingest pipeline first.")
 
     df = pd.read_csv(listings_path)
     employer = ensure_system_employer()
+    jobs: List[Job] = []
 
     for _, row in df.iterrows():
         listing_id = str(row.get("listing_id"))
@@ -95,48 +102,47 @@ def import_listings(clean_dir: Path):
         else:
             job.application_deadline = None
 
-        text = " ".join(
-            filter(
-                None,
-                [
-                    job.position,
-                    job.company,
-                    job.job_description,
-                    " ".join(job.skills_required or []),
-                ],
-            )
-        )
-        vector = encode_text(text)
-        if vector:
-            job.embedding = vector
-            job.vector_id = job.id
-            try:
-                client = MilvusClient()
-                client.upsert(job.id, vector, {"jobId": job.id, "company": job.company})
-            except Exception:
-                pass
+        jobs.append(job)
 
+    _encode_and_upsert(jobs, encoder)
     db.session.commit()
 
-def _encode_and_upsert(job: Job):
-    text = " ".join(
-        filter(
-            None,
-            [
-                job.position,
-                job.company,
-                job.job_description,
-                " ".join(job.skills_required or []),
-            ],
-        )
-    )
-    vector = encode_text(text)
-    if vector:
+
+def _encode_and_upsert(jobs: List[Job], encoder: Optional[ParallelEncoder] = None):
+    """Embed ``jobs`` in batches and upsert the resulting vectors into the vector index.
+
+    Jobs whose embedding text is unchanged since the last import are skipped.
+    With an ``encoder`` the model runs in its worker processes, while this
+    process keeps the session and the Milvus writes. Vectors go through the
+    write-behind buffer, so Milvus receives a few large batches and is flushed
+    once at the end of :func:`main`.
+    """
+    texts = {job.id: job_embedding_text(job) for job in jobs}
+    fingerprints = {job_id: embedding_fingerprint(text) for job_id, text in texts.items()}
+    jobs = [job for job in jobs if job.embedding_fingerprint != fingerprints[job.id]]
+    if not jobs:
+        return
+    vectors = encode_documents([texts[job.id] for job in jobs], encoder=encoder)
+    if not vectors.shape[1]:
+        return
+    try:
+        buffer = get_write_buffer()
+    except Exception:
+        buffer = None
+    encoded = []
+    for job, vector in zip(jobs, vectors):
+        if not vector.any():
+            continue
         job.embedding = vector
+        job.embedding_fingerprint = fingerprints[job.id]
         job.vector_id = job.id
+        encoded.append((job, vector))
+    if buffer is None or not encoded:
+        return
+    metadata = job_vector_metadata_many([job for job, _ in encoded])
+    for (job, vector), row in zip(encoded, metadata):
         try:
-            client = MilvusClient()
-            client.upsert(job.id, vector, {"jobId": job.id, "company": job.company})
+            buffer.add(job.id, vector, row)
         except Exception:
             pass
 
@@ -145,7 +151,9 @@ def _safe_str(val) -> str:
         return ""
     return str(val)
 
-def import_kaggle_job_postings(clean_dir: Path, employer: User):
+def import_kaggle_job_postings(
+    clean_dir: Path, employer: User, encoder: Optional[ParallelEncoder] = None
+):
     candidates = [
         "job_postings.csv",
         "kaggle_job_postings.csv",
@@ -156,6 +164,7 @@ def import_kaggle_job_postings(clean_dir: Path, employer: User):
         if not path.exists():
             continue
         df = pd.read_csv(path)
+        jobs: List[Job] = []
         for _, row in df.iterrows():
             title = _safe_str(row.get("title")) or "Job"
             company = _safe_str(row.get("company")) or "Unknown"
@@ -177,12 +186,15 @@ def import_kaggle_job_postings(clean_dir: Path, employer: User):
                 salary=salary,
             )
             db.session.add(job)
-            _encode_and_upsert(job)
+            jobs.append(job)
+        _encode_and_upsert(jobs, encoder)
         db.session.commit()
         print(f"Imported Kaggle job postings from {path}")
         break
 
-def import_data_science_job_salaries(clean_dir: Path, employer: User):
+def import_data_science_job_salaries(
+    clean_dir: Path, employer: User, encoder: Optional[ParallelEncoder] = None
+):
     candidates = [
         "data_science_job_salaries.csv",
         "data_science_salaries.csv",
@@ -192,6 +204,7 @@ def import_data_science_job_salaries(clean_dir: Path, employer: User):
         if not path.exists():
             continue
         df = pd.read_csv(path)
+        jobs: List[Job] = []
         for _, row in df.iterrows():
             title = _safe_str(row.get("job_title")) or "Data Role"
             company_loc = _safe_str(row.get("company_location")) or _safe_str(row.get("employee_residence"))
@@ -215,12 +228,15 @@ def import_data_science_job_salaries(clean_dir: Path, employer: User):
                 salary=salary,
             )
             db.session.add(job)
-            _encode_and_upsert(job)
+            jobs.append(job)
+        _encode_and_upsert(jobs, encoder)
         db.session.commit()
         print(f"Imported Data Science job salaries from {path}")
         break
 
-def import_linkedin_jobs(clean_dir: Path, employer: User):
+def import_linkedin_jobs(
+    clean_dir: Path, employer: User, encoder: Optional[ParallelEncoder] = None
+):
     candidates = [
         "linkedin_jobs.csv",
         "linkedin_job_postings.csv",
@@ -230,6 +246,7 @@ def import_linkedin_jobs(clean_dir: Path, employer: User):
         if not path.exists():
             continue
         df = pd.read_csv(path)
+        jobs: List[Job] = []
         for _, row in df.iterrows():
             title = _safe_str(row.get("title")) or "Job"
             company = _safe_str(row.get("company")) or "Unknown"
@@ -249,12 +266,15 @@ def import_linkedin_jobs(clean_dir: Path, employer: User):
                 tags=["linkedin"],
             )
             db.session.add(job)
-            _encode_and_upsert(job)
+            jobs.append(job)
+        _encode_and_upsert(jobs, encoder)
         db.session.commit()
         print(f"Imported LinkedIn jobs from {path}")
         break
 
-def import_levels_fyi(clean_dir: Path, employer: User):
+def import_levels_fyi(
+    clean_dir: Path, employer: User, encoder: Optional[ParallelEncoder] = None
+):
     candidates = [
         "levels_fyi.csv",
         "levels_fyi_salaries.csv",
@@ -264,6 +284,7 @@ def import_levels_fyi(clean_dir: Path, employer: User):
         if not path.exists():
             continue
         df = pd.read_csv(path)
+        jobs: List[Job] = []
         for _, row in df.iterrows():
             role = _safe_str(row.get("role")) or _safe_str(row.get("title")) or "Tech Role"
             company = _safe_str(row.get("company")) or "Unknown"
@@ -284,12 +305,15 @@ def import_levels_fyi(clean_dir: Path, employer: User):
                 salary=comp,
             )
             db.session.add(job)
-            _encode_and_upsert(job)
+            jobs.append(job)
+        _encode_and_upsert(jobs, encoder)
         db.session.commit()
         print(f"Imported Levels.fyi roles from {path}")
         break
 
-def import_glassdoor(clean_dir: Path, employer: User):
+def import_glassdoor(
+    clean_dir: Path, employer: User, encoder: Optional[ParallelEncoder] = None
+):
     candidates = [
         "glassdoor_salaries.csv",
         "glassdoor_jobs.csv",
@@ -299,6 +323,7 @@ def import_glassdoor(clean_dir: Path, employer: User):
         if not path.exists():
             continue
         df = pd.read_csv(path)
+        jobs: List[Job] = []
         for _, row in df.iterrows():
             title = _safe_str(row.get("title")) or "Job"
             company = _safe_str(row.get("company")) or "Unknown"
@@ -319,7 +344,8 @@ def import_glassdoor(clean_dir: Path, employer: User):
                 salary=salary,
             )
             db.session.add(job)
-            _encode_and_upsert(job)
+            jobs.append(job)
+        _encode_and_upsert(jobs, encoder)
         db.session.commit()
         print(f"Imported Glassdoor dataset from {path}")
         break
@@ -332,6 +358,12 @@ def main():
         default=str(Path(__file__).resolve().parents[2] / "cursor-internship-ingest" / "data" / "clean"),
         help="Path to cursor-internship-ingest/data/clean directory.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Embedding processes to shard rows across (1 embeds in this process).",
+    )
     args = parser.parse_args()
     clean_dir = Path(args.clean_dir)
 
@@ -340,13 +372,23 @@ def main():
 
     app = create_app()
     with app.app_context():
-        import_listings(clean_dir)
-        employer = ensure_system_employer()
-        import_kaggle_job_postings(clean_dir, employer)
-        import_data_science_job_salaries(clean_dir, employer)
-        import_linkedin_jobs(clean_dir, employer)
-        import_levels_fyi(clean_dir, employer)
-        import_glassdoor(clean_dir, employer)
+        encoder = ParallelEncoder(args.workers) if args.workers > 1 else None
+        try:
+            import_listings(clean_dir, encoder)
+            employer = ensure_system_employer()
+            import_kaggle_job_postings(clean_dir, employer, encoder)
+            import_data_science_job_salaries(clean_dir, employer, encoder)
+            import_linkedin_jobs(clean_dir, employer, encoder)
+            import_levels_fyi(clean_dir, employer, encoder)
+            import_glassdoor(clean_dir, employer, encoder)
+        finally:
+            if encoder:
+                encoder.close()
+            try:
+                get_write_buffer().close()
+                get_vector_index().flush()
+            except Exception:
+                pass
         print(f"Imported listings from {clean_dir}")
 
 
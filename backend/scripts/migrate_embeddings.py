@@ -0,0 +1,105 @@
+import argparse
+import pickle
+
+import numpy as np
+from sqlalchemy import inspect, text
+
+from backend.app import create_app
+from backend.config import Config
+from backend.extensions import db
+from backend.models import Application, Job, User
+from backend.services.quota_service import quota_service
+
+TABLES = (Job, User, Application)
+EMBEDDING_TABLES = (Job, User)
+
+
+class MigrationConfig(Config):
+    # The vector index and the embedding model read columns this script adds.
+    VECTOR_INDEX_PRELOAD = False
+    EMBEDDING_PRELOAD = False
+    EMBEDDING_WARMUP = False
+
+
+def add_missing_columns() -> None:
+    """Add columns introduced after a table was first created (no ALTER in create_all)."""
+    inspector = inspect(db.engine)
+    for model in TABLES:
+        table = model.__table__
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            )
+            print(f"Added {table.name}.{column.name}")
+    db.session.commit()
+
+
+def _unpickle_vector(blob: bytes):
+    """Return the vector held in a legacy PickleType value, or ``None``."""
+    if not blob or blob[:1] != b"\x80":
+        return None
+    try:
+        value = pickle.loads(blob)
+    except Exception:  # noqa: BLE001
+        return None
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return value
+    return None
+
+
+def convert_table(table: str, batch_size: int) -> int:
+    """Rewrite pickled float lists in ``table.embedding`` as float32 bytes."""
+    converted = 0
+    last_id = ""
+    while True:
+        rows = db.session.execute(
+            text(
+                f"SELECT id, embedding FROM {table} "
+                "WHERE id > :last_id AND embedding IS NOT NULL ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": batch_size},
+        ).fetchall()
+        if not rows:
+            return converted
+        updates = []
+        for row_id, blob in rows:
+            vector = _unpickle_vector(bytes(blob))
+            if vector is None:
+                continue
+            packed = np.asarray(vector, dtype="<f4").tobytes() if len(vector) else None
+            updates.append({"id": row_id, "embedding": packed})
+        if updates:
+            db.session.execute(
+                text(f"UPDATE {table} SET embedding = :embedding WHERE id = :id"), updates
+            )
+            db.session.commit()
+            converted += len(updates)
+        last_id = rows[-1][0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add new columns, convert pickled Job/User embeddings to float32 binary "
+            "and backfill quota counters."
+        )
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app(MigrationConfig)
+    with app.app_context():
+        add_missing_columns()
+        for model in EMBEDDING_TABLES:
+            count = convert_table(model.__tablename__, args.batch_size)
+            print(f"Converted {count} {model.__tablename__} embeddings to float32")
+        # job_quota_counters starts empty on an existing database; count what is already there.
+        print(f"Rebuilt {quota_service.rebuild_counters()} quota counters")
+
+
+if __name__ == "__main__":
+    main()
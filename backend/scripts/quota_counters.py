@@ -0,0 +1,31 @@
+import argparse
+
+from backend.app import create_app
+from backend.services.quota_service import quota_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Maintain quota allocation counters and stored reservation targets."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "rebuild",
+        help="Recount job_quota_counters from matched/selected applications.",
+    )
+    subparsers.add_parser(
+        "refresh-targets",
+        help="Restamp jobs whose stored reservation targets predate reservation_targets.json.",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "rebuild":
+            print(f"Rebuilt {quota_service.rebuild_counters()} quota counters")
+        else:
+            print(f"Refreshed targets for {quota_service.refresh_stored_targets()} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import sys
+
+from backend.app import create_app
+from backend.services.hnsw_index import HnswIndex
+from backend.services.partitioned_index import PartitionedIndex
+from backend.services.vector_index import get_local_index, get_vector_index
+from backend.services.vector_reconcile import reconcile
+
+
+def _reconcile(args) -> None:
+    index = get_vector_index()
+
+    def progress(stage: str, count: int) -> None:
+        print(f"{stage}: {count}", file=sys.stderr, flush=True)
+
+    report = reconcile(index, page_size=args.page_size, repair=not args.dry_run, progress=progress)
+    snapshot_path = getattr(index, "snapshot_path", None)
+    if snapshot_path and (report.upserted or report.deleted):
+        index.save(snapshot_path)
+        print(f"Wrote snapshot to {snapshot_path}", file=sys.stderr)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build, inspect and reconcile the vector index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Print the size of the local index.")
+    subparsers.add_parser(
+        "rebuild",
+        help="Rebuild the local index from stored embeddings and write its snapshot.",
+    )
+    subparsers.add_parser("compact", help="Drop deleted HNSW nodes and write the snapshot.")
+    reconcile_parser = subparsers.add_parser(
+        "reconcile",
+        help="Diff the jobs table against the active vector index and repair the difference.",
+    )
+    reconcile_parser.add_argument(
+        "--dry-run", action="store_true", help="Only report the difference."
+    )
+    reconcile_parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "reconcile":
+            _reconcile(args)
+            return
+        index = get_local_index()
+        if args.command == "rebuild":
+            print(f"Indexed {index.load_from_db()} jobs")
+        elif args.command == "compact":
+            if not hasattr(index, "compact"):
+                parser.error("compact only applies to VECTOR_INDEX_LOCAL=hnsw")
+            print(f"Removed {index.compact()} tombstones")
+        snapshot_path = getattr(index, "snapshot_path", None)
+        if args.command != "stats" and snapshot_path:
+            index.save(snapshot_path)
+            print(f"Wrote snapshot to {snapshot_path}")
+        stats = {"type": type(index).__name__, "vectors": len(index)}
+        if isinstance(index, HnswIndex):
+            stats.update(tombstones=index.tombstones, m=index.m, efSearch=index.ef_search)
+        if isinstance(index, PartitionedIndex):
+            stats.update(
+                tombstones=index.tombstones,
+                partitions={name or "national": size for name, size in index.partitions.items()},
+            )
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
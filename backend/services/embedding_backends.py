@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Type
+
+import numpy as np
+
+from backend.services.text_chunker import Offsets, word_offsets
+
+ONNX_MODEL_FILE = "model.int8.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+
+
+class EmbeddingBackend(ABC):
+    """Turns a list of texts into a ``(len(texts), dimension)`` float32 matrix.
+
+    Heavy runtimes (torch, onnxruntime) are imported in ``__init__`` so that
+    importing this module stays cheap.
+    """
+
+    name = "base"
+
+    @classmethod
+    def model_id(cls, config: Mapping) -> str:
+        """Identity used in cache keys and fingerprints, derived from config only."""
+        return config.get("EMBEDDING_MODEL", "")
+
+    @classmethod
+    @abstractmethod
+    def from_config(cls, config: Mapping) -> "EmbeddingBackend":
+        """Build the backend from the Flask config."""
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Width of the vectors returned by :meth:`encode_texts`."""
+
+    @abstractmethod
+    def encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode ``texts`` in batches of ``batch_size``."""
+
+    def token_offsets(self, text: str) -> Offsets:
+        """Character spans of the model's tokens in ``text``, for chunking."""
+        return word_offsets(text)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    name = "sbert"
+
+    def __init__(self, model_name: str):
+        # Imported here so torch is only loaded when this backend is selected.
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "SentenceTransformerBackend":
+        return cls(config["EMBEDDING_MODEL"])
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        encoded = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(encoded, dtype=np.float32)
+
+    def token_offsets(self, text: str) -> Offsets:
+        tokenizer = self.model.tokenizer
+        if not getattr(tokenizer, "is_fast", False):
+            return word_offsets(text)
+        encoded = tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, truncation=False
+        )
+        return [tuple(span) for span in encoded["offset_mapping"]]
+
+
+class OnnxBackend(EmbeddingBackend):
+    """Int8-quantized transformer run through ONNX Runtime on the CPU.
+
+    ``model_dir`` holds ``model.int8.onnx`` and ``tokenizer.json`` as written
+    by ``backend.scripts.export_onnx_model``. Token embeddings are mean-pooled
+    and L2-normalized, matching the sentence-transformers MiniLM pipeline.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str, max_length: int = 256, threads: int = 0):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.tokenizer = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        # Untruncated copy used to measure and split long documents.
+        self._splitter = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILE))
+        self._input_names = {item.name for item in self.session.get_inputs()}
+        self._dimension = self.session.get_outputs()[0].shape[-1]
+
+    @classmethod
+    def model_id(cls, config: Mapping) -> str:
+        return f"{config.get('EMBEDDING_MODEL', '')}:onnx-int8"
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "OnnxBackend":
+        return cls(
+            config["EMBEDDING_ONNX_PATH"],
+            max_length=config.get("EMBEDDING_MAX_SEQ_LENGTH", 256),
+            threads=config.get("EMBEDDING_ONNX_THREADS", 0),
+        )
+
+    @property
+    def dimension(self) -> int:
+        return int(self._dimension)
+
+    def encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start : start + batch_size])
+            input_ids = np.array([item.ids for item in encodings], dtype=np.int64)
+            attention_mask = np.array(
+                [item.attention_mask for item in encodings], dtype=np.int64
+            )
+            inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                inputs["token_type_ids"] = np.array(
+                    [item.type_ids for item in encodings], dtype=np.int64
+                )
+            token_embeddings = self.session.run(None, inputs)[0]
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+            batches.append(pooled)
+        vectors = np.concatenate(batches).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+    def token_offsets(self, text: str) -> Offsets:
+        return list(self._splitter.encode(text, add_special_tokens=False).offsets)
+
+
+class HashingBackend(EmbeddingBackend):
+    """Deterministic bag-of-words feature hashing; no model download, for tests."""
+
+    name = "hashing"
+    _token_pattern = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 384):
+        self._dimension = dimension
+
+    @classmethod
+    def model_id(cls, config: Mapping) -> str:
+        return f"hashing:{config.get('EMBEDDING_HASH_DIM', 384)}"
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "HashingBackend":
+        return cls(config.get("EMBEDDING_HASH_DIM", 384))
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._token_pattern.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self._dimension
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+
+BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    backend.name: backend
+    for backend in (SentenceTransformerBackend, OnnxBackend, HashingBackend)
+}
+
+
+def backend_class(config: Mapping) -> Type[EmbeddingBackend]:
+    name = config.get("EMBEDDING_BACKEND", SentenceTransformerBackend.name)
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown EMBEDDING_BACKEND {name!r}; expected one of {sorted(BACKENDS)}"
+        ) from None
+
+
+def create_backend(config: Mapping) -> Optional[EmbeddingBackend]:
+    """Build the configured backend, or ``None`` when it cannot be loaded.
+
+    With ``EMBEDDING_SERVER_SOCKET`` set, texts are sent to a shared
+    embedding server process instead of loading the model in this process.
+    """
+    try:
+        if config.get("EMBEDDING_SERVER_SOCKET"):
+            from backend.services.embedding_server import RemoteBackend
+
+            return RemoteBackend.from_config(config)
+        return backend_class(config).from_config(config)
+    except ValueError:
+        raise
+    except Exception:
+        return None
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic edits do not miss the cache."""
+    return " ".join((text or "").split())
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed SQLite store of float32 vectors keyed by (model, sha256)."""
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, digest)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        # Triggers keep the row count in embedding_count so prune() never scans
+        # the table. REPLACE only fires the delete trigger with recursive triggers.
+        self._conn.execute("PRAGMA recursive_triggers = ON")
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_count ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS embeddings_insert_count AFTER INSERT ON embeddings "
+            "BEGIN UPDATE embedding_count SET entries = entries + 1; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS embeddings_delete_count AFTER DELETE ON embeddings "
+            "BEGIN UPDATE embedding_count SET entries = entries - 1; END"
+        )
+        # Caches created before the counter are counted once here.
+        self._conn.execute(
+            "INSERT OR IGNORE INTO embedding_count (id, entries) SELECT 0, COUNT(*) FROM embeddings"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, digests: Iterable[str]) -> Dict[str, np.ndarray]:
+        digests = list(dict.fromkeys(digests))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(digests), 500):
+                chunk = digests[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings "
+                    f"WHERE model = ? AND digest IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND digest = ?",
+                    [(now, model, digest) for digest in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, digest, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (model, digest, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                    for digest, vector in vectors.items()
+                ],
+            )
+            self._conn.commit()
+        self.prune()
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """Evict least recently used vectors beyond ``max_entries``."""
+        limit = self.max_entries if max_entries is None else max_entries
+        with self._lock:
+            (count,) = self._conn.execute("SELECT entries FROM embedding_count").fetchone()
+            excess = count - limit
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                "SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+        return excess
+
+    def clear(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model:
+                cursor = self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+            else:
+                cursor = self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) "
+                "FROM embeddings GROUP BY model"
+            ).fetchall()
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "maxEntries": self.max_entries,
+            "entries": sum(row[1] for row in rows),
+            "bytes": sum(row[2] for row in rows),
+            "models": {model: count for model, count, _ in rows},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from flask import Flask, current_app
+
+_worker_app: Optional[Flask] = None
+
+
+def _init_worker(config: dict) -> None:
+    """Give each pool process a bare app context; the backend loads on first shard."""
+    global _worker_app
+    _worker_app = Flask(__name__)
+    _worker_app.config.update(config)
+    _worker_app.app_context().push()
+
+
+def _encode_shard(texts: List[str], batch_size: Optional[int]) -> np.ndarray:
+    from backend.services.embedding_service import _encode_batch
+
+    return _encode_batch(texts, batch_size)
+
+
+class ParallelEncoder:
+    """Shards texts across a process pool of embedding workers.
+
+    Pass an instance as the ``encoder`` of ``encode_texts``: cache lookups and
+    writes stay in the calling process, and only cache misses are sent to the
+    pool. Workers use the ``spawn`` start method so they never inherit the
+    caller's database connections or a half-initialised torch runtime.
+    """
+
+    def __init__(self, workers: int, shard_size: int = 1024):
+        self.workers = workers
+        self.shard_size = shard_size
+        config = {key: value for key, value in current_app.config.items() if key.isupper()}
+        # The parent process owns the embedding cache.
+        config["EMBEDDING_CACHE_PATH"] = ""
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config,),
+        )
+
+    def __call__(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Contiguous shards of length-sorted texts keep padding low in each worker.
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        shard_size = min(self.shard_size, max(1, -(-len(texts) // self.workers)))
+        shards = [order[start : start + shard_size] for start in range(0, len(order), shard_size)]
+        results = list(
+            self._pool.map(
+                _encode_shard,
+                [[texts[index] for index in shard] for shard in shards],
+                [batch_size] * len(shards),
+            )
+        )
+        if any(not result.shape[1] for result in results):
+            return np.zeros((len(texts), 0), dtype=np.float32)
+        vectors = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+        for shard, result in zip(shards, results):
+            vectors[shard] = result
+        return vectors
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def __enter__(self) -> "ParallelEncoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from backend.services.embedding_backends import EmbeddingBackend, backend_class
+from backend.services.text_chunker import Offsets
+
+logger = logging.getLogger(__name__)
+
+_FRAME_HEADER = struct.Struct("!II")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("embedding server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock: socket.socket, header: dict, body: bytes = b"") -> None:
+    """Write a JSON header plus an optional binary body (raw float32 rows)."""
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_FRAME_HEADER.pack(len(encoded), len(body)) + encoded + body)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[dict, bytes]:
+    header_size, body_size = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))
+    header = json.loads(_recv_exact(sock, header_size))
+    return header, _recv_exact(sock, body_size)
+
+
+class _PendingRequest:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves one in-memory model to every gunicorn worker over a Unix socket.
+
+    Requests arriving within ``max_wait_ms`` of each other are merged into a
+    single ``encode_texts`` call of up to ``max_batch`` texts.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str,
+        backend: EmbeddingBackend,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+        threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True).start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        request = _PendingRequest(texts)
+        self._requests.put(request)
+        request.done.wait()
+        if request.error:
+            raise RuntimeError(request.error)
+        return request.vectors
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = self.backend.encode_texts(texts, self.max_batch)
+                offset = 0
+                for request in batch:
+                    request.vectors = vectors[offset : offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Embedding batch failed")
+                for request in batch:
+                    request.error = str(exc)
+            for request in batch:
+                request.done.set()
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server: EmbeddingServer = self.server
+        while True:
+            try:
+                header, _ = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            if header.get("op") == "info":
+                send_frame(
+                    self.request,
+                    {"backend": server.backend.name, "dimension": server.backend.dimension},
+                )
+                continue
+            if header.get("op") == "tokenize":
+                send_frame(
+                    self.request,
+                    {"offsets": server.backend.token_offsets(header.get("text", ""))},
+                )
+                continue
+            try:
+                vectors = np.ascontiguousarray(
+                    server.encode(header.get("texts", [])), dtype=np.float32
+                )
+            except RuntimeError as exc:
+                send_frame(self.request, {"error": str(exc)})
+                continue
+            send_frame(
+                self.request,
+                {"rows": vectors.shape[0], "dim": vectors.shape[1]},
+                vectors.tobytes(),
+            )
+
+
+class RemoteBackend(EmbeddingBackend):
+    """Client for :class:`EmbeddingServer`; one socket per calling thread."""
+
+    name = "remote"
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._dimension = int(self._call({"op": "info"})[0]["dimension"])
+
+    @classmethod
+    def model_id(cls, config: Mapping) -> str:
+        # The server runs EMBEDDING_BACKEND, so cached vectors stay interchangeable.
+        return backend_class(config).model_id(config)
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "RemoteBackend":
+        return cls(config["EMBEDDING_SERVER_SOCKET"])
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def _exchange(self, header: dict) -> Tuple[dict, bytes]:
+        if getattr(self._local, "pid", None) != os.getpid():
+            # Never reuse a socket inherited from a preloading parent process.
+            self._local.sock = None
+            self._local.pid = os.getpid()
+        sock = self._local.sock
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        send_frame(sock, header)
+        return recv_frame(sock)
+
+    def _call(self, header: dict) -> Tuple[dict, bytes]:
+        try:
+            return self._exchange(header)
+        except (ConnectionError, OSError):
+            # The server may have restarted; retry once on a fresh connection.
+            sock = getattr(self._local, "sock", None)
+            self._local.sock = None
+            if sock is not None:
+                sock.close()
+            return self._exchange(header)
+
+    def encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        header, body = self._call({"op": "encode", "texts": list(texts)})
+        if "error" in header:
+            raise RuntimeError(header["error"])
+        return np.frombuffer(body, dtype=np.float32).reshape(header["rows"], header["dim"])
+
+    def token_offsets(self, text: str) -> Offsets:
+        header, _ = self._call({"op": "tokenize", "text": text})
+        return [tuple(span) for span in header["offsets"]]
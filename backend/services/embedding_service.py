@@ -1,38 +1,296 @@
+import gc
+import logging
+import threading
+import time
 from functools import lru_cache
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence
 
+import numpy as np
 from flask import current_app
 
-try:
-    from sentence_transformers import SentenceTransformer
-    _HAS_SENTENCE_TRANSFORMERS = True
-except (ImportError, OSError):
-    _HAS_SENTENCE_TRANSFORMERS = False
-    SentenceTransformer = None
+from backend.services.embedding_backends import (
+    EmbeddingBackend,
+    backend_class,
+    create_backend,
+)
+from backend.services.embedding_cache import EmbeddingCache, text_digest
+from backend.services.text_chunker import chunk_texts
 
+logger = logging.getLogger(__name__)
 
-@lru_cache(maxsize=1)
-def _get_model() -> Optional[SentenceTransformer]:
-    if not _HAS_SENTENCE_TRANSFORMERS:
-        return None
+_backend_lock = threading.Lock()
+_backend_state: Dict[str, object] = {
+    "key": None,
+    "backend": None,
+    "status": "cold",
+    "retry_at": 0.0,
+}
+
+
+def _backend_current(key) -> bool:
+    """Whether the cached backend state answers for ``key`` without a (re)load."""
+    if _backend_state["key"] != key:
+        return False
+    return _backend_state["backend"] is not None or time.monotonic() < _backend_state["retry_at"]
+
+
+def get_backend() -> Optional[EmbeddingBackend]:
+    """Return the configured embedding backend, loading it on first use.
+
+    A backend that fails to load is not cached: loading is retried at most
+    every ``EMBEDDING_BACKEND_RETRY_SECONDS``, and ``None`` is returned meanwhile.
+    """
+    key = (
+        current_app.config.get("EMBEDDING_BACKEND", "sbert"),
+        current_app.config.get("EMBEDDING_SERVER_SOCKET"),
+        active_model_id(),
+    )
+    if _backend_current(key):
+        return _backend_state["backend"]
+    with _backend_lock:
+        if not _backend_current(key):
+            _backend_state["status"] = "loading"
+            backend = create_backend(current_app.config)
+            retry_seconds = current_app.config.get("EMBEDDING_BACKEND_RETRY_SECONDS", 30.0)
+            _backend_state.update(
+                key=key,
+                backend=backend,
+                status="ready" if backend else "unavailable",
+                retry_at=0.0 if backend else time.monotonic() + retry_seconds,
+            )
+    return _backend_state["backend"]
+
+
+def backend_status() -> dict:
+    """Load state of the embedding backend in this process, for health checks."""
+    backend = _backend_state["backend"]
+    return {
+        "status": _backend_state["status"],
+        "backend": backend.name if backend else None,
+        "dimension": backend.dimension if backend else None,
+    }
+
+
+def preload(app) -> None:
+    """Load the backend synchronously, before gunicorn forks its workers.
+
+    Workers then share the model weights copy-on-write. No probe encode runs
+    here: starting torch's thread pool before fork can deadlock the children.
+    """
+    with app.app_context():
+        backend = get_backend()
+    # Keep the preloaded objects out of the cyclic GC so collections in the
+    # workers do not touch (and so copy) their pages.
+    gc.freeze()
+    _backend_state["status"] = "ready" if backend else "unavailable"
+
+
+def start_warmup(
+    app, on_ready: Optional[Callable[[EmbeddingBackend], None]] = None
+) -> threading.Thread:
+    """Load the backend and run one probe encode on a background thread.
+
+    ``on_ready`` is called with the loaded backend, e.g. to validate settings
+    that depend on its dimension; its errors are logged.
+    """
+
+    def warm() -> None:
+        backend = None
+        try:
+            with app.app_context():
+                backend = get_backend()
+                if backend:
+                    # Straight to the backend: a cached probe would skip the model.
+                    _encode_batch(["warm-up"], None)
+                    if on_ready:
+                        try:
+                            on_ready(backend)
+                        except Exception:  # noqa: BLE001
+                            logger.exception("Startup check for the %s backend failed", backend.name)
+        finally:
+            _backend_state["status"] = "ready" if backend else "unavailable"
+
+    _backend_state["status"] = "loading"
+    thread = threading.Thread(target=warm, name="embedding-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def active_model_id() -> str:
+    """Identity of the active backend/model, used to key cached vectors."""
+    return backend_class(current_app.config).model_id(current_app.config)
+
+
+def embedding_dimension() -> Optional[int]:
+    backend = get_backend()
+    return backend.dimension if backend else None
+
+
+@lru_cache(maxsize=4)
+def _open_cache(path: str, max_entries: int) -> Optional[EmbeddingCache]:
     try:
-        model_name = current_app.config["EMBEDDING_MODEL"]
-        return SentenceTransformer(model_name)
+        return EmbeddingCache(path, max_entries)
     except Exception:
         return None
 
 
+def get_cache() -> Optional[EmbeddingCache]:
+    """Return the on-disk embedding cache, or ``None`` when it is disabled."""
+    path = current_app.config.get("EMBEDDING_CACHE_PATH")
+    if not path:
+        return None
+    return _open_cache(path, current_app.config.get("EMBEDDING_CACHE_MAX_ENTRIES", 200_000))
+
+
+def _encode_batch(texts: List[str], batch_size: Optional[int]) -> np.ndarray:
+    backend = get_backend()
+    if not backend:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+
+    batch_size = batch_size or current_app.config.get("EMBEDDING_BATCH_SIZE", 64)
+    order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+    try:
+        encoded = backend.encode_texts([texts[index] for index in order], batch_size)
+    except Exception:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+
+    encoded = np.asarray(encoded, dtype=np.float32)
+    vectors = np.empty_like(encoded)
+    vectors[order] = encoded
+    return vectors
+
+
+def encode_texts(
+    texts: Sequence[str],
+    batch_size: Optional[int] = None,
+    encoder: Optional[Callable[[List[str], Optional[int]], np.ndarray]] = None,
+) -> np.ndarray:
+    """Encode many texts at once and return a ``(len(texts), dim)`` float32 matrix.
+
+    Texts already present in the embedding cache are served from disk; the rest
+    are sorted by length and encoded in batches so each batch pads to a similar
+    sequence length. Empty texts produce zero rows. When nothing could be
+    encoded the matrix has zero columns, so callers can check ``shape[1]``.
+    ``encoder`` replaces in-process encoding of cache misses, e.g. with a
+    :class:`~backend.services.embedding_pool.ParallelEncoder`.
+    """
+    texts = [text or "" for text in texts]
+    present = [index for index, text in enumerate(texts) if text]
+    if not present:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+
+    model_name = active_model_id()
+    cache = get_cache()
+    rows: Dict[int, np.ndarray] = {}
+    pending = present
+    if cache:
+        digests = {index: text_digest(texts[index]) for index in present}
+        cached = cache.get_many(model_name, digests.values())
+        rows = {index: cached[digest] for index, digest in digests.items() if digest in cached}
+        pending = [index for index in present if index not in rows]
+
+    if pending:
+        encoded = (encoder or _encode_batch)([texts[index] for index in pending], batch_size)
+        if encoded.shape[1]:
+            fresh = dict(zip(pending, encoded))
+            rows.update(fresh)
+            if cache:
+                cache.put_many(
+                    model_name, {digests[index]: vector for index, vector in fresh.items()}
+                )
+
+    if not rows:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+    dim = len(next(iter(rows.values())))
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for index, vector in rows.items():
+        vectors[index] = vector
+    return vectors
+
+
+def encode_documents(
+    texts: Sequence[str],
+    pooling: Optional[str] = None,
+    encoder: Optional[Callable[[List[str], Optional[int]], np.ndarray]] = None,
+) -> np.ndarray:
+    """Embed long texts by pooling the vectors of their token-budgeted chunks.
+
+    Each document is capped at ``EMBEDDING_MAX_DOCUMENT_TOKENS`` tokens and
+    split into windows of ``EMBEDDING_CHUNK_TOKENS`` that fit the model's
+    sequence length, instead of being silently truncated by the model. All
+    chunks are embedded in one ``encode_texts`` batch and then mean- or
+    max-pooled (``EMBEDDING_POOLING``) into one L2-normalized row per text.
+    """
+    config = current_app.config
+    backend = get_backend()
+    if not backend or not texts:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+
+    documents = chunk_texts(
+        texts,
+        config.get("EMBEDDING_CHUNK_TOKENS", 254),
+        overlap=config.get("EMBEDDING_CHUNK_OVERLAP", 50),
+        max_document_tokens=config.get("EMBEDDING_MAX_DOCUMENT_TOKENS", 2048),
+        token_offsets=backend.token_offsets,
+    )
+    chunk_vectors = encode_texts(
+        [chunk.text for chunks in documents for chunk in chunks], encoder=encoder
+    )
+    if not chunk_vectors.shape[1]:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+
+    pooling = pooling or config.get("EMBEDDING_POOLING", "mean")
+    vectors = np.zeros((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+    offset = 0
+    for row, chunks in enumerate(documents):
+        if not chunks:
+            continue
+        rows = chunk_vectors[offset : offset + len(chunks)]
+        offset += len(chunks)
+        pooled = rows.max(axis=0) if pooling == "max" else rows.mean(axis=0)
+        norm = np.linalg.norm(pooled)
+        if norm:
+            vectors[row] = pooled / norm
+    return vectors
+
+
 def encode_text(text: str) -> List[float]:
     if not text:
         return []
-    model = _get_model()
-    if not model:
+    vectors = encode_texts([text])
+    if not vectors.shape[1]:
         # Return empty vector if model is not available
         return []
-    try:
-        vector = model.encode(text)
-        return vector.tolist()
-    except Exception:
-        return []
+    return vectors[0].tolist()
+
+
+def job_embedding_text(job) -> str:
+    """Text used to embed a job: position, company, description and skills."""
+    return " ".join(
+        filter(
+            None,
+            [
+                job.position,
+                job.company,
+                job.job_description,
+                " ".join(job.skills_required or []),
+            ],
+        )
+    )
+
+
+def user_embedding_text(user) -> str:
+    """Text used to embed a candidate: the resume, or their skills without one."""
+    return user.resume_text or " ".join(user.skills or [])
 
 
+def embedding_fingerprint(text: str) -> str:
+    """Identify ``text`` as embedded by the active model and chunking settings."""
+    config = current_app.config
+    settings = (
+        f"{active_model_id()}|{config.get('EMBEDDING_POOLING', 'mean')}|"
+        f"{config.get('EMBEDDING_CHUNK_TOKENS', 254)}|"
+        f"{config.get('EMBEDDING_CHUNK_OVERLAP', 50)}|"
+        f"{config.get('EMBEDDING_MAX_DOCUMENT_TOKENS', 2048)}"
+    )
+    return text_digest(f"{settings} {text}")
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from flask import Flask
+
+from backend.extensions import db
+from backend.models import Job, User
+from backend.services.embedding_service import (
+    embedding_fingerprint,
+    encode_documents,
+    job_embedding_text,
+    user_embedding_text,
+)
+from backend.services.vector_filters import job_is_closed, job_vector_metadata_many
+from backend.services.vector_index import get_write_buffer
+
+EMBEDDING_PENDING = "pending"
+EMBEDDING_READY = "ready"
+EMBEDDING_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+def job_needs_embedding(job: Job) -> bool:
+    # The fingerprint is only written together with the vector, so comparing
+    # it avoids loading the deferred embedding column.
+    fingerprint = embedding_fingerprint(job_embedding_text(job))
+    return job.embedding_fingerprint != fingerprint
+
+
+def embed_jobs(jobs: Iterable[Job]) -> None:
+    """Encode ``jobs`` in one batch, store the vectors and queue them for the vector index.
+
+    Jobs whose text is unchanged keep their vector, but it is queued again with
+    fresh metadata so state, status and deadline filters stay current. Closed
+    jobs keep their stored embedding and are queued for removal instead.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    stale = []
+    rows = []
+    for job in jobs:
+        if job_needs_embedding(job):
+            stale.append(job)
+            continue
+        job.embedding_status = EMBEDDING_READY
+        if job.embedding is not None and len(job.embedding):
+            rows.append((job.id, job.embedding))
+    texts = [job_embedding_text(job) for job in stale]
+    vectors = encode_documents(texts) if stale else []
+    for job, text, vector in zip(stale, texts, vectors):
+        if not vector.size or not vector.any():
+            job.embedding_status = EMBEDDING_FAILED
+            continue
+        job.embedding = vector
+        job.embedding_fingerprint = embedding_fingerprint(text)
+        job.embedding_status = EMBEDDING_READY
+        job.vector_id = job.id
+        rows.append((job.id, vector))
+    if not rows:
+        return
+    closed = {job.id for job in jobs if job_is_closed(job)}
+    # Built after encoding so the metadata carries the new fingerprints.
+    metadata = dict(zip((job.id for job in jobs), job_vector_metadata_many(jobs)))
+    try:
+        buffer = get_write_buffer()
+        for job_id, vector in rows:
+            if job_id in closed:
+                buffer.remove(job_id)
+            else:
+                buffer.add(job_id, vector, metadata[job_id])
+    except Exception:  # noqa: BLE001
+        # Milvus is optional. Continue silently in local dev.
+        pass
+
+
+def embed_users(users: Iterable[User]) -> None:
+    users = list(users)
+    if not users:
+        return
+    vectors = encode_documents([user_embedding_text(user) for user in users])
+    for user, vector in zip(users, vectors):
+        if not vector.size or not vector.any():
+            user.embedding_status = EMBEDDING_FAILED
+            continue
+        user.embedding = vector
+        user.embedding_status = EMBEDDING_READY
+
+
+class EmbeddingWorker:
+    """Fills in Job/User embeddings on daemon threads fed by a bounded queue.
+
+    Routes mark a row ``pending`` before committing and call :meth:`submit`
+    afterwards. When async embedding is disabled, or the queue is full, the
+    row is embedded inline instead so no write is ever left unembedded.
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self._queue: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions["embedding_worker"] = self
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.app and self.app.config.get("EMBEDDING_ASYNC"))
+
+    def _ensure_started(self) -> None:
+        # Threads do not survive fork, so start them lazily in each process.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.app.config.get("EMBEDDING_QUEUE_SIZE", 1000))
+            for index in range(self.app.config.get("EMBEDDING_WORKERS", 1)):
+                thread = threading.Thread(
+                    target=self._run, name=f"embedding-worker-{index}", daemon=True
+                )
+                thread.start()
+            self._pid = os.getpid()
+            self._queue.put_nowait(("sweep", None))
+
+    def submit(self, kind: str, row_id: str) -> None:
+        """Queue a committed ``job``/``user`` row for embedding."""
+        if not self.enabled:
+            self._process([(kind, row_id)])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((kind, row_id))
+        except queue.Full:
+            logger.warning("Embedding queue full; embedding %s %s inline", kind, row_id)
+            self._process([(kind, row_id)])
+
+    def join(self) -> None:
+        """Block until every queued row has been processed."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _run(self) -> None:
+        batch_size = self.app.config.get("EMBEDDING_BATCH_SIZE", 64)
+        while True:
+            items = [self._queue.get()]
+            while len(items) < batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.app.app_context():
+                    self._process(items)
+            except Exception:  # noqa: BLE001
+                logger.exception("Background embedding failed")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _process(self, items: List[Tuple[str, Optional[str]]]) -> None:
+        job_ids = {row_id for kind, row_id in items if kind == "job"}
+        user_ids = {row_id for kind, row_id in items if kind == "user"}
+        if any(kind == "sweep" for kind, _ in items):
+            # Pick up rows left pending by a restart or a crashed worker.
+            job_ids.update(
+                row_id for (row_id,) in db.session.query(Job.id).filter_by(
+                    embedding_status=EMBEDDING_PENDING
+                )
+            )
+            user_ids.update(
+                row_id for (row_id,) in db.session.query(User.id).filter_by(
+                    embedding_status=EMBEDDING_PENDING
+                )
+            )
+        if job_ids:
+            embed_jobs(Job.query.filter(Job.id.in_(job_ids)).all())
+        if user_ids:
+            embed_users(User.query.filter(User.id.in_(user_ids)).all())
+        if job_ids or user_ids:
+            db.session.commit()
+
+
+embedding_worker = EmbeddingWorker()
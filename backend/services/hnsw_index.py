@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.local_vector_index import LocalVectorIndex, _normalize
+
+try:
+    import hnswlib
+
+    _HAS_HNSWLIB = True
+except (ImportError, ModuleNotFoundError):
+    hnswlib = None
+    _HAS_HNSWLIB = False
+
+_GRAPH_FILE = "graph.bin"
+
+Row = Tuple[str, np.ndarray, dict]
+
+
+class HnswIndex(LocalVectorIndex):
+    """Approximate in-process vector search over an ``hnswlib`` HNSW graph.
+
+    Graph labels are positions in ``_ids``/``_metadata``. ``m`` sets links per
+    node; ``ef_construction`` and ``ef_search`` trade build and query time for
+    recall. Inserts are incremental and ``upsert_many`` adds a whole batch in
+    one multi-threaded call. Deletes and re-embedded jobs leave tombstones
+    until :meth:`compact`, which :meth:`maybe_compact` runs once they exceed
+    ``compact_ratio`` of the nodes.
+
+    :meth:`save` writes the graph with a ``meta.json`` of ids and metadata,
+    which :meth:`restore` loads so worker processes skip the rebuild. The
+    graph is read into the heap rather than memory-mapped, so each process
+    holds its own copy unless it was loaded before fork. A snapshot written
+    for another ``backend_id`` (embedding model) or ``dimension`` is
+    refused, so the index is rebuilt from the database.
+    ``hnswlib`` is optional; without it ``VECTOR_INDEX_LOCAL=hnsw`` falls back
+    to the exact index.
+    """
+
+    def __init__(
+        self,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        snapshot_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        compact_ratio: float = 0.2,
+        backend_id: Optional[str] = None,
+        dimension: Optional[int] = None,
+    ):
+        if not _HAS_HNSWLIB:
+            raise RuntimeError("HnswIndex requires hnswlib (pip install hnswlib)")
+        if m < 2:
+            raise ValueError(f"HNSW m must be at least 2, got {m}")
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.snapshot_path = snapshot_path
+        self.seed = 100 if seed is None else seed
+        self.compact_ratio = compact_ratio
+        self.backend_id = backend_id
+        self.dimension = dimension
+        # Writes made while compact() rebuilds the graph, replayed before the swap.
+        self._journal: Optional[List[tuple]] = None
+        self._compact_lock = threading.Lock()
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._graph = None
+        self._dimension = 0
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadata: List[dict] = []
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def tombstones(self) -> int:
+        return self._size - len(self._positions)
+
+    def _spawn(self) -> "HnswIndex":
+        return HnswIndex(
+            m=self.m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            seed=self.seed,
+            compact_ratio=self.compact_ratio,
+            backend_id=self.backend_id,
+            dimension=self.dimension,
+        )
+
+    def _reserve(self, dimension: int, rows: int) -> None:
+        if self._graph is None or not self._size:
+            self._graph = hnswlib.Index(space="ip", dim=dimension)
+            self._graph.init_index(
+                max_elements=max(rows, 64),
+                ef_construction=self.ef_construction,
+                M=self.m,
+                random_seed=self.seed,
+            )
+            self._dimension = dimension
+            return
+        if dimension != self._dimension:
+            raise ValueError(f"vector has dimension {dimension}, index holds {self._dimension}")
+        capacity = self._graph.get_max_elements()
+        if rows > capacity:
+            self._graph.resize_index(max(rows, 2 * capacity))
+
+    def upsert(self, vector_id: str, vector, metadata: dict) -> Optional[str]:
+        return vector_id if self.upsert_many([vector_id], [vector], [metadata]) else None
+
+    def upsert_many(self, ids: Sequence[str], vectors, metadata: Sequence[dict]) -> int:
+        rows = [
+            (vector_id, _normalize(vector), row)
+            for vector_id, vector, row in zip(ids, vectors, metadata)
+            if vector is not None and len(vector)
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("upsert", rows))
+            self._write(rows)
+        return len(rows)
+
+    def _write(self, rows: Sequence[Row]) -> None:
+        # Later rows for the same id win, as with repeated upserts.
+        latest = {vector_id: (vector, row) for vector_id, vector, row in rows}
+        dimensions = {vector.shape[0] for vector, _ in latest.values()}
+        if len(dimensions) > 1 or (self._size and dimensions != {self._dimension}):
+            raise ValueError(
+                f"vectors have dimensions {sorted(dimensions)}, index holds {self._dimension}"
+            )
+        existing = [vector_id for vector_id in latest if vector_id in self._positions]
+        if existing:
+            labels = [self._positions[vector_id] for vector_id in existing]
+            stored = np.asarray(self._graph.get_items(labels))
+            for vector_id, label, current in zip(existing, labels, stored):
+                vector, row = latest[vector_id]
+                if np.array_equal(current, vector):
+                    self._metadata[label] = row
+                    del latest[vector_id]
+                else:
+                    self._graph.mark_deleted(label)
+        if not latest:
+            return
+
+        start = self._size
+        self._reserve(dimensions.pop(), start + len(latest))
+        for label, (vector_id, (_, row)) in enumerate(latest.items(), start):
+            self._ids.append(vector_id)
+            self._metadata.append(row)
+            self._positions[vector_id] = label
+        self._graph.add_items(
+            np.stack([vector for vector, _ in latest.values()]),
+            np.arange(start, start + len(latest)),
+        )
+        self._size += len(latest)
+
+    def delete(self, vector_ids) -> int:
+        vector_ids = list(vector_ids)
+        removed = 0
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("delete", vector_ids))
+            for vector_id in vector_ids:
+                label = self._positions.pop(vector_id, None)
+                if label is not None:
+                    self._graph.mark_deleted(label)
+                    removed += 1
+        return removed
+
+    def search_many(self, vectors, limit: int, expr=None) -> List[List[Tuple[str, float, dict]]]:
+        if isinstance(expr, str):
+            raise ValueError("Local vector indexes take a VectorFilter, not a Milvus expression")
+        if not len(vectors):
+            return []
+        self.sync()
+        queries = np.stack([_normalize(vector) for vector in vectors])
+        with self._lock:
+            if limit <= 0 or not self._positions or queries.shape[1] != self._dimension:
+                return [[] for _ in queries]
+            limit = min(limit, len(self._positions))
+            self._graph.set_ef(max(self.ef_search, limit))
+            if expr:
+                return [self._search_filtered(query, limit, expr) for query in queries]
+            try:
+                labels, distances = self._graph.knn_query(queries, k=limit)
+            except RuntimeError:
+                # The graph could not reach ``limit`` live nodes (mostly tombstones).
+                return [self._search_exact(query, limit) for query in queries]
+            return [self._hits(*row) for row in zip(labels, distances)]
+
+    def _search_filtered(self, query: np.ndarray, limit: int, expr) -> List[Tuple[str, float, dict]]:
+        try:
+            labels, distances = self._graph.knn_query(
+                query,
+                k=limit,
+                num_threads=1,
+                filter=lambda label: expr.matches(self._metadata[label]),
+            )
+        except RuntimeError:
+            # Fewer than ``limit`` matching nodes were found; score the matches exactly.
+            return self._search_exact(query, limit, expr)
+        return self._hits(labels[0], distances[0])
+
+    def _search_exact(self, query: np.ndarray, limit: int, expr=None) -> List[Tuple[str, float, dict]]:
+        labels = [
+            label
+            for label in self._positions.values()
+            if not expr or expr.matches(self._metadata[label])
+        ]
+        if not labels:
+            return []
+        scores = np.asarray(self._graph.get_items(labels)) @ query
+        return [
+            (self._ids[labels[i]], float(scores[i]), self._metadata[labels[i]])
+            for i in np.argsort(-scores)[:limit].tolist()
+        ]
+
+    def _hits(self, labels: np.ndarray, distances: np.ndarray) -> List[Tuple[str, float, dict]]:
+        # hnswlib's "ip" distance is 1 - inner product.
+        return [
+            (self._ids[label], 1.0 - distance, self._metadata[label])
+            for label, distance in zip(labels.tolist(), distances.tolist())
+        ]
+
+    def compact(self) -> int:
+        """Rebuild the graph from live nodes, dropping tombstones.
+
+        Live rows are copied under the lock and the new graph is built without
+        it, so searches and writes continue meanwhile. Writes made during the
+        build are replayed onto the new graph before it is swapped in.
+        """
+        with self._compact_lock:
+            with self._lock:
+                removed = self.tombstones
+                if not removed:
+                    return 0
+                ids = list(self._positions)
+                labels = [self._positions[vector_id] for vector_id in ids]
+                vectors = np.asarray(self._graph.get_items(labels)) if labels else []
+                rows = [
+                    (vector_id, vector, self._metadata[label])
+                    for vector_id, vector, label in zip(ids, vectors, labels)
+                ]
+                self._journal = []
+            try:
+                rebuilt = self._spawn()
+                if rows:
+                    rebuilt._write(rows)
+            except BaseException:
+                with self._lock:
+                    self._journal = None
+                raise
+            with self._lock:
+                for operation, payload in self._journal:
+                    if operation == "upsert":
+                        rebuilt._write(payload)
+                    else:
+                        rebuilt.delete(payload)
+                self._journal = None
+                self._graph = rebuilt._graph
+                self._dimension = rebuilt._dimension
+                self._size = rebuilt._size
+                self._ids = rebuilt._ids
+                self._metadata = rebuilt._metadata
+                self._positions = rebuilt._positions
+        return removed
+
+    def maybe_compact(self) -> int:
+        if self._size and self.tombstones > self.compact_ratio * self._size:
+            return self.compact()
+        return 0
+
+    def _load(self) -> None:
+        if self.snapshot_path and self.restore(self.snapshot_path):
+            # Rows changed since the snapshot are picked up by the first sync.
+            self._loaded = True
+            return
+        self.load_from_db()
+        if self.snapshot_path:
+            self.save(self.snapshot_path)
+
+    def save(self, path: str) -> None:
+        """Write the graph to ``path`` and atomically swap it into place."""
+        staging = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        with self._lock:
+            if self._graph is not None:
+                self._graph.save_index(os.path.join(staging, _GRAPH_FILE))
+            live = set(self._positions.values())
+            meta = {
+                "m": self.m,
+                "backend": self.backend_id,
+                "dimension": self._dimension,
+                "ids": self._ids,
+                "metadata": self._metadata,
+                "deleted": [label for label in range(self._size) if label not in live],
+                "synced_at": self._synced_at.isoformat() if self._synced_at else None,
+            }
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as handle:
+                json.dump(meta, handle)
+
+        retired = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, retired)
+        os.replace(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def restore(self, path: str) -> bool:
+        """Load a snapshot written by :meth:`save`; False if unusable."""
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return False
+        # Snapshots from the earlier numpy graph have no "dimension" and are rebuilt.
+        if meta.get("m") != self.m or not meta.get("dimension") or not meta.get("ids"):
+            return False
+        if meta.get("backend") != self.backend_id:
+            return False
+        if self.dimension and meta["dimension"] != self.dimension:
+            return False
+        graph = hnswlib.Index(space="ip", dim=meta["dimension"])
+        try:
+            graph.load_index(os.path.join(path, _GRAPH_FILE), max_elements=len(meta["ids"]))
+        except (OSError, RuntimeError):
+            return False
+        deleted = set(meta["deleted"])
+        with self._lock:
+            self._reset()
+            self._graph = graph
+            self._dimension = meta["dimension"]
+            self._size = len(meta["ids"])
+            self._ids = meta["ids"]
+            self._metadata = meta["metadata"]
+            self._positions = {
+                vector_id: label
+                for label, vector_id in enumerate(self._ids)
+                if label not in deleted
+            }
+            self._synced_at = (
+                datetime.fromisoformat(meta["synced_at"]) if meta["synced_at"] else None
+            )
+        return True
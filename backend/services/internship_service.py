@@ -4,7 +4,7 @@ from datetime import datetime
 import pandas as pd
 from models import Internship
 from extensions import db
-from .embedding_service import encode_text
+from .embedding_service import encode_text, encode_texts
 
 class InternshipService:
     """Service for handling internship data processing and management."""
@@ -12,11 +12,21 @@ class InternshipService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
-    def process_internship_data(self, internship_data: Dict) -> Internship:
+    @staticmethod
+    def _embedding_text(internship_data: Dict) -> str:
+        description = internship_data.get('description', '')
+        requirements = ' '.join(internship_data.get('requirements', []))
+        skills = ' '.join(internship_data.get('skills', []))
+        return f"{internship_data.get('title', '')} {description} {requirements} {skills}"
+
+    def process_internship_data(
+        self, internship_data: Dict, embedding: Optional[List[float]] = None
+    ) -> Internship:
         """Process and store internship data from external sources.
         
         Args:
             internship_data: Dictionary containing internship details
+            embedding: Precomputed embedding; encoded on demand when omitted
             
         Returns:
             Internship: Created or updated internship object
@@ -28,27 +38,22 @@ class InternshipService:
                 source=internship_data.get('source')
             ).first()
 
-            # Prepare data for embedding
-            description = internship_data.get('description', '')
-            requirements = ' '.join(internship_data.get('requirements', []))
-            skills = ' '.join(internship_data.get('skills', []))
-            
-            # Combine text for embedding
-            text_to_embed = f"{internship_data.get('title', '')} {description} {requirements} {skills}"
+            if embedding is None:
+                embedding = encode_text(self._embedding_text(internship_data))
             
             if internship:
                 # Update existing internship
                 for key, value in internship_data.items():
                     if hasattr(internship, key):
                         setattr(internship, key, value)
-                internship.embedding = encode_text(text_to_embed)
+                internship.embedding = embedding
                 internship.updated_at = datetime.utcnow()
                 self.logger.info(f"Updated internship: {internship.id}")
             else:
                 # Create new internship
                 internship = Internship(
                     **internship_data,
-                    embedding=encode_text(text_to_embed),
+                    embedding=embedding,
                     created_at=datetime.utcnow(),
                     updated_at=datetime.utcnow()
                 )
@@ -96,6 +101,7 @@ class InternshipService:
         try:
             df = pd.read_csv(file_path)
             processed_count = 0
+            rows = []
             
             for _, row in df.iterrows():
                 internship_data = {
@@ -120,8 +126,13 @@ class InternshipService:
                         'women': row.get('women_quota', 0)
                     } if any(col in row for col in ['sc_quota', 'st_quota', 'obc_quota', 'ews_quota', 'women_quota']) else {}
                 }
-                
-                self.process_internship_data(internship_data)
+                rows.append(internship_data)
+
+            # Embed the whole upload in batches instead of once per row
+            vectors = encode_texts([self._embedding_text(data) for data in rows])
+            for index, internship_data in enumerate(rows):
+                embedding = vectors[index].tolist() if vectors.shape[1] else []
+                self.process_internship_data(internship_data, embedding=embedding)
                 processed_count += 1
                 
             db.session.commit()
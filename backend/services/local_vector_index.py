@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy.orm import undefer
+
+from backend.models import Job
+from backend.services.vector_filters import job_is_closed, job_vector_metadata_many
+
+
+def _normalize(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class LocalVectorIndex:
+    """Exact in-process vector search with the same interface as ``MilvusClient``.
+
+    Job embeddings are L2-normalized into one contiguous float32 matrix, so a
+    search is a single matrix-vector product followed by ``argpartition``
+    top-k. Scores are cosine similarities, matching Milvus' IP metric on
+    normalized vectors.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._last_sync_check = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadata: List[dict] = []
+        self._positions: Dict[str, int] = {}
+
+    @property
+    def collection(self) -> "LocalVectorIndex":
+        # MatchingService only checks that a collection is present.
+        return self
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, dimension: int, rows: int) -> None:
+        if self._matrix.shape[1] != dimension:
+            if self._size:
+                raise ValueError(
+                    f"vector has dimension {dimension}, index holds {self._matrix.shape[1]}"
+                )
+            self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        if rows <= self._matrix.shape[0]:
+            return
+        grown = np.zeros((max(rows, 2 * self._matrix.shape[0], 64), dimension), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def upsert(self, vector_id: str, vector, metadata: dict) -> Optional[str]:
+        if vector is None or not len(vector):
+            return None
+        vector = _normalize(vector)
+        with self._lock:
+            position = self._positions.get(vector_id)
+            if position is None:
+                self._reserve(vector.shape[0], self._size + 1)
+                position = self._size
+                self._size += 1
+                self._ids.append(vector_id)
+                self._metadata.append(metadata)
+                self._positions[vector_id] = position
+            else:
+                self._metadata[position] = metadata
+            self._matrix[position] = vector
+        return vector_id
+
+    def upsert_many(self, ids: Sequence[str], vectors, metadata: Sequence[dict]) -> int:
+        with self._lock:
+            return sum(
+                1
+                for vector_id, vector, row in zip(ids, vectors, metadata)
+                if self.upsert(vector_id, vector, row)
+            )
+
+    def flush(self) -> None:
+        # Rows are searchable as soon as they are upserted.
+        pass
+
+    def delete(self, vector_ids) -> int:
+        """Drop ``vector_ids`` by moving the last row into each freed slot."""
+        removed = 0
+        with self._lock:
+            for vector_id in vector_ids:
+                position = self._positions.pop(vector_id, None)
+                if position is None:
+                    continue
+                last = self._size - 1
+                if position != last:
+                    self._matrix[position] = self._matrix[last]
+                    self._ids[position] = self._ids[last]
+                    self._metadata[position] = self._metadata[last]
+                    self._positions[self._ids[position]] = position
+                self._ids.pop()
+                self._metadata.pop()
+                self._size -= 1
+                removed += 1
+        return removed
+
+    def scan(self, page_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Yield ``(id, fingerprint)`` pages of every live vector."""
+        with self._lock:
+            rows = [
+                (vector_id, self._metadata[position].get("fingerprint", ""))
+                for vector_id, position in self._positions.items()
+            ]
+        for start in range(0, len(rows), page_size):
+            yield rows[start : start + page_size]
+
+    def search(self, vector, limit: int, expr=None) -> List[Tuple[str, float, dict]]:
+        if vector is None or not len(vector):
+            return []
+        return self.search_many([vector], limit, expr)[0]
+
+    def search_many(self, vectors, limit: int, expr=None) -> List[List[Tuple[str, float, dict]]]:
+        """Score every query against the matrix in one matrix-matrix product.
+
+        ``expr`` may be a ``VectorFilter``; rows whose metadata it rejects are
+        skipped while walking down the ranking.
+        """
+        if isinstance(expr, str):
+            raise ValueError("Local vector indexes take a VectorFilter, not a Milvus expression")
+        if not len(vectors):
+            return []
+        self.sync()
+        queries = np.stack([_normalize(vector) for vector in vectors])
+        with self._lock:
+            if limit <= 0 or not self._size or queries.shape[1] != self._matrix.shape[1]:
+                return [[] for _ in queries]
+            scores = self._matrix[: self._size] @ queries.T
+            limit = min(limit, self._size)
+            if expr:
+                top = None
+            else:
+                top = np.argpartition(-scores, limit - 1, axis=0)[:limit]
+            results = []
+            for column in range(queries.shape[0]):
+                if top is None:
+                    ranked = np.argsort(-scores[:, column])
+                    rows = []
+                    for i in ranked.tolist():
+                        if expr.matches(self._metadata[i]):
+                            rows.append(i)
+                            if len(rows) == limit:
+                                break
+                else:
+                    rows = top[:, column]
+                    rows = rows[np.argsort(-scores[rows, column])]
+                results.append(
+                    [(self._ids[i], float(scores[i, column]), self._metadata[i]) for i in rows]
+                )
+            return results
+
+    def load_from_db(self) -> int:
+        """(Re)build the index from every job with a stored embedding."""
+        started = datetime.utcnow()
+        with self._lock:
+            self._reset()
+            count = self._upsert_jobs(Job.query)
+            self._loaded = True
+            self._synced_at = started
+        return count
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+
+    def _load(self) -> None:
+        self.load_from_db()
+
+    def sync(self) -> None:
+        """Pick up embeddings written by other processes since the last sync."""
+        if not self._loaded:
+            return
+        interval = current_app.config.get("VECTOR_INDEX_SYNC_SECONDS", 30)
+        if time.monotonic() - self._last_sync_check < interval:
+            return
+        self._last_sync_check = time.monotonic()
+        started = datetime.utcnow()
+        with self._lock:
+            query = Job.query
+            if self._synced_at is not None:
+                query = query.filter(Job.updated_at >= self._synced_at)
+            self._upsert_jobs(query)
+            self._synced_at = started
+
+    def _upsert_jobs(self, query, page_size: int = 2000) -> int:
+        count = 0
+        rows = query.filter(Job.embedding.isnot(None)).options(undefer(Job.embedding))
+        for offset in range(0, rows.count(), page_size):
+            page = rows.order_by(Job.id).offset(offset).limit(page_size).all()
+            jobs = [job for job in page if not job_is_closed(job)]
+            self.delete([job.id for job in page if job_is_closed(job)])
+            count += self.upsert_many(
+                [job.id for job in jobs],
+                [job.embedding for job in jobs],
+                job_vector_metadata_many(jobs),
+            )
+        return count
+
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, replace
 from typing import Dict, List, Optional
 
+import numpy as np
+from flask import current_app
+
 from backend.extensions import db
 from backend.models import Job, User
-from backend.services.embedding_service import encode_text
-from backend.services.milvus_client import MilvusClient
+from backend.services.embedding_service import encode_documents, user_embedding_text
+from backend.services.embedding_worker import EMBEDDING_PENDING
+from backend.services.partitioned_index import NATIONAL_PARTITION
 from backend.services.quota_service import quota_service
+from backend.services.vector_filters import VectorFilter
+from backend.services.vector_index import get_vector_index
 
 SOCIAL_PRIORITY = {
     "sc": 0.2,
@@ -31,23 +38,56 @@ class MatchResult:
 class MatchingService:
     def __init__(self):
         try:
-            self.milvus = MilvusClient()
+            self.vector_index = get_vector_index()
         except Exception:  # noqa: BLE001
-            self.milvus = None
+            self.vector_index = None
         self.quota_service = quota_service
 
     def _candidate_vector(self, user: User) -> List[float]:
-        if user.embedding:
-            return user.embedding
-        resume = user.resume_text or " ".join(user.skills or [])
-        user.embedding = encode_text(resume)
-        db.session.commit()
-        return user.embedding
-
-    def _vector_matches(self, vector: List[float], top_k: int):
-        if not vector or not self.milvus or not self.milvus.collection:
-            return []
-        return self.milvus.search(vector, top_k)
+        return self._candidate_vectors([user])[user.id]
+
+    def _candidate_vectors(self, users: List[User]) -> Dict[str, List[float]]:
+        """Stored vectors for ``users``, encoding the missing ones in one batch."""
+        vectors: Dict[str, List[float]] = {}
+        missing = []
+        for user in users:
+            if user.embedding is not None and len(user.embedding):
+                vectors[user.id] = user.embedding
+            elif user.embedding_status == EMBEDDING_PENDING:
+                # The background worker will fill this in; rank without a vector meanwhile.
+                vectors[user.id] = []
+            else:
+                missing.append(user)
+        if missing:
+            encoded = encode_documents([user_embedding_text(user) for user in missing])
+            for user, vector in zip(missing, encoded):
+                vector = vector if encoded.shape[1] else []
+                user.embedding = vector
+                vectors[user.id] = vector
+            db.session.commit()
+        return vectors
+
+    def _vector_matches(
+        self, vector: List[float], top_k: int, filters: Optional[VectorFilter] = None
+    ):
+        return self._vector_matches_many([vector], top_k, filters)[0]
+
+    def _vector_matches_many(
+        self,
+        vectors: List[List[float]],
+        top_k: int,
+        filters: Optional[VectorFilter] = None,
+    ):
+        searchable = [position for position, vector in enumerate(vectors) if len(vector)]
+        matches = [[] for _ in vectors]
+        if not searchable or not self.vector_index or not self.vector_index.collection:
+            return matches
+        hits = self.vector_index.search_many(
+            [vectors[position] for position in searchable], top_k, filters or None
+        )
+        for position, found in zip(searchable, hits):
+            matches[position] = found
+        return matches
 
     def _score_job(
         self,
@@ -107,50 +147,190 @@ class MatchingService:
             diagnostics=diagnostics,
         )
 
-    def find_matches(self, candidate: User, top_k: int = 10):
-        vector = self._candidate_vector(candidate)
-        matches = self._vector_matches(vector, top_k)
-        jobs = []
-        if matches:
-            ids = [match[0] for match in matches]
-            id_to_hit = {match[0]: match for match in matches}
-            for job in Job.query.filter(Job.id.in_(ids)).all():
-                hit = id_to_hit.get(job.id)
-                quota_snapshot = self.quota_service.reservation_snapshot(job)
-                jobs.append(
-                    self._score_job(
-                        candidate, job, hit[1] if hit else None, quota_snapshot
-                    )
-                )
-        else:
-            q = Job.query
-            if candidate.location:
-                q = q.filter(Job.job_location.ilike(f"%{candidate.location}%"))
-            pool_size = max(top_k * 10, 50)
-            pool = q.order_by(Job.created_at.desc()).limit(pool_size).all()
+    def _score_pool(
+        self,
+        candidate: User,
+        jobs: List[Job],
+        vector_scores: List[Optional[float]],
+        snapshots: List[Optional[Dict[str, Dict[str, int]]]],
+        top_k: int,
+    ) -> List[MatchResult]:
+        """Rank a whole pool with array arithmetic; reasons are built for the top ``top_k`` only.
+
+        Every component of :meth:`_score_job` is computed for all jobs at once
+        and summed in the same order, so scores and ranking are identical to
+        scoring the jobs one by one.
+        """
+        if not jobs:
+            return []
+        count = len(jobs)
+        scores = np.array([score or 0.0 for score in vector_scores], dtype=np.float64)
+
+        category = (candidate.social_category or "").lower()
+        if category:
+            has_snapshot = np.array([bool(snapshot) for snapshot in snapshots])
+            open_slots = np.array(
+                [(snapshot or {}).get("remaining", {}).get(category, 0) > 0 for snapshot in snapshots]
+            )
+            has_targets = np.array([bool((snapshot or {}).get("targets")) for snapshot in snapshots])
+            scores += np.where(
+                has_snapshot & open_slots, 0.25, np.where(has_snapshot & has_targets, -0.05, 0.0)
+            )
+            scores += np.where(has_snapshot, 0.0, SOCIAL_PRIORITY.get(category, 0.1))
+
+        if candidate.location:
+            locations = np.array([(job.job_location or "").lower() for job in jobs], dtype=str)
+            scores += np.where(np.char.find(locations, candidate.location.lower()) >= 0, 0.1, 0.0)
+
+        # Region bonuses depend on the job only through its state.
+        states = np.array([job.state_priority or "" for job in jobs], dtype=str)
+        _, first, inverse = np.unique(states, return_index=True, return_inverse=True)
+        region = np.array(
+            [self.quota_service.region_bonus(candidate, jobs[position])[0] for position in first],
+            dtype=np.float64,
+        )
+        scores += region[inverse.ravel()]
+
+        skills = set(candidate.skills or [])
+        if skills:
+            job_skills = [list(dict.fromkeys(job.skills_required or [])) for job in jobs]
+            owners = np.repeat(np.arange(count), [len(names) for names in job_skills])
+            matched = np.fromiter(
+                (skill in skills for names in job_skills for skill in names),
+                dtype=bool,
+                count=len(owners),
+            )
+            overlap = np.bincount(owners[matched], minlength=count)
+            scores += np.where(overlap > 0, np.minimum(0.2, 0.05 * overlap), 0.0)
+
+        # Rank on the same rounded scores MatchResult carries.
+        rounded = np.array([round(score, 3) for score in scores.tolist()])
+        top = np.argsort(-rounded, kind="stable")[:top_k]
+        return [
+            self._score_job(candidate, jobs[position], vector_scores[position], snapshots[position])
+            for position in top.tolist()
+        ]
+
+    def _state_matches(
+        self,
+        candidates: List[User],
+        vectors: List[List[float]],
+        top_k: int,
+        filters: VectorFilter,
+        fetch: Optional[int] = None,
+    ):
+        """Search each candidate's state plus national jobs, topping up nationwide.
+
+        With state partitions this keeps most queries inside one small
+        partition; candidates without a state, or whose state has fewer than
+        ``top_k`` matching jobs, are searched across every partition. Each
+        search asks for ``fetch`` hits, which defaults to ``top_k``.
+        """
+        fetch = fetch or top_k
+        if filters.states:
+            return self._vector_matches_many(vectors, fetch, filters)
+        matches = [[] for _ in candidates]
+        by_state: Dict[str, List[int]] = {}
+        for position, candidate in enumerate(candidates):
+            state = (candidate.state or "").strip().lower()
+            if state:
+                by_state.setdefault(state, []).append(position)
+        for state, positions in by_state.items():
+            scoped = replace(filters, states=[state, NATIONAL_PARTITION])
+            found = self._vector_matches_many([vectors[p] for p in positions], fetch, scoped)
+            for position, hits in zip(positions, found):
+                matches[position] = hits
+        short = [
+            position
+            for position, hits in enumerate(matches)
+            if len(hits) < top_k and len(vectors[position])
+        ]
+        if short:
+            found = self._vector_matches_many([vectors[p] for p in short], fetch, filters)
+            for position, hits in zip(short, found):
+                seen = {hit[0] for hit in matches[position]}
+                extra = [hit for hit in hits if hit[0] not in seen]
+                matches[position] = matches[position] + extra[: fetch - len(matches[position])]
+        return matches
+
+    def _fallback_pool(
+        self, candidate: User, top_k: int, filters: Optional[VectorFilter] = None
+    ) -> List[Job]:
+        base = filters.apply(Job.query) if filters else Job.query
+        q = base
+        if candidate.location:
+            q = q.filter(Job.job_location.ilike(f"%{candidate.location}%"))
+        pool_size = max(top_k * 10, 50)
+        pool = q.order_by(Job.created_at.desc()).limit(pool_size).all()
+        if not pool:
+            pool = (
+                base.order_by(Job.created_at.desc())
+                .limit(pool_size)
+                .all()
+            )
+        return pool
+
+    def find_matches(
+        self, candidate: User, top_k: int = 10, filters: Optional[VectorFilter] = None
+    ):
+        return self.find_matches_many([candidate], top_k, filters)[candidate.id]
+
+    def find_matches_many(
+        self,
+        candidates: List[User],
+        top_k: int = 10,
+        filters: Optional[VectorFilter] = None,
+    ) -> Dict[str, List[MatchResult]]:
+        """Rank jobs for every candidate with one ANN call, one job query and one quota query.
+
+        ``filters`` are pushed into the vector search, so ``top_k`` hits all
+        satisfy them. They default to jobs whose deadline has not passed. The
+        search over-fetches by ``VECTOR_SEARCH_OVERFETCH`` so vectors of jobs
+        deleted elsewhere, which the job query drops, do not shorten the page.
+        """
+        if filters is None:
+            filters = VectorFilter.open_now()
+        fetch = max(top_k, math.ceil(top_k * current_app.config.get("VECTOR_SEARCH_OVERFETCH", 1.5)))
+        vectors = self._candidate_vectors(candidates)
+        all_matches = self._state_matches(
+            candidates, [vectors[candidate.id] for candidate in candidates], top_k, filters, fetch
+        )
+        ids = {match[0] for matches in all_matches for match in matches}
+        jobs_by_id = (
+            {job.id: job for job in Job.query.filter(Job.id.in_(ids)).all()} if ids else {}
+        )
+        pools = []
+        for candidate, matches in zip(candidates, all_matches):
+            pool = [(jobs_by_id[job_id], score) for job_id, score, _ in matches if job_id in jobs_by_id]
             if not pool:
-                pool = (
-                    Job.query.order_by(Job.created_at.desc())
-                    .limit(pool_size)
-                    .all()
-                )
-            for job in pool:
-                quota_snapshot = self.quota_service.reservation_snapshot(job)
-                jobs.append(self._score_job(candidate, job, None, quota_snapshot))
-
-        jobs.sort(key=lambda item: item.score, reverse=True)
-        return jobs[:top_k]
+                pool = [(job, None) for job in self._fallback_pool(candidate, top_k, filters)]
+            pools.append(pool)
+        pool_jobs = {job.id: job for pool in pools for job, _ in pool}
+        snapshots = self.quota_service.reservation_snapshots(list(pool_jobs.values()))
+
+        results: Dict[str, List[MatchResult]] = {}
+        for candidate, pool in zip(candidates, pools):
+            jobs = [job for job, _ in pool]
+            results[candidate.id] = self._score_pool(
+                candidate,
+                jobs,
+                [score for _, score in pool],
+                [snapshots[job.id] for job in jobs],
+                top_k,
+            )
+        return results
 
     def score_single(self, candidate: User, job: Job) -> MatchResult:
         vector = self._candidate_vector(candidate)
         vector_score = None
-        if vector and job.embedding:
+        job_vector = job.embedding
+        if len(vector) and job_vector is not None and len(job_vector) == len(vector):
             # cosine similarity approximation
-            dot = sum(a * b for a, b in zip(vector, job.embedding))
-            norm_candidate = sum(a * a for a in vector) ** 0.5
-            norm_job = sum(a * a for a in job.embedding) ** 0.5
+            candidate_vector = np.asarray(vector, dtype=np.float32)
+            norm_candidate = float(np.linalg.norm(candidate_vector))
+            norm_job = float(np.linalg.norm(job_vector))
             if norm_candidate and norm_job:
-                vector_score = dot / (norm_candidate * norm_job)
+                vector_score = float(candidate_vector @ job_vector) / (norm_candidate * norm_job)
         quota_snapshot = self.quota_service.reservation_snapshot(job)
         return self._score_job(candidate, job, vector_score, quota_snapshot)
 
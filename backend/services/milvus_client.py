@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 from flask import current_app
 
+from backend.services.embedding_service import embedding_dimension
+
 try:
     from pymilvus import (
         Collection,
@@ -13,9 +21,18 @@ try:
         connections,
         utility,
     )
+    from pymilvus.exceptions import ConnectionNotExistException, MilvusUnavailableException
     _HAS_PYMILVUS = True
+    # Failures a fresh connection can fix: a dropped channel or an unavailable server.
+    _CONNECTION_ERRORS = (
+        ConnectionError,
+        TimeoutError,
+        ConnectionNotExistException,
+        MilvusUnavailableException,
+    )
 except (ImportError, ModuleNotFoundError):
     _HAS_PYMILVUS = False
+    _CONNECTION_ERRORS = (ConnectionError, TimeoutError)
     Collection = None
     CollectionSchema = None
     DataType = None
@@ -23,92 +40,384 @@ except (ImportError, ModuleNotFoundError):
     connections = None
     utility = None
 
+logger = logging.getLogger(__name__)
+
+# Typed scalar fields stored next to each job vector: name -> (type, empty value).
+# They are copied from the JSON metadata on upsert so filters can use indexes.
+SCALAR_FIELDS = {
+    "state": ("varchar", ""),
+    "city": ("varchar", ""),
+    "job_type": ("varchar", ""),
+    "status": ("varchar", ""),
+    "deadline": ("int64", 0),
+    "capacity_open": ("int64", 0),
+}
+
+
+# Supported vector index types: build parameters and search parameters, with defaults.
+INDEX_TYPES = {
+    "FLAT": ({}, {}),
+    "IVF_FLAT": ({"nlist": 1024}, {"nprobe": 16}),
+    "IVF_SQ8": ({"nlist": 1024}, {"nprobe": 16}),
+    "IVF_PQ": ({"nlist": 1024, "m": 16, "nbits": 8}, {"nprobe": 16}),
+    "HNSW": ({"M": 16, "efConstruction": 200}, {"ef": 64}),
+}
+
+
+def _json_setting(config, key: str) -> dict:
+    raw = config.get(key) or {}
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as exc:
+            raise ValueError(f"{key} must be a JSON object: {exc}") from None
+    if not isinstance(raw, dict):
+        raise ValueError(f"{key} must be a JSON object")
+    return raw
+
+
+def index_settings(config, dimension: Optional[int] = None) -> Tuple[str, dict, dict]:
+    """Validated ``(index_type, index_params, search_params)`` from the config.
+
+    Raises ValueError for an unknown index type, parameters that do not
+    belong to it, non-positive values, or an ``IVF_PQ`` ``m`` that does not
+    divide ``dimension``.
+    """
+    index_type = str(config.get("MILVUS_INDEX_TYPE") or "IVF_FLAT").upper()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown MILVUS_INDEX_TYPE {index_type!r}; expected one of {', '.join(INDEX_TYPES)}"
+        )
+    build_defaults, search_defaults = INDEX_TYPES[index_type]
+    resolved = []
+    for key, defaults in (
+        ("MILVUS_INDEX_PARAMS", build_defaults),
+        ("MILVUS_SEARCH_PARAMS", search_defaults),
+    ):
+        params = _json_setting(config, key)
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"{key} has {sorted(unknown)} which {index_type} does not accept")
+        for name, value in params.items():
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                raise ValueError(f"{key}.{name} must be a positive integer")
+        resolved.append({**defaults, **params})
+    index_params, search_params = resolved
+    if index_type == "IVF_PQ" and dimension and dimension % index_params["m"]:
+        raise ValueError(f"IVF_PQ m={index_params['m']} must divide the vector dimension {dimension}")
+    return index_type, index_params, search_params
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for errors a fresh connection can fix: a dropped or unavailable server."""
+    if isinstance(error, _CONNECTION_ERRORS):
+        return True
+    # grpc.RpcError exposes its status as a method.
+    code = getattr(error, "code", None)
+    return callable(code) and getattr(code(), "name", None) == "UNAVAILABLE"
+
 
 class MilvusClient:
-    def __init__(self):
+    """Handle to the jobs collection that connects lazily and reconnects.
+
+    ``connections.connect``, the ``has_collection`` check and
+    ``collection.load()`` run once, on first use, instead of on every
+    construction. An operation that fails because the connection dropped or
+    the server is unavailable is retried once on a fresh connection; other
+    errors are raised as they are. While Milvus is unreachable, ``collection`` returns None
+    and reconnects are attempted at most every ``retry_interval`` seconds.
+    """
+
+    def __init__(self, retry_interval: float = 30.0):
         self.uri = current_app.config.get("MILVUS_URI")
         self.token = current_app.config.get("MILVUS_TOKEN")
         self.collection_name = current_app.config.get("MILVUS_COLLECTION")
+        self.num_partitions = current_app.config.get("MILVUS_NUM_PARTITIONS", 64)
+        self.index_type, self.index_params, self.search_params = index_settings(current_app.config)
+        self.dimension: Optional[int] = current_app.config.get("MILVUS_DIMENSION") or None
+        self._app = current_app._get_current_object()
+        self.retry_interval = retry_interval
+        self.alias = f"applicantaura-{id(self)}"
         self._collection: Optional[Collection] = None
-        if not _HAS_PYMILVUS:
-            return
-        if self.uri:
+        self._typed_fields: List[str] = []
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._retry_at = 0.0
+
+    def _connect(self) -> Optional[Collection]:
+        if not _HAS_PYMILVUS or not self.uri:
+            return None
+        if self._pid != os.getpid():
+            # gRPC channels do not survive fork; reconnect in each worker.
+            self._collection = None
+            self._pid = os.getpid()
+        if self._collection is not None or time.monotonic() < self._retry_at:
+            return self._collection
+        with self._lock:
+            if self._collection is None:
+                try:
+                    connections.connect(alias=self.alias, uri=self.uri, token=self.token)
+                    collection = self._ensure_collection()
+                    if collection is not None:
+                        collection.load()
+                    self._collection = collection
+                except Exception:  # noqa: BLE001
+                    logger.warning("Milvus is unavailable at %s", self.uri, exc_info=True)
+                if self._collection is None:
+                    self._retry_at = time.monotonic() + self.retry_interval
+        return self._collection
+
+    def reconnect(self) -> Optional[Collection]:
+        with self._lock:
+            self._collection = None
+            self._retry_at = 0.0
             try:
-                connections.connect(alias="default", uri=self.uri, token=self.token)
-                self._ensure_collection()
-            except Exception:
+                connections.disconnect(self.alias)
+            except Exception:  # noqa: BLE001
                 pass
+        return self._connect()
 
-    def _ensure_collection(self):
-        if not _HAS_PYMILVUS:
-            return
+    def _call(self, operation):
+        collection = self.collection
+        if collection is None:
+            return None
         try:
-            if utility.has_collection(self.collection_name):
-                self._collection = Collection(self.collection_name)
-                return
-        except Exception:
-            return
+            return operation(collection)
+        except Exception as error:  # noqa: BLE001
+            if not _is_connection_error(error):
+                raise
+            logger.warning("Milvus call failed; reconnecting", exc_info=True)
+            collection = self.reconnect()
+            if collection is None:
+                raise
+            return operation(collection)
 
-        try:
-            fields = [
-                FieldSchema(
-                    name="id",
-                    dtype=DataType.VARCHAR,
-                    is_primary=True,
-                    max_length=64,
-                    auto_id=False,
-                ),
-                FieldSchema(
-                    name="vector",
-                    dtype=DataType.FLOAT_VECTOR,
-                    dim=768,
-                ),
-                FieldSchema(
-                    name="metadata",
-                    dtype=DataType.JSON,
-                ),
-            ]
-            schema = CollectionSchema(fields=fields, description="ApplicantAura jobs")
-            self._collection = Collection(name=self.collection_name, schema=schema)
-            self._collection.create_index(
-                field_name="vector",
-                index_params={
-                    "index_type": "IVF_FLAT",
-                    "metric_type": "IP",
-                    "params": {"nlist": 1536},
-                },
+    def _vector_dimension(self) -> Optional[int]:
+        """MILVUS_DIMENSION, or the dimension of the active embedding backend."""
+        if not self.dimension:
+            with self._app.app_context():
+                self.dimension = embedding_dimension()
+        return self.dimension
+
+    def _ensure_collection(self) -> Optional[Collection]:
+        dimension = self._vector_dimension()
+        if utility.has_collection(self.collection_name, using=self.alias):
+            collection = Collection(self.collection_name, using=self.alias)
+            for field in collection.schema.fields:
+                existing = (getattr(field, "params", None) or {}).get("dim")
+                if field.name == "vector" and dimension and existing and int(existing) != dimension:
+                    logger.error(
+                        "Milvus collection %s stores %s-dimensional vectors but the embedding "
+                        "backend produces %s; recreate it or point MILVUS_COLLECTION elsewhere",
+                        self.collection_name,
+                        existing,
+                        dimension,
+                    )
+                    return None
+            # Collections created before the typed fields existed filter on JSON paths.
+            names = {field.name for field in collection.schema.fields}
+            self._typed_fields = [name for name in SCALAR_FIELDS if name in names]
+            if len(self._typed_fields) < len(SCALAR_FIELDS):
+                logger.warning(
+                    "Milvus collection %s has no typed scalar fields; recreate it to index filters",
+                    self.collection_name,
+                )
+            return collection
+        if not dimension:
+            logger.warning("Embedding backend unavailable; cannot size Milvus collection yet")
+            return None
+        index_settings(self._app.config, dimension)
+
+        fields = [
+            FieldSchema(
+                name="id",
+                dtype=DataType.VARCHAR,
+                is_primary=True,
+                max_length=64,
+                auto_id=False,
+            ),
+            FieldSchema(
+                name="vector",
+                dtype=DataType.FLOAT_VECTOR,
+                dim=dimension,
+            ),
+            FieldSchema(
+                name="metadata",
+                dtype=DataType.JSON,
+            ),
+        ]
+        for name, (kind, _) in SCALAR_FIELDS.items():
+            if kind == "varchar":
+                # state is the partition key: rows are routed by state and a
+                # ``state in [...]`` filter only searches the matching partitions.
+                fields.append(
+                    FieldSchema(
+                        name=name,
+                        dtype=DataType.VARCHAR,
+                        max_length=128,
+                        is_partition_key=name == "state",
+                    )
+                )
+            else:
+                fields.append(FieldSchema(name=name, dtype=DataType.INT64))
+        schema = CollectionSchema(fields=fields, description="ApplicantAura jobs")
+        collection = Collection(
+            name=self.collection_name,
+            schema=schema,
+            using=self.alias,
+            num_partitions=self.num_partitions,
+        )
+        collection.create_index(
+            field_name="vector",
+            index_params={
+                "index_type": self.index_type,
+                "metric_type": "IP",
+                "params": self.index_params,
+            },
+        )
+        for name, (kind, _) in SCALAR_FIELDS.items():
+            collection.create_index(
+                field_name=name,
+                index_params={"index_type": "INVERTED" if kind == "varchar" else "STL_SORT"},
             )
-        except Exception:
-            pass
+        self._typed_fields = list(SCALAR_FIELDS)
+        return collection
 
     @property
     def collection(self) -> Optional[Collection]:
-        return self._collection
+        return self._connect()
 
     def upsert(
         self, vector_id: str, vector: List[float], metadata: dict
     ) -> Optional[str]:
-        if not self.collection or not vector:
+        if vector is None or not len(vector):
             return None
-        self.collection.upsert([[vector_id], [vector], [metadata]])
-        self.collection.flush()
-        return vector_id
+        written = self.upsert_many([vector_id], [vector], [metadata])
+        return vector_id if written else None
+
+    def upsert_many(
+        self, ids: Sequence[str], vectors, metadata: Sequence[dict]
+    ) -> int:
+        """Upsert one column-major batch without sealing segments.
+
+        Milvus serves unflushed rows from growing segments, so callers only
+        need :meth:`flush` at the end of a bulk import.
+        """
+        if not len(ids):
+            return 0
+        columns = [
+            list(ids),
+            np.asarray(vectors, dtype=np.float32).tolist(),
+            list(metadata),
+        ]
+
+        def write(collection):
+            typed = [
+                [row.get(name, SCALAR_FIELDS[name][1]) for row in metadata]
+                for name in self._typed_fields
+            ]
+            return collection.upsert(columns + typed)
+
+        result = self._call(write)
+        return len(ids) if result is not None else 0
+
+    def flush(self) -> None:
+        self._call(lambda collection: collection.flush())
+
+    def delete(self, vector_ids) -> int:
+        vector_ids = list(vector_ids)
+        if not vector_ids:
+            return 0
+        expr = f"id in {json.dumps(vector_ids)}"
+        result = self._call(lambda collection: collection.delete(expr))
+        return len(vector_ids) if result is not None else 0
+
+    def scan(self, page_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Yield ``(id, fingerprint)`` pages of every stored vector."""
+        iterator = self._call(
+            lambda collection: collection.query_iterator(
+                batch_size=page_size, expr='id != ""', output_fields=["metadata"]
+            )
+        )
+        if iterator is None:
+            return
+        try:
+            while True:
+                page = iterator.next()
+                if not page:
+                    break
+                yield [
+                    (row["id"], (row.get("metadata") or {}).get("fingerprint", ""))
+                    for row in page
+                ]
+        finally:
+            iterator.close()
 
     def search(
-        self, vector: List[float], limit: int
+        self, vector: List[float], limit: int, expr=None
     ) -> List[Tuple[str, float, dict]]:
-        if not self.collection or not vector:
+        if vector is None or not len(vector):
             return []
-        res = self.collection.search(
-            data=[vector],
-            anns_field="vector",
-            param={"metric_type": "IP", "params": {"nprobe": 16}},
-            limit=limit,
-            output_fields=["metadata"],
-        )
-        matches = []
-        for hit in res[0]:
-            matches.append((hit.id, hit.score, hit.entity.get("metadata", {})))
-        return matches
+        return self.search_many([vector], limit, expr)[0]
+
+    def search_many(
+        self, vectors, limit: int, expr=None
+    ) -> List[List[Tuple[str, float, dict]]]:
+        """Run one ANN request for several query vectors; one hit list per vector.
+
+        ``expr`` is a Milvus boolean expression or a ``VectorFilter``, which is
+        rendered against the typed fields this collection actually has.
+        """
+        if not len(vectors):
+            return []
+        data = np.asarray(vectors, dtype=np.float32).tolist()
+
+        def run(collection):
+            condition = expr.to_expr(self._typed_fields) if hasattr(expr, "to_expr") else expr
+            return collection.search(
+                data=data,
+                anns_field="vector",
+                param={"metric_type": "IP", "params": self.search_params},
+                limit=limit,
+                expr=condition or None,
+                output_fields=["metadata"],
+            )
+
+        res = self._call(run)
+        if res is None:
+            return [[] for _ in data]
+        return [
+            [(hit.id, hit.score, hit.entity.get("metadata", {})) for hit in hits]
+            for hits in res
+        ]
 
 
+class Milvus:
+    """Flask extension sharing one :class:`MilvusClient` per process."""
+
+    def __init__(self):
+        self._client: Optional[MilvusClient] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        # Fail at startup rather than on the first search after a bad deploy.
+        index_settings(app.config, app.config.get("MILVUS_DIMENSION") or None)
+        app.extensions["milvus"] = self
+
+    def check_dimension(self, app, dimension: Optional[int]) -> None:
+        """Re-validate the index settings against the embedding backend's dimension.
+
+        Without ``MILVUS_DIMENSION``, :meth:`init_app` cannot check that an
+        ``IVF_PQ`` ``m`` divides the dimension; the embedding preload and
+        warm-up paths call this once the backend is loaded.
+        """
+        if dimension and not app.config.get("MILVUS_DIMENSION"):
+            index_settings(app.config, dimension)
+
+    @property
+    def client(self) -> MilvusClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = MilvusClient()
+        return self._client
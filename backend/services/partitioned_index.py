@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from backend.services.local_vector_index import LocalVectorIndex
+
+# Jobs without a state (remote, pan-India) live here and are searched for everyone.
+NATIONAL_PARTITION = ""
+
+
+def partition_name(metadata: dict) -> str:
+    return (metadata.get("state") or NATIONAL_PARTITION).lower()
+
+
+class PartitionedIndex(LocalVectorIndex):
+    """Routes job vectors to one child index per state.
+
+    A search whose filter names states only visits those partitions, so a
+    candidate's query scans their own state plus :data:`NATIONAL_PARTITION`
+    instead of every job. Unfiltered searches fan out to all partitions and
+    merge the per-partition top-k by score. ``factory`` builds the children,
+    either exact or HNSW indexes.
+    """
+
+    def __init__(self, factory: Callable[[], LocalVectorIndex], snapshot_path: str = None):
+        self._factory = factory
+        self.snapshot_path = snapshot_path
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._partitions: Dict[str, LocalVectorIndex] = {}
+        self._partition_of: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return sum(len(partition) for partition in self._partitions.values())
+
+    @property
+    def partitions(self) -> Dict[str, int]:
+        return {name: len(partition) for name, partition in self._partitions.items()}
+
+    def _partition(self, name: str) -> LocalVectorIndex:
+        partition = self._partitions.get(name)
+        if partition is None:
+            partition = self._partitions[name] = self._factory()
+        return partition
+
+    def upsert(self, vector_id: str, vector, metadata: dict):
+        name = partition_name(metadata)
+        with self._lock:
+            previous = self._partition_of.get(vector_id)
+            if previous is not None and previous != name:
+                # The job moved state; drop it from its old partition.
+                self._partitions[previous].delete([vector_id])
+                del self._partition_of[vector_id]
+            result = self._partition(name).upsert(vector_id, vector, metadata)
+            if result:
+                self._partition_of[vector_id] = name
+            return result
+
+    def delete(self, vector_ids) -> int:
+        removed = 0
+        with self._lock:
+            for vector_id in vector_ids:
+                name = self._partition_of.pop(vector_id, None)
+                if name is not None:
+                    removed += self._partitions[name].delete([vector_id])
+        return removed
+
+    def scan(self, page_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        with self._lock:
+            partitions = list(self._partitions.values())
+        for partition in partitions:
+            yield from partition.scan(page_size)
+
+    def search_many(self, vectors, limit: int, expr=None) -> List[List[Tuple[str, float, dict]]]:
+        if isinstance(expr, str):
+            raise ValueError("Local vector indexes take a VectorFilter, not a Milvus expression")
+        self.sync()
+        with self._lock:
+            if expr and expr.states:
+                names = {state.lower() for state in expr.states}
+                partitions = [self._partitions[name] for name in names if name in self._partitions]
+            else:
+                partitions = list(self._partitions.values())
+        merged: List[list] = [[] for _ in vectors]
+        for partition in partitions:
+            for hits, found in zip(merged, partition.search_many(vectors, limit, expr)):
+                hits.extend(found)
+        return [sorted(hits, key=lambda hit: hit[1], reverse=True)[:limit] for hits in merged]
+
+    def _children(self, method: str) -> List[LocalVectorIndex]:
+        with self._lock:
+            return [
+                partition for partition in self._partitions.values() if hasattr(partition, method)
+            ]
+
+    def compact(self) -> int:
+        # Only the partition list is read under the lock. Each child rebuilds
+        # its graph off its own lock, so searches continue during compaction.
+        return sum(partition.compact() for partition in self._children("compact"))
+
+    def maybe_compact(self) -> int:
+        return sum(partition.maybe_compact() for partition in self._children("maybe_compact"))
+
+    @property
+    def tombstones(self) -> int:
+        return sum(getattr(partition, "tombstones", 0) for partition in self._partitions.values())
+
+    def _load(self) -> None:
+        if self.snapshot_path and self.restore(self.snapshot_path):
+            self._loaded = True
+            return
+        self.load_from_db()
+        if self.snapshot_path:
+            self.save(self.snapshot_path)
+
+    def save(self, path: str) -> None:
+        """Snapshot every partition into its own subdirectory of ``path``."""
+        with self._lock:
+            directories = {}
+            os.makedirs(path, exist_ok=True)
+            for position, (name, partition) in enumerate(sorted(self._partitions.items())):
+                directories[name] = f"p{position}"
+                partition.save(os.path.join(path, directories[name]))
+            meta = {
+                "partitions": directories,
+                "synced_at": self._synced_at.isoformat() if self._synced_at else None,
+            }
+            staging = os.path.join(path, "partitions.json.tmp")
+            with open(staging, "w", encoding="utf-8") as handle:
+                json.dump(meta, handle)
+            os.replace(staging, os.path.join(path, "partitions.json"))
+
+    def restore(self, path: str) -> bool:
+        try:
+            with open(os.path.join(path, "partitions.json"), encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return False
+        partitions = {}
+        for name, directory in meta["partitions"].items():
+            partition = self._factory()
+            if not hasattr(partition, "restore") or not partition.restore(
+                os.path.join(path, directory)
+            ):
+                return False
+            partitions[name] = partition
+        with self._lock:
+            self._partitions = partitions
+            self._partition_of = {
+                vector_id: name
+                for name, partition in partitions.items()
+                for vector_id in partition._positions
+            }
+            self._synced_at = (
+                datetime.fromisoformat(meta["synced_at"]) if meta["synced_at"] else None
+            )
+        return bool(partitions)
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import math
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 
 from backend.extensions import db
-from backend.models import Application, Job, User
+from backend.models import Application, Job, JobQuotaCounter, User
+
+logger = logging.getLogger(__name__)
 
 AUDIT_STATUSES = {"matched", "selected"}
 
@@ -19,6 +24,10 @@ class QuotaService:
 
     def __init__(self):
         self._config = self._load_config()
+        # Stored job targets computed from another version of the config are ignored.
+        self.config_version = hashlib.sha256(
+            json.dumps(self._config, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
 
     @staticmethod
     @lru_cache(maxsize=1)
@@ -39,14 +48,50 @@ class QuotaService:
         return self._config.get("defaultRegionBonus", {})
 
     def reservation_targets(self, job: Job) -> Dict[str, int]:
-        quota_source = job.reservation_quota or {}
-        state_config = self._state_config(job.state_priority)
+        """Targets stored on ``job`` when current, otherwise computed from its quota."""
+        stored = getattr(job, "quota_targets", None)
+        if stored is not None and getattr(job, "quota_targets_version", None) == self.config_version:
+            return dict(stored)
+        return self.compute_targets(job)
+
+    def compute_targets(self, job: Job) -> Dict[str, int]:
+        quota = json.dumps(job.reservation_quota or {}, sort_keys=True)
+        return dict(self._normalized_targets(job.capacity, job.state_priority, quota))
+
+    def store_targets(self, job: Job) -> None:
+        """Stamp ``job`` with its targets; call whenever capacity, state or quota change."""
+        job.quota_targets = self.compute_targets(job)
+        job.quota_targets_version = self.config_version
+
+    def refresh_stored_targets(self, page_size: int = 1000) -> int:
+        """Restamp every job whose stored targets are missing or from another config version."""
+        stale = Job.query.filter(
+            or_(Job.quota_targets_version.is_(None), Job.quota_targets_version != self.config_version)
+        )
+        refreshed = 0
+        while True:
+            # Restamped jobs drop out of the filter, so always take the first page.
+            jobs = stale.order_by(Job.id).limit(page_size).all()
+            if not jobs:
+                return refreshed
+            for job in jobs:
+                self.store_targets(job)
+            db.session.commit()
+            refreshed += len(jobs)
+
+    @lru_cache(maxsize=4096)
+    def _normalized_targets(
+        self, capacity: int | None, state: str | None, quota: str
+    ) -> Tuple[Tuple[str, int], ...]:
+        """Targets for one (capacity, state, quota) combination, computed once."""
+        quota_source = json.loads(quota)
+        state_config = self._state_config(state)
         reservation = state_config.get("reservation", quota_source) or quota_source
 
         if not reservation:
             reservation = self.default_reservation()
 
-        capacity = max(job.capacity or 1, 1)
+        capacity = max(capacity or 1, 1)
         normalized: Dict[str, int] = {}
         for raw_key, raw_value in reservation.items():
             if raw_value is None:
@@ -67,33 +112,133 @@ class QuotaService:
                 key: max(1, math.ceil(capacity * value))
                 for key, value in self.default_reservation().items()
             }
-        return normalized
+        return tuple(normalized.items())
 
     def current_allocations(self, job_id: str) -> Dict[str, int]:
+        return self.current_allocations_many([job_id])[job_id]
+
+    def current_allocations_many(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """Matched/selected counts per job and category, read from ``job_quota_counters``."""
+        allocations: Dict[str, Dict[str, int]] = {job_id: {} for job_id in job_ids}
+        if not allocations:
+            return allocations
         rows = (
-            db.session.query(User.social_category, func.count(Application.id))
-            .join(User, User.id == Application.user_id)
-            .filter(
-                Application.job_id == job_id,
-                Application.status.in_(AUDIT_STATUSES),
+            db.session.query(JobQuotaCounter.job_id, JobQuotaCounter.category, JobQuotaCounter.count)
+            .filter(JobQuotaCounter.job_id.in_(list(allocations)), JobQuotaCounter.count > 0)
+            .all()
+        )
+        for job_id, category, count in rows:
+            allocations[job_id][category] = count
+        return allocations
+
+    @staticmethod
+    def _category(user: User | None) -> str:
+        return str((user.social_category if user else None) or "general").lower()
+
+    def record_status_change(self, application: Application, previous: str | None) -> bool:
+        """Move the job's counter when ``application`` enters or leaves an audited status.
+
+        The category is stored on the application when it is counted and that
+        stored value is decremented later, even if the candidate's category
+        changed in between. Call it before committing the status change, so
+        both land in one transaction. Returns True when a counter moved.
+        """
+        delta = (application.status in AUDIT_STATUSES) - (previous in AUDIT_STATUSES)
+        if not delta:
+            return False
+        if delta > 0:
+            category = application.quota_category = self._category(application.candidate)
+        else:
+            # Rows counted before quota_category existed fall back to the current category.
+            category = application.quota_category or self._category(application.candidate)
+            application.quota_category = None
+        return self._bump(application.job_id, category, delta)
+
+    def _bump(self, job_id: str, category: str, delta: int) -> bool:
+        """Add ``delta`` to a counter, never taking it below zero; True if it moved."""
+        query = JobQuotaCounter.query.filter_by(job_id=job_id, category=category)
+        if delta < 0:
+            # Only decrement counters that hold enough; anything else is drift
+            # (e.g. rows that predate the counters) and is left for a rebuild.
+            query = query.filter(JobQuotaCounter.count >= -delta)
+
+        def update() -> int:
+            return query.update(
+                {JobQuotaCounter.count: JobQuotaCounter.count + delta}, synchronize_session=False
+            )
+
+        if update():
+            return True
+        if delta < 0:
+            logger.warning(
+                "Quota counter %s/%s would drop below zero; run "
+                "`python -m backend.scripts.quota_counters rebuild` to recount it",
+                job_id,
+                category,
             )
-            .group_by(User.social_category)
+            return False
+        try:
+            with db.session.begin_nested():
+                db.session.add(JobQuotaCounter(job_id=job_id, category=category, count=delta))
+        except IntegrityError:
+            # Another transaction created the row first.
+            update()
+        return True
+
+    def rebuild_counters(self) -> int:
+        """Recount ``job_quota_counters`` from the applications table; returns the row count.
+
+        Counted applications are restamped with their candidate's current category.
+        """
+        current_category = func.lower(
+            func.coalesce(
+                db.session.query(User.social_category)
+                .filter(User.id == Application.user_id)
+                .scalar_subquery(),
+                "general",
+            )
+        )
+        audited = Application.status.in_(AUDIT_STATUSES)
+        Application.query.filter(audited).update(
+            {Application.quota_category: current_category}, synchronize_session=False
+        )
+        Application.query.filter(~audited | Application.status.is_(None)).update(
+            {Application.quota_category: None}, synchronize_session=False
+        )
+        rows = (
+            db.session.query(Application.job_id, Application.quota_category, func.count(Application.id))
+            .filter(audited)
+            .group_by(Application.job_id, Application.quota_category)
             .all()
         )
-        return {str(category or "general").lower(): count for category, count in rows}
+        JobQuotaCounter.query.delete()
+        db.session.add_all(
+            JobQuotaCounter(job_id=job_id, category=category, count=count)
+            for job_id, category, count in rows
+        )
+        db.session.commit()
+        return len(rows)
 
     def reservation_snapshot(self, job: Job) -> Dict[str, Dict[str, int]]:
-        targets = self.reservation_targets(job)
-        allocations = self.current_allocations(job.id)
-        remaining = {
-            key: max(0, targets.get(key, 0) - allocations.get(key, 0))
-            for key in targets.keys()
-        }
-        return {
-            "targets": targets,
-            "allocated": allocations,
-            "remaining": remaining,
-        }
+        return self.reservation_snapshots([job])[job.id]
+
+    def reservation_snapshots(self, jobs: List[Job]) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Snapshots for every job in ``jobs`` with a single allocation query."""
+        allocations = self.current_allocations_many(job.id for job in jobs)
+        snapshots = {}
+        for job in jobs:
+            targets = self.reservation_targets(job)
+            allocated = allocations[job.id]
+            remaining = {
+                key: max(0, targets.get(key, 0) - allocated.get(key, 0))
+                for key in targets.keys()
+            }
+            snapshots[job.id] = {
+                "targets": targets,
+                "allocated": allocated,
+                "remaining": remaining,
+            }
+        return snapshots
 
     def quota_bonus(
         self,
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+Hits = List[Tuple[str, float, dict]]
+
+
+class SearchCache:
+    """Bounded TTL + LRU cache of vector search results.
+
+    Entries are keyed by a digest of the float32 query vector, the limit and
+    the filter, plus the index generation at query time. Every write through
+    :class:`CachedVectorIndex` bumps the generation, so results computed
+    before a write are never served after it. Writes made by other processes
+    are only picked up once entries expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Tuple[float, Hits]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(vector, limit: int, expr=None) -> tuple:
+        digest = hashlib.blake2b(
+            np.ascontiguousarray(vector, dtype=np.float32).tobytes(), digest_size=16
+        ).hexdigest()
+        return digest, limit, repr(expr)
+
+    def get(self, key: tuple, generation: int) -> Optional[Hits]:
+        with self._lock:
+            entry = self._entries.get((generation, key))
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end((generation, key))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, generation: int, hits: Hits) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(generation, key)] = (time.monotonic() + self.ttl, hits)
+            self._entries.move_to_end((generation, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CachedVectorIndex:
+    """Serves repeated searches from a :class:`SearchCache`; writes invalidate it.
+
+    Everything else is delegated to the wrapped Milvus or local index.
+    """
+
+    def __init__(self, index, cache: SearchCache):
+        self.index = index
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def search(self, vector, limit: int, expr=None) -> Hits:
+        if vector is None or not len(vector):
+            return []
+        return self.search_many([vector], limit, expr)[0]
+
+    def search_many(self, vectors, limit: int, expr=None) -> List[Hits]:
+        generation = self.cache.generation
+        keys = [self.cache.key(vector, limit, expr) for vector in vectors]
+        results = [self.cache.get(key, generation) for key in keys]
+        missing = [position for position, hits in enumerate(results) if hits is None]
+        if missing:
+            found = self.index.search_many([vectors[position] for position in missing], limit, expr)
+            for position, hits in zip(missing, found):
+                results[position] = hits
+                self.cache.put(keys[position], generation, hits)
+        return results
+
+    def upsert(self, vector_id: str, vector, metadata: dict):
+        try:
+            return self.index.upsert(vector_id, vector, metadata)
+        finally:
+            self.cache.invalidate()
+
+    def upsert_many(self, ids, vectors, metadata) -> int:
+        try:
+            return self.index.upsert_many(ids, vectors, metadata)
+        finally:
+            self.cache.invalidate()
+
+    def delete(self, vector_ids) -> int:
+        try:
+            return self.index.delete(vector_ids)
+        finally:
+            self.cache.invalidate()
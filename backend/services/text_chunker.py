@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+Offsets = List[Tuple[int, int]]
+
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+@dataclass
+class Chunk:
+    """Same record layout as the ingest pipeline's ``data/clean/chunks.parquet``."""
+
+    chunk_id: str
+    source_type: str
+    source_id: str
+    chunk_index: int
+    text: str
+    tokens_estimate: int
+
+
+def sanitize(text: str) -> str:
+    """Strip HTML tags and collapse whitespace, like ``chunker.ts``."""
+    return " ".join(_TAG_PATTERN.sub(" ", text or "").split())
+
+
+def word_offsets(text: str) -> Offsets:
+    return [(match.start(), match.end()) for match in _WORD_PATTERN.finditer(text)]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    overlap: int = 0,
+    max_document_tokens: int = 0,
+    token_offsets: Callable[[str], Offsets] = word_offsets,
+    source_id: str = "",
+    source_type: str = "document",
+) -> List[Chunk]:
+    """Split ``text`` into windows of at most ``max_tokens`` tokens.
+
+    ``token_offsets`` maps text to ``(start, end)`` character spans of the
+    model's tokens, so budgets are counted in real tokens rather than
+    characters. Windows overlap by ``overlap`` tokens, and tokens past
+    ``max_document_tokens`` are dropped so the cost per document is bounded.
+    """
+    cleaned = sanitize(text)
+    if not cleaned:
+        return []
+    offsets = token_offsets(cleaned)
+    if max_document_tokens:
+        offsets = offsets[:max_document_tokens]
+    if not offsets:
+        return []
+    step = max(1, max_tokens - overlap)
+    chunks: List[Chunk] = []
+    for start in range(0, len(offsets), step):
+        window = offsets[start : start + max_tokens]
+        index = len(chunks)
+        chunks.append(
+            Chunk(
+                chunk_id=f"{source_id}-{index}",
+                source_type=source_type,
+                source_id=source_id,
+                chunk_index=index,
+                text=cleaned[window[0][0] : window[-1][1]],
+                tokens_estimate=len(window),
+            )
+        )
+        if start + max_tokens >= len(offsets):
+            break
+    return chunks
+
+
+def chunk_texts(
+    texts: Sequence[str],
+    max_tokens: int,
+    overlap: int = 0,
+    max_document_tokens: int = 0,
+    token_offsets: Callable[[str], Offsets] = word_offsets,
+) -> List[List[Chunk]]:
+    return [
+        chunk_text(
+            text,
+            max_tokens,
+            overlap=overlap,
+            max_document_tokens=max_document_tokens,
+            token_offsets=token_offsets,
+            source_id=str(index),
+        )
+        for index, text in enumerate(texts)
+    ]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import calendar
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, or_
+
+from backend.extensions import db
+from backend.models import Job, JobQuotaCounter
+from backend.services.milvus_client import SCALAR_FIELDS
+
+# Jobs in these states are removed from the vector index until reopened.
+CLOSED_JOB_STATUSES = frozenset({"closed", "declined"})
+
+
+def job_is_closed(job: Job) -> bool:
+    return (job.status or "").lower() in CLOSED_JOB_STATUSES
+
+
+# States and union territories, lowercased, that job_location may end with.
+INDIAN_STATES = frozenset(
+    {
+        "andhra pradesh", "arunachal pradesh", "assam", "bihar", "chhattisgarh", "goa",
+        "gujarat", "haryana", "himachal pradesh", "jharkhand", "karnataka", "kerala",
+        "madhya pradesh", "maharashtra", "manipur", "meghalaya", "mizoram", "nagaland",
+        "odisha", "punjab", "rajasthan", "sikkim", "tamil nadu", "telangana", "tripura",
+        "uttar pradesh", "uttarakhand", "west bengal", "andaman and nicobar islands",
+        "chandigarh", "dadra and nagar haveli and daman and diu", "delhi",
+        "jammu and kashmir", "ladakh", "lakshadweep", "puducherry",
+    }
+)
+
+
+def _location_parts(job: Job) -> List[str]:
+    return [part.strip().lower() for part in (job.job_location or "").split(",") if part.strip()]
+
+
+def job_state(job: Job) -> str:
+    if job.state_priority:
+        return job.state_priority.strip().lower()
+    parts = _location_parts(job)
+    # "City, India" ends with the country, which belongs in the national partition.
+    return parts[-1] if len(parts) > 1 and parts[-1] in INDIAN_STATES else ""
+
+
+def epoch(moment: datetime) -> int:
+    """Seconds since the epoch for a naive UTC datetime."""
+    return calendar.timegm(moment.timetuple())
+
+
+def filled_counts(job_ids: Iterable[str]) -> Dict[str, int]:
+    """Matched/selected applications per job, summed from the quota counters."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return {}
+    rows = (
+        db.session.query(JobQuotaCounter.job_id, func.sum(JobQuotaCounter.count))
+        .filter(JobQuotaCounter.job_id.in_(job_ids))
+        .group_by(JobQuotaCounter.job_id)
+        .all()
+    )
+    return {job_id: int(count or 0) for job_id, count in rows}
+
+
+def job_vector_metadata(job: Job, filled: int = 0) -> dict:
+    """Metadata stored with a job vector; the scalar keys double as typed fields.
+
+    ``fingerprint`` is the embedding fingerprint the vector was computed from,
+    which lets reconciliation spot stale vectors without comparing them.
+    """
+    parts = _location_parts(job)
+    deadline = job.application_deadline
+    return {
+        "jobId": job.id,
+        "company": job.company,
+        "state": job_state(job),
+        "city": parts[0] if parts else "",
+        "job_type": (job.job_type or "").lower(),
+        "status": (job.status or "").lower(),
+        "deadline": epoch(deadline) if deadline else 0,
+        "capacity_open": max((job.capacity or 1) - filled, 0),
+        "fingerprint": job.embedding_fingerprint or "",
+    }
+
+
+def job_vector_metadata_many(jobs: Sequence[Job]) -> List[dict]:
+    filled = filled_counts(job.id for job in jobs)
+    return [job_vector_metadata(job, filled.get(job.id, 0)) for job in jobs]
+
+
+@dataclass
+class VectorFilter:
+    """Constraints pushed into the vector search instead of applied afterwards.
+
+    The same filter renders to a Milvus boolean expression
+    (:meth:`to_expr`), checks metadata in the local indexes
+    (:meth:`matches`), and narrows SQL job queries (:meth:`apply`).
+    """
+
+    states: Sequence[str] = ()
+    city: Optional[str] = None
+    job_types: Sequence[str] = ()
+    statuses: Sequence[str] = ()
+    open_at: Optional[int] = None
+    has_capacity: bool = False
+
+    @classmethod
+    def open_now(cls, **kwargs) -> "VectorFilter":
+        """Jobs whose application deadline has not passed.
+
+        The cutoff is truncated to the minute so repeated searches share a
+        filter, and so a search cache entry, for up to a minute.
+        """
+        return cls(open_at=epoch(datetime.utcnow()) // 60 * 60, **kwargs)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.states
+            or self.city
+            or self.job_types
+            or self.statuses
+            or self.open_at is not None
+            or self.has_capacity
+        )
+
+    def to_expr(self, typed_fields: Collection[str] = tuple(SCALAR_FIELDS)) -> str:
+        """Milvus expression; fields missing from ``typed_fields`` use the JSON metadata."""
+
+        def field(name: str) -> str:
+            return name if name in typed_fields else f'metadata["{name}"]'
+
+        def values(items: Iterable[str]) -> str:
+            return json.dumps([item.lower() for item in items])
+
+        clauses = []
+        if self.states:
+            clauses.append(f"{field('state')} in {values(self.states)}")
+        if self.city:
+            clauses.append(f"{field('city')} == {json.dumps(self.city.lower())}")
+        if self.job_types:
+            clauses.append(f"{field('job_type')} in {values(self.job_types)}")
+        if self.statuses:
+            clauses.append(f"{field('status')} in {values(self.statuses)}")
+        if self.open_at is not None:
+            deadline = field("deadline")
+            clauses.append(f"({deadline} == 0 or {deadline} >= {int(self.open_at)})")
+        if self.has_capacity:
+            clauses.append(f"{field('capacity_open')} > 0")
+        return " and ".join(clauses)
+
+    def matches(self, metadata: dict) -> bool:
+        if self.states and metadata.get("state", "") not in {s.lower() for s in self.states}:
+            return False
+        if self.city and metadata.get("city", "") != self.city.lower():
+            return False
+        if self.job_types and metadata.get("job_type", "") not in {
+            job_type.lower() for job_type in self.job_types
+        }:
+            return False
+        if self.statuses and metadata.get("status", "") not in {s.lower() for s in self.statuses}:
+            return False
+        if self.open_at is not None:
+            deadline = metadata.get("deadline", 0)
+            if deadline and deadline < self.open_at:
+                return False
+        if self.has_capacity and metadata.get("capacity_open", 0) <= 0:
+            return False
+        return True
+
+    def apply(self, query):
+        """Narrow a ``Job`` query to the same rows, for the non-vector fallback."""
+        if self.states:
+            states = [state.lower() for state in self.states]
+            query = query.filter(
+                or_(
+                    func.lower(Job.state_priority).in_(states),
+                    *[
+                        (Job.state_priority.is_(None) & Job.job_location.ilike(f"%, {state}"))
+                        for state in states
+                    ],
+                )
+            )
+        if self.city:
+            query = query.filter(Job.job_location.ilike(f"{self.city}%"))
+        if self.job_types:
+            query = query.filter(func.lower(Job.job_type).in_([t.lower() for t in self.job_types]))
+        if self.statuses:
+            query = query.filter(func.lower(Job.status).in_([s.lower() for s in self.statuses]))
+        if self.open_at is not None:
+            query = query.filter(
+                or_(
+                    Job.application_deadline.is_(None),
+                    Job.application_deadline >= datetime.utcfromtimestamp(self.open_at),
+                )
+            )
+        if self.has_capacity:
+            filled = (
+                db.session.query(func.coalesce(func.sum(JobQuotaCounter.count), 0))
+                .filter(JobQuotaCounter.job_id == Job.id)
+                .correlate(Job)
+                .scalar_subquery()
+            )
+            query = query.filter(func.coalesce(Job.capacity, 1) > filled)
+        return query
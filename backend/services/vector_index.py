@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+
+from backend.extensions import milvus
+from backend.services.embedding_backends import backend_class
+from backend.services.embedding_service import embedding_dimension
+from backend.services.hnsw_index import _HAS_HNSWLIB, HnswIndex
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.partitioned_index import PartitionedIndex
+from backend.services.search_cache import CachedVectorIndex, SearchCache
+
+logger = logging.getLogger(__name__)
+
+_local_indexes: Dict[str, LocalVectorIndex] = {}
+_local_lock = threading.Lock()
+_cached_index: Optional[CachedVectorIndex] = None
+
+# Upper bound in seconds on the backoff between retries of a failed buffered write.
+MAX_RETRY_DELAY = 60.0
+
+
+def _create_local_index(config) -> LocalVectorIndex:
+    kind = config.get("VECTOR_INDEX_LOCAL", "exact")
+    partitioned = config.get("VECTOR_INDEX_PARTITION_BY_STATE", False)
+    if kind == "hnsw" and not _HAS_HNSWLIB:
+        logger.warning("VECTOR_INDEX_LOCAL=hnsw needs hnswlib; using the exact index")
+        kind = "exact"
+    if kind == "exact":
+        return PartitionedIndex(LocalVectorIndex) if partitioned else LocalVectorIndex()
+    if kind == "hnsw":
+        snapshot_path = config.get("VECTOR_INDEX_SNAPSHOT_PATH") or None
+        # Snapshots built for another model or dimension are rebuilt from the database.
+        backend_id = backend_class(config).model_id(config)
+        dimension = embedding_dimension()
+
+        def factory(snapshot_path=None) -> HnswIndex:
+            return HnswIndex(
+                m=config.get("VECTOR_INDEX_HNSW_M", 16),
+                ef_construction=config.get("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", 200),
+                ef_search=config.get("VECTOR_INDEX_HNSW_EF_SEARCH", 64),
+                snapshot_path=snapshot_path,
+                compact_ratio=config.get("VECTOR_INDEX_COMPACT_RATIO", 0.2),
+                backend_id=backend_id,
+                dimension=dimension,
+            )
+
+        if partitioned:
+            return PartitionedIndex(factory, snapshot_path=snapshot_path)
+        return factory(snapshot_path)
+    raise ValueError(f"Unknown VECTOR_INDEX_LOCAL {kind!r}; expected exact or hnsw")
+
+
+def get_local_index() -> LocalVectorIndex:
+    """Return the process-wide in-process index selected by ``VECTOR_INDEX_LOCAL``."""
+    kind = current_app.config.get("VECTOR_INDEX_LOCAL", "exact")
+    with _local_lock:
+        index = _local_indexes.get(kind)
+        if index is None:
+            index = _local_indexes[kind] = _create_local_index(current_app.config)
+    index.ensure_loaded()
+    return index
+
+
+def get_vector_index():
+    """Return the vector index selected by ``VECTOR_INDEX``.
+
+    ``auto`` uses Milvus when it has a collection and otherwise falls back to
+    the in-process index from :func:`get_local_index`, so matching keeps its
+    semantic ranking without an external service. Unless
+    ``VECTOR_SEARCH_CACHE_SIZE`` is 0 the index is wrapped in a
+    :class:`CachedVectorIndex`.
+    """
+    global _cached_index
+    index = _select_vector_index()
+    size = current_app.config.get("VECTOR_SEARCH_CACHE_SIZE", 10000)
+    if not size:
+        return index
+    with _local_lock:
+        if _cached_index is None or _cached_index.index is not index:
+            cache = SearchCache(size, current_app.config.get("VECTOR_SEARCH_CACHE_TTL", 60.0))
+            _cached_index = CachedVectorIndex(index, cache)
+        return _cached_index
+
+
+def _select_vector_index():
+    mode = current_app.config.get("VECTOR_INDEX", "auto")
+    if mode != "local":
+        client = milvus.client
+        if mode == "milvus" or client.collection is not None:
+            return client
+    return get_local_index()
+
+
+def search_cache_stats() -> Optional[dict]:
+    """Hit-rate counters of the search cache, or None before the first lookup."""
+    cached = _cached_index
+    return cached.cache.stats() if cached is not None else None
+
+
+class VectorWriteBuffer:
+    """Write-behind buffer that groups upserts into ``upsert_many`` batches.
+
+    Rows are kept column-major and sent when ``max_rows`` accumulate,
+    ``max_delay`` seconds after the first buffered row (0 disables the timer),
+    or on :meth:`flush` and :meth:`close`. A later row for the same id replaces the buffered one.
+    Removals are batched the same way into one ``delete`` call, after which
+    indexes that keep tombstones get a chance to compact.
+
+    Batches are written outside the buffer lock. Rows of a failed write go back
+    into the buffer and are retried after ``retry_delay`` seconds, doubling per
+    consecutive failure up to :data:`MAX_RETRY_DELAY`.
+    """
+
+    def __init__(
+        self, index, max_rows: int = 500, max_delay: float = 2.0, retry_delay: float = 1.0
+    ):
+        self.index = index
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        # Serializes writes so an older batch never lands after a newer one.
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._failures = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._ids: List[str] = []
+        self._vectors: list = []
+        self._metadata: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._removed: Dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._removed)
+
+    def add(self, vector_id: str, vector, metadata: dict) -> None:
+        if vector is None or not len(vector):
+            return
+        with self._lock:
+            self._removed.pop(vector_id, None)
+            position = self._positions.get(vector_id)
+            if position is not None:
+                self._vectors[position] = vector
+                self._metadata[position] = metadata
+                return
+            self._positions[vector_id] = len(self._ids)
+            self._ids.append(vector_id)
+            self._vectors.append(vector)
+            self._metadata.append(metadata)
+            full = self._schedule()
+        if full:
+            self.flush()
+
+    def remove(self, vector_id: str) -> None:
+        """Queue ``vector_id`` for deletion, dropping any buffered upsert for it."""
+        with self._lock:
+            position = self._positions.pop(vector_id, None)
+            if position is not None:
+                last = len(self._ids) - 1
+                if position != last:
+                    self._ids[position] = self._ids[last]
+                    self._vectors[position] = self._vectors[last]
+                    self._metadata[position] = self._metadata[last]
+                    self._positions[self._ids[position]] = position
+                self._ids.pop()
+                self._vectors.pop()
+                self._metadata.pop()
+            self._removed[vector_id] = None
+            full = self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self) -> bool:
+        """Start the delay timer if needed; True once the buffer is full."""
+        if self._failures:
+            # A retry is already scheduled; keep buffering until it runs.
+            return False
+        full = len(self) >= self.max_rows
+        if not full and self._timer is None and self.max_delay:
+            self._start_timer(self.max_delay)
+        return full
+
+    def _start_timer(self, delay: float) -> None:
+        self._timer = threading.Timer(delay, self._flush_quietly)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                self._cancel_timer()
+                ids, vectors, metadata = self._ids, self._vectors, self._metadata
+                removed = list(self._removed)
+                self._clear()
+            try:
+                written = self.index.upsert_many(ids, np.stack(vectors), metadata) if ids else 0
+            except Exception:
+                self._requeue(ids, vectors, metadata, removed)
+                raise
+            if removed:
+                try:
+                    written += self.index.delete(removed)
+                except Exception:
+                    self._requeue([], [], [], removed)
+                    raise
+                compact = getattr(self.index, "maybe_compact", None)
+                if compact is not None:
+                    compact()
+            with self._lock:
+                self._failures = 0
+            return written
+
+    def _requeue(self, ids, vectors, metadata, removed) -> None:
+        """Put a failed batch back, skipping ids buffered again since the swap."""
+        with self._lock:
+            for vector_id, vector, row in zip(ids, vectors, metadata):
+                if vector_id in self._positions or vector_id in self._removed:
+                    continue
+                self._positions[vector_id] = len(self._ids)
+                self._ids.append(vector_id)
+                self._vectors.append(vector)
+                self._metadata.append(row)
+            for vector_id in removed:
+                if vector_id not in self._positions:
+                    self._removed[vector_id] = None
+            self._failures += 1
+            self._cancel_timer()
+            self._start_timer(min(self.retry_delay * 2 ** (self._failures - 1), MAX_RETRY_DELAY))
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # noqa: BLE001
+            logger.exception("Buffered vector upsert failed")
+
+    def close(self) -> int:
+        return self.flush()
+
+    def __enter__(self) -> "VectorWriteBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_write_buffer: Optional[VectorWriteBuffer] = None
+
+
+def get_write_buffer() -> VectorWriteBuffer:
+    """Return the process-wide write buffer for the current vector index."""
+    global _write_buffer
+    index = get_vector_index()
+    with _local_lock:
+        buffer = _write_buffer
+        if buffer is None or buffer.index is not index or buffer.pid != os.getpid():
+            if buffer is not None and buffer.pid == os.getpid():
+                buffer.close()
+            buffer = _write_buffer = VectorWriteBuffer(
+                index,
+                max_rows=current_app.config.get("VECTOR_WRITE_BATCH_SIZE", 500),
+                max_delay=current_app.config.get("VECTOR_WRITE_MAX_DELAY", 2.0),
+                retry_delay=current_app.config.get("VECTOR_WRITE_RETRY_DELAY", 1.0),
+            )
+            atexit.register(buffer.close)
+    return buffer
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import undefer
+
+from backend.extensions import db
+from backend.models import Job
+from backend.services.vector_filters import CLOSED_JOB_STATUSES, job_vector_metadata_many
+
+Progress = Callable[[str, int], None]
+
+
+@dataclass
+class ReconcileReport:
+    database: int = 0
+    indexed: int = 0
+    missing: int = 0
+    stale: int = 0
+    orphaned: int = 0
+    upserted: int = 0
+    deleted: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _database_fingerprints(page_size: int, progress: Progress) -> Dict[str, str]:
+    query = (
+        db.session.query(Job.id, Job.embedding_fingerprint)
+        .filter(
+            Job.embedding.isnot(None),
+            or_(Job.status.is_(None), func.lower(Job.status).notin_(CLOSED_JOB_STATUSES)),
+        )
+        .order_by(Job.id)
+    )
+    expected: Dict[str, str] = {}
+    last_id = None
+    while True:
+        page = query if last_id is None else query.filter(Job.id > last_id)
+        rows = page.limit(page_size).all()
+        if not rows:
+            return expected
+        expected.update((job_id, fingerprint or "") for job_id, fingerprint in rows)
+        last_id = rows[-1][0]
+        progress("database", len(expected))
+
+
+def reconcile(
+    index,
+    page_size: int = 1000,
+    repair: bool = True,
+    progress: Optional[Progress] = None,
+) -> ReconcileReport:
+    """Diff the jobs table against ``index`` and repair only the difference.
+
+    Job ids and embedding fingerprints are read from the database in keyset
+    pages and the index is streamed with ``index.scan``. Jobs missing from the
+    index or indexed with an outdated fingerprint are re-upserted from their
+    stored embeddings; vectors without an open job are deleted. Only the database
+    side is held in memory, as an id to fingerprint map.
+    """
+    progress = progress or (lambda stage, count: None)
+    report = ReconcileReport()
+    expected = _database_fingerprints(page_size, progress)
+    report.database = len(expected)
+
+    orphaned: List[str] = []
+    stale: List[str] = []
+    for page in index.scan(page_size):
+        for vector_id, fingerprint in page:
+            report.indexed += 1
+            wanted = expected.pop(vector_id, None)
+            if wanted is None:
+                orphaned.append(vector_id)
+            elif wanted != fingerprint:
+                stale.append(vector_id)
+        progress("index", report.indexed)
+    report.missing, report.stale, report.orphaned = len(expected), len(stale), len(orphaned)
+    if not repair:
+        return report
+
+    for start in range(0, len(orphaned), page_size):
+        report.deleted += index.delete(orphaned[start : start + page_size])
+        progress("deleted", report.deleted)
+    changed = list(expected) + stale
+    for start in range(0, len(changed), page_size):
+        jobs = (
+            Job.query.filter(Job.id.in_(changed[start : start + page_size]))
+            .options(undefer(Job.embedding))
+            .all()
+        )
+        report.upserted += index.upsert_many(
+            [job.id for job in jobs],
+            [job.embedding for job in jobs],
+            job_vector_metadata_many(jobs),
+        )
+        progress("upserted", report.upserted)
+    if report.deleted or report.upserted:
+        index.flush()
+    return report
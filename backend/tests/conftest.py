@@ -0,0 +1,55 @@
+import pytest
+from flask import Flask
+
+from backend.extensions import db
+from backend.models import Job
+
+
+@pytest.fixture
+def app_config():
+    """Extra config for :func:`app`; override this fixture in a test module."""
+    return {}
+
+
+@pytest.fixture
+def app(app_config):
+    """Bare Flask app on an in-memory SQLite database with every table created."""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", **app_config)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def web_app(monkeypatch, tmp_path):
+    """The full application from ``create_app`` with ``TestingConfig``."""
+    # backend.config reads the production Zilliz settings when it is imported.
+    monkeypatch.setenv("ZILLIZ_URI", "")
+    monkeypatch.setenv("ZILLIZ_TOKEN", "")
+    from backend.app import create_app
+    from backend.config import TestingConfig
+
+    class Testing(TestingConfig):
+        EMBEDDING_CACHE_PATH = str(tmp_path / "embedding-cache")
+
+    return create_app(Testing)
+
+
+@pytest.fixture
+def make_job():
+    """Factory for a valid ``Job``; keyword arguments override the defaults."""
+
+    def make(job_id: str = "job-1", **overrides) -> Job:
+        fields = dict(
+            id=job_id,
+            employer_id="employer",
+            position="Intern",
+            company="Acme",
+            job_location="Chennai",
+        )
+        fields.update(overrides)
+        return Job(**fields)
+
+    return make
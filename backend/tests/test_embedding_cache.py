@@ -0,0 +1,63 @@
+import numpy as np
+
+from backend.services.embedding_cache import EmbeddingCache, text_digest
+
+
+def test_digest_ignores_whitespace_noise():
+    assert text_digest("Data  Science\nIntern ") == text_digest("Data Science Intern")
+    assert text_digest("Data Science") != text_digest("data science")
+
+
+def test_get_many_counts_hits_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    cache.put_many("mini", {"a": np.array([1.0, 2.0])})
+    found = cache.get_many("mini", ["a", "b"])
+    assert found["a"].dtype == np.float32
+    assert found["a"].tolist() == [1.0, 2.0]
+    assert cache.get_many("other-model", ["a"]) == {}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+    cache.put_many("mini", {"old": np.zeros(2), "new": np.ones(2)})
+    cache.get_many("mini", ["new"])
+    assert cache.prune(max_entries=1) == 1
+    assert list(cache.get_many("mini", ["old", "new"])) == ["new"]
+
+
+def test_puts_keep_a_row_count_without_scanning(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = EmbeddingCache(path, max_entries=3)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.put_many("mini", {"a": np.zeros(2), "b": np.ones(2)})
+    cache.put_many("mini", {"a": np.ones(2), "c": np.ones(2)})
+    assert not [sql for sql in statements if "COUNT(" in sql.upper()]
+    assert cache.stats()["entries"] == 3
+
+    cache.put_many("mini", {"d": np.ones(2)})
+    assert cache.stats()["entries"] == 3
+    assert EmbeddingCache(path, max_entries=3).prune(max_entries=2) == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_existing_caches_are_counted_once_on_open(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "cache.sqlite"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE embeddings (model TEXT NOT NULL, digest TEXT NOT NULL, "
+            "vector BLOB NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, digest))"
+        )
+        connection.executemany(
+            "INSERT INTO embeddings VALUES ('mini', ?, x'00000000', 0)", [("a",), ("b",)]
+        )
+    cache = EmbeddingCache(str(path), max_entries=1)
+    cache.put_many("mini", {"c": np.ones(1)})
+    assert cache.stats()["entries"] == 1
+    assert cache.clear() == 1
+    cache.put_many("mini", {"d": np.ones(1)})
+    assert list(cache.get_many("mini", ["d"])) == ["d"]
@@ -0,0 +1,18 @@
+import numpy as np
+from flask import Flask
+
+from backend.services.embedding_backends import HashingBackend
+from backend.services.embedding_pool import ParallelEncoder
+from backend.services.embedding_service import encode_texts
+
+
+def test_parallel_encoder_matches_in_process_encoding():
+    app = Flask(__name__)
+    app.config.update(EMBEDDING_BACKEND="hashing", EMBEDDING_HASH_DIM=16)
+    texts = [f"intern role {index} " * (index % 5 + 1) for index in range(25)] + [""]
+    with app.app_context(), ParallelEncoder(workers=2, shard_size=4) as encoder:
+        vectors = encode_texts(texts, encoder=encoder)
+    expected = HashingBackend(16).encode_texts(texts[:-1], batch_size=8)
+    assert vectors.shape == (26, 16)
+    assert np.allclose(vectors[:-1], expected)
+    assert not vectors[-1].any()
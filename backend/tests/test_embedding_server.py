@@ -0,0 +1,22 @@
+import threading
+
+import numpy as np
+
+from backend.services.embedding_backends import HashingBackend
+from backend.services.embedding_server import EmbeddingServer, RemoteBackend
+
+
+def test_remote_backend_round_trip(tmp_path):
+    socket_path = str(tmp_path / "embed.sock")
+    local = HashingBackend(dimension=32)
+    server = EmbeddingServer(socket_path, local, max_batch=8, max_wait_ms=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        remote = RemoteBackend(socket_path)
+        texts = ["python intern", "data analyst", "python intern"]
+        vectors = remote.encode_texts(texts, batch_size=8)
+        assert remote.dimension == 32
+        assert np.allclose(vectors, local.encode_texts(texts, batch_size=8))
+    finally:
+        server.shutdown()
+        server.server_close()
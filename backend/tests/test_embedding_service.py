@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from backend.services import embedding_service
+from backend.services.embedding_backends import EmbeddingBackend, HashingBackend, backend_class
+
+
+class LengthBackend(EmbeddingBackend):
+    """Fake backend embedding each text as ``[len(text), 1]``."""
+
+    def __init__(self):
+        self.batches = []
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    @property
+    def dimension(self):
+        return 2
+
+    def encode_texts(self, texts, batch_size):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float64)
+
+
+def test_encode_texts_preserves_input_order(monkeypatch):
+    model = LengthBackend()
+    monkeypatch.setattr(embedding_service, "get_backend", lambda: model)
+    app = Flask(__name__)
+    app.config["EMBEDDING_BATCH_SIZE"] = 2
+    with app.app_context():
+        vectors = embedding_service.encode_texts(["ccc", "", "a", "bb"])
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (4, 2)
+    assert vectors[:, 0].tolist() == [3.0, 0.0, 1.0, 2.0]
+    assert model.batches == [["a", "bb", "ccc"]]
+
+
+def test_encode_texts_without_model(monkeypatch):
+    monkeypatch.setattr(embedding_service, "get_backend", lambda: None)
+    with Flask(__name__).app_context():
+        vectors = embedding_service.encode_texts(["hello", "world"])
+        assert vectors.shape == (2, 0)
+        assert embedding_service.encode_text("hello") == []
+
+
+def test_encode_texts_reuses_cached_vectors(monkeypatch, tmp_path):
+    model = LengthBackend()
+    monkeypatch.setattr(embedding_service, "get_backend", lambda: model)
+    app = Flask(__name__)
+    app.config["EMBEDDING_MODEL"] = "fake"
+    app.config["EMBEDDING_CACHE_PATH"] = str(tmp_path / "cache.sqlite")
+    with app.app_context():
+        embedding_service.encode_texts(["a", "bb"])
+        vectors = embedding_service.encode_texts(["bb", "ccc"])
+    assert vectors[:, 0].tolist() == [2.0, 3.0]
+    assert model.batches == [["a", "bb"], ["ccc"]]
+
+
+def test_hashing_backend_is_deterministic_and_normalized():
+    backend = HashingBackend(dimension=64)
+    first = backend.encode_texts(["Python data intern", "python DATA intern"], batch_size=8)
+    assert first.shape == (2, backend.dimension)
+    assert np.allclose(first[0], first[1])
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        backend_class({"EMBEDDING_BACKEND": "word2vec"})
+
+
+def test_failed_backend_load_is_retried_after_the_interval(monkeypatch):
+    loaded = LengthBackend()
+    results = [None, None, loaded]
+    attempts = []
+
+    def create_backend(config):
+        attempts.append(config["EMBEDDING_BACKEND"])
+        return results[len(attempts) - 1]
+
+    monkeypatch.setattr(embedding_service, "create_backend", create_backend)
+    monkeypatch.setattr(
+        embedding_service,
+        "_backend_state",
+        {"key": None, "backend": None, "status": "cold", "retry_at": 0.0},
+    )
+    app = Flask(__name__)
+    app.config.update(EMBEDDING_BACKEND="hashing", EMBEDDING_BACKEND_RETRY_SECONDS=60)
+    with app.app_context():
+        assert embedding_service.get_backend() is None
+        assert embedding_service.get_backend() is None
+        assert len(attempts) == 1
+        assert embedding_service.backend_status()["status"] == "unavailable"
+
+        # Once the retry interval has passed the backend is loaded again.
+        embedding_service._backend_state["retry_at"] = 0.0
+        assert embedding_service.get_backend() is None
+        embedding_service._backend_state["retry_at"] = 0.0
+        assert embedding_service.get_backend() is loaded
+        assert embedding_service.get_backend() is loaded
+        assert len(attempts) == 3
+        assert embedding_service.backend_status()["status"] == "ready"
+
+
+def test_warmup_hands_the_loaded_backend_to_on_ready(monkeypatch):
+    model = LengthBackend()
+    monkeypatch.setattr(embedding_service, "get_backend", lambda: model)
+    monkeypatch.setattr(embedding_service, "_backend_state", {"status": "cold"})
+    checked = []
+    app = Flask(__name__)
+    app.config.update(EMBEDDING_CACHE_PATH="")
+    embedding_service.start_warmup(app, on_ready=checked.append).join(timeout=5)
+    assert checked == [model]
+
+
+def test_backends_must_implement_the_abstract_interface():
+    class Partial(EmbeddingBackend):
+        @property
+        def dimension(self):
+            return 2
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,18 @@
+import numpy as np
+
+from backend.extensions import db
+from backend.models import Job
+
+
+def test_embedding_round_trips_as_deferred_float32_view(app, make_job):
+    with app.app_context():
+        db.session.add(make_job(job_location="Pune", embedding=[0.5, -1.25, 2.0]))
+        db.session.commit()
+        db.session.expunge_all()
+
+        job = db.session.get(Job, "job-1")
+        assert "embedding" not in job.__dict__
+        vector = job.embedding
+        assert vector.dtype == np.float32
+        assert not vector.flags.writeable
+        assert vector.tolist() == [0.5, -1.25, 2.0]
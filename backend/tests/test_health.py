@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend.services import embedding_service
+from backend.services.embedding_backends import EmbeddingBackend
+from backend.services.embedding_cache import text_digest
+
+
+class ProbeBackend(EmbeddingBackend):
+    name = "probe"
+
+    def __init__(self):
+        self.batches = []
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    @property
+    def dimension(self):
+        return 2
+
+    def encode_texts(self, texts, batch_size):
+        self.batches.append(list(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+
+@pytest.fixture
+def app(web_app, monkeypatch):
+    monkeypatch.setattr(
+        embedding_service,
+        "_backend_state",
+        {"key": None, "backend": None, "status": "cold", "retry_at": 0.0},
+    )
+    return web_app
+
+
+def _health(app):
+    response = app.test_client().get("/api/v1/health")
+    return response.status_code, response.get_json()
+
+
+def test_health_reports_warming_until_the_backend_is_ready(app, monkeypatch):
+    backend = ProbeBackend()
+    release = threading.Event()
+
+    def create_backend(config):
+        release.wait(5)
+        return backend
+
+    monkeypatch.setattr(embedding_service, "create_backend", create_backend)
+    thread = embedding_service.start_warmup(app)
+    status, body = _health(app)
+    assert (status, body["status"]) == (503, "warming")
+    assert body["embedding"]["status"] == "loading"
+
+    release.set()
+    thread.join(5)
+    status, body = _health(app)
+    assert (status, body["status"]) == (200, "ok")
+    assert body["embedding"] == {"status": "ready", "backend": "probe", "dimension": 2}
+    assert backend.batches == [["warm-up"]]
+
+    # The probe always reaches the model and never lands in the persistent cache.
+    embedding_service.start_warmup(app).join(5)
+    assert backend.batches == [["warm-up"], ["warm-up"]]
+    with app.app_context():
+        model = embedding_service.active_model_id()
+        assert not embedding_service.get_cache().get_many(model, [text_digest("warm-up")])
+
+
+def test_health_stays_ok_when_the_backend_is_unavailable(app, monkeypatch):
+    monkeypatch.setattr(embedding_service, "create_backend", lambda config: None)
+    embedding_service.start_warmup(app).join(5)
+    status, body = _health(app)
+    assert (status, body["status"]) == (200, "ok")
+    assert body["embedding"] == {"status": "unavailable", "backend": None, "dimension": None}
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from backend.services.hnsw_index import HnswIndex  # noqa: E402
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(7)
+    return rng.normal(size=(600, 16)).astype(np.float32)
+
+
+def _build(vectors, **kwargs):
+    index = HnswIndex(m=8, ef_construction=64, ef_search=64, seed=1, **kwargs)
+    for position, vector in enumerate(vectors):
+        index.upsert(f"job-{position}", vector, {"jobId": f"job-{position}"})
+    return index
+
+
+def _exact_top_k(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return {f"job-{position}" for position in np.argsort(-scores)[:k]}
+
+
+def test_recall_against_exact_search(vectors):
+    index = _build(vectors)
+    queries = np.random.default_rng(11).normal(size=(50, 16))
+    found = 0
+    for query in queries:
+        hits = index.search(query, 10)
+        found += len({hit[0] for hit in hits} & _exact_top_k(vectors, query, 10))
+    assert found / (10 * len(queries)) >= 0.9
+
+
+def test_deleted_and_replaced_vectors_are_not_returned(vectors):
+    index = _build(vectors[:200])
+    target = vectors[5]
+    assert index.search(target, 1)[0][0] == "job-5"
+
+    index.delete(["job-5"])
+    assert "job-5" not in {hit[0] for hit in index.search(target, 10)}
+
+    index.upsert("job-6", target, {"jobId": "job-6"})
+    assert index.search(target, 1)[0][0] == "job-6"
+    assert len(index) == 199
+    assert index.tombstones == 2
+
+    assert index.compact() == 2
+    assert index.tombstones == 0
+    assert index.search(target, 1)[0][0] == "job-6"
+
+
+def test_maybe_compact_waits_for_the_tombstone_ratio(vectors):
+    index = _build(vectors[:100], compact_ratio=0.2)
+    index.delete([f"job-{position}" for position in range(20)])
+    assert index.maybe_compact() == 0
+    index.delete(["job-20"])
+    assert index.maybe_compact() == 21
+    assert index.tombstones == 0
+    assert len(index) == 79
+
+
+def test_snapshot_round_trip(vectors, tmp_path):
+    index = _build(vectors[:300])
+    index.delete(["job-0"])
+    index.save(str(tmp_path / "index"))
+
+    reopened = HnswIndex(m=8, ef_search=64)
+    assert reopened.restore(str(tmp_path / "index"))
+    query = vectors[42]
+    assert reopened.search(query, 5) == index.search(query, 5)
+    assert len(reopened) == 299
+
+    reopened.upsert("job-new", -query, {"jobId": "job-new"})
+    assert reopened.search(-query, 1)[0][0] == "job-new"
+
+
+def test_writes_during_compaction_are_replayed(vectors):
+    index = _build(vectors[:100])
+    index.delete(["job-0", "job-1"])
+    spawn = index._spawn
+
+    def spawn_while_writing():
+        # Runs after the live rows were copied, outside the index lock.
+        index.upsert("job-new", vectors[0], {"jobId": "job-new"})
+        index.delete(["job-2"])
+        return spawn()
+
+    index._spawn = spawn_while_writing
+    assert index.compact() == 2
+    # Only the delete replayed onto the new graph leaves a tombstone.
+    assert index.tombstones == 1
+    assert index.search(vectors[0], 1)[0][0] == "job-new"
+    assert "job-2" not in {hit[0] for hit in index.search(vectors[2], 10)}
+    assert len(index) == 98
+
+
+def test_old_numpy_snapshots_are_rejected(tmp_path):
+    (tmp_path / "meta.json").write_text('{"m": 16, "ids": ["job-1"], "entry": 0}')
+    assert not HnswIndex().restore(str(tmp_path))
+
+
+def test_snapshot_for_another_backend_or_dimension_is_rejected(vectors, tmp_path):
+    index = _build(vectors[:50], backend_id="all-MiniLM-L6-v2", dimension=16)
+    index.save(str(tmp_path))
+
+    assert HnswIndex(m=8, backend_id="all-MiniLM-L6-v2", dimension=16).restore(str(tmp_path))
+    assert not HnswIndex(m=8, backend_id="bge-small-en", dimension=16).restore(str(tmp_path))
+    assert not HnswIndex(m=8, backend_id="all-MiniLM-L6-v2", dimension=384).restore(str(tmp_path))
+
+
+def test_m_below_two_is_rejected():
+    with pytest.raises(ValueError):
+        HnswIndex(m=1)
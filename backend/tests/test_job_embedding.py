@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from backend.extensions import db
+from backend.models import User
+from backend.services import embedding_worker as worker_module
+from backend.services.embedding_worker import (
+    EMBEDDING_PENDING,
+    EMBEDDING_READY,
+    EmbeddingWorker,
+    embed_jobs,
+)
+
+
+@pytest.fixture
+def app_config():
+    return {"EMBEDDING_MODEL": "fake", "EMBEDDING_ASYNC": True}
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    calls = []
+
+    def fake_encode_documents(texts):
+        calls.append(list(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    monkeypatch.setattr(worker_module, "encode_documents", fake_encode_documents)
+    return calls
+
+
+def test_embed_jobs_skips_unchanged_text(app, encoded, make_job):
+    job = make_job(skills_required=["sql"])
+    with app.app_context():
+        embed_jobs([job])
+        job.status = "interview"
+        job.salary = "10000"
+        embed_jobs([job])
+        assert len(encoded) == 1
+
+        job.job_description = "Build dashboards"
+        embed_jobs([job])
+        assert len(encoded) == 2
+        assert job.embedding_status == EMBEDDING_READY
+
+
+def test_worker_fills_pending_rows_in_background(app, encoded, make_job):
+    worker = EmbeddingWorker()
+    worker.init_app(app)
+    with app.app_context():
+        job = make_job(embedding_status=EMBEDDING_PENDING)
+        user = User(
+            name="Asha",
+            email="asha@example.com",
+            password_hash="x",
+            skills=["python"],
+            embedding_status=EMBEDDING_PENDING,
+        )
+        db.session.add_all([job, user])
+        db.session.commit()
+        worker.submit("job", job.id)
+        worker.submit("user", user.id)
+        worker.join()
+
+        db.session.expire_all()
+        assert job.embedding_status == EMBEDDING_READY
+        assert job.embedding.tolist() == [1.0, 1.0]
+        assert user.embedding_status == EMBEDDING_READY
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from backend.extensions import db
+from backend.services import vector_index
+from backend.services.local_vector_index import LocalVectorIndex
+
+
+def test_search_returns_exact_top_k():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16)).astype(np.float32)
+    index = LocalVectorIndex()
+    for position, vector in enumerate(vectors):
+        index.upsert(f"job-{position}", vector, {"jobId": f"job-{position}"})
+
+    query = rng.normal(size=16)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+
+    hits = index.search(query, 5)
+    assert [hit[0] for hit in hits] == [f"job-{position}" for position in expected]
+    assert hits[0][1] >= hits[-1][1]
+
+
+def test_upsert_replaces_existing_vector():
+    index = LocalVectorIndex()
+    index.upsert("a", [1.0, 0.0], {"jobId": "a"})
+    index.upsert("b", [0.0, 1.0], {"jobId": "b"})
+    index.upsert("a", [0.3, 0.4], {"jobId": "a", "company": "Acme"})
+
+    assert len(index) == 2
+    hits = index.search([0.6, 0.8], 2)
+    assert [hit[0] for hit in hits] == ["a", "b"]
+    assert hits[0][1] == pytest.approx(1.0)
+    assert hits[0][2] == {"jobId": "a", "company": "Acme"}
+    # The old [1, 0] vector is gone.
+    assert index.search([1.0, 0.0], 1)[0][1] == pytest.approx(0.6)
+
+
+def test_load_from_db_skips_jobs_without_embeddings(app, make_job):
+    with app.app_context():
+        db.session.add_all(
+            [
+                make_job("embedded", embedding=np.array([0.6, 0.8], dtype=np.float32)),
+                make_job("pending", company="Beta", job_location="Pune"),
+            ]
+        )
+        db.session.commit()
+
+        index = LocalVectorIndex()
+        assert index.load_from_db() == 1
+        hits = index.search([0.6, 0.8], 5)
+        assert [hit[0] for hit in hits] == ["embedded"]
+        assert hits[0][2]["company"] == "Acme"
+        assert hits[0][2]["city"] == "chennai"
+
+
+def test_hnsw_falls_back_to_exact_without_hnswlib(monkeypatch):
+    monkeypatch.setattr(vector_index, "_HAS_HNSWLIB", False)
+    index = vector_index._create_local_index({"VECTOR_INDEX_LOCAL": "hnsw"})
+    assert type(index) is LocalVectorIndex
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from backend.extensions import db
+from backend.models import User
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.matching_service import MatchingService
+
+
+class CountingIndex(LocalVectorIndex):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def search_many(self, vectors, limit, expr=None):
+        self.calls += 1
+        return super().search_many(vectors, limit, expr)
+
+
+@pytest.fixture
+def app_config():
+    return {"VECTOR_INDEX": "local"}
+
+
+def _user(name, vector):
+    return User(
+        id=name,
+        name=name,
+        email=f"{name}@example.com",
+        password_hash="x",
+        embedding=np.array(vector, dtype=np.float32),
+    )
+
+
+def test_find_matches_many_uses_one_search_and_matches_single(app, make_job):
+    with app.app_context():
+        index = CountingIndex()
+        for position, vector in enumerate([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]):
+            job = make_job(f"job-{position}")
+            db.session.add(job)
+            index.upsert(job.id, vector, {"jobId": job.id})
+        users = [_user("asha", [1.0, 0.1]), _user("ravi", [0.1, 1.0])]
+        db.session.add_all(users)
+        db.session.commit()
+
+        matcher = MatchingService()
+        matcher.vector_index = index
+        batch = matcher.find_matches_many(users, top_k=2)
+        assert index.calls == 1
+        assert [result.job.id for result in batch["asha"]] == ["job-0", "job-2"]
+        assert [result.job.id for result in batch["ravi"]] == ["job-1", "job-2"]
+
+        single = matcher.find_matches(users[1], top_k=2)
+        assert [(r.job.id, r.score) for r in single] == [
+            (r.job.id, r.score) for r in batch["ravi"]
+        ]
+
+
+def test_candidates_search_their_state_then_top_up_nationwide(app, make_job):
+    with app.app_context():
+        index = CountingIndex()
+        jobs = {
+            "kerala-job": ([0.9, 0.1], "Kerala"),
+            "remote-job": ([0.5, 0.5], None),
+            "goa-job": ([1.0, 0.0], "Goa"),
+        }
+        for job_id, (vector, state) in jobs.items():
+            db.session.add(make_job(job_id, job_location="India", state_priority=state))
+            index.upsert(job_id, vector, {"jobId": job_id, "state": (state or "").lower()})
+        user = _user("asha", [1.0, 0.0])
+        user.state = "Kerala"
+        db.session.add(user)
+        db.session.commit()
+
+        matcher = MatchingService()
+        matcher.vector_index = index
+        results = matcher.find_matches(user, top_k=2)
+        assert {result.job.id for result in results} == {"kerala-job", "remote-job"}
+        assert index.calls == 1
+
+        results = matcher.find_matches(user, top_k=3)
+        assert {result.job.id for result in results} == set(jobs)
+        assert index.calls == 3
+
+
+def test_vectors_of_deleted_jobs_do_not_shorten_the_page(app, make_job):
+    app.config["VECTOR_SEARCH_OVERFETCH"] = 2
+    with app.app_context():
+        index = CountingIndex()
+        for position, vector in enumerate([[1.0, 0.0], [0.9, 0.1], [0.8, 0.2]]):
+            job_id = f"job-{position}"
+            index.upsert(job_id, vector, {"jobId": job_id})
+            if position:
+                db.session.add(make_job(job_id))
+        user = _user("asha", [1.0, 0.0])
+        db.session.add(user)
+        db.session.commit()
+
+        matcher = MatchingService()
+        matcher.vector_index = index
+        results = matcher.find_matches(user, top_k=2)
+        # job-0 only exists in the index, as if deleted by another process.
+        assert [result.job.id for result in results] == ["job-1", "job-2"]
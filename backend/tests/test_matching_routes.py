@@ -0,0 +1,69 @@
+import pytest
+
+from backend.extensions import db
+from backend.models import User
+from backend.utils.jwt import create_token
+
+
+@pytest.fixture
+def admin_headers(web_app):
+    with web_app.app_context():
+        db.session.add(
+            User(
+                id="admin",
+                name="Admin",
+                email="admin@example.com",
+                password_hash="x",
+                role="admin",
+            )
+        )
+        db.session.commit()
+        return {"Authorization": f"Bearer {create_token({'sub': 'admin'})}"}
+
+
+@pytest.mark.parametrize("limit", ["ten", None, [5], 0, -3])
+def test_batch_recommendations_rejects_bad_limits(web_app, admin_headers, limit):
+    response = web_app.test_client().post(
+        "/api/v1/matching/recommendations/batch",
+        json={"userIds": ["nobody"], "limit": limit},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_batch_recommendations_clamps_the_limit(web_app, admin_headers, monkeypatch):
+    from backend.routes import matching
+
+    limits = []
+
+    def find_matches_many(self, users, top_k, filters=None):
+        limits.append(top_k)
+        return {}
+
+    monkeypatch.setattr(matching.MatchingService, "find_matches_many", find_matches_many)
+    response = web_app.test_client().post(
+        "/api/v1/matching/recommendations/batch",
+        json={"userIds": ["nobody"], "limit": "100000"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["missing"] == ["nobody"]
+    assert limits == [matching.MAX_BATCH_LIMIT]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"userIds": [{}]},
+        {"userIds": ["nobody", 7]},
+        {"userIds": ["nobody"], "state": [["kerala"]]},
+        {"userIds": ["nobody"], "jobType": {"remote": True}},
+        {"userIds": ["nobody"], "status": 3},
+        {"userIds": ["nobody"], "city": ["Kochi"]},
+    ],
+)
+def test_batch_recommendations_rejects_non_string_values(web_app, admin_headers, body):
+    response = web_app.test_client().post(
+        "/api/v1/matching/recommendations/batch", json=body, headers=admin_headers
+    )
+    assert response.status_code == 400
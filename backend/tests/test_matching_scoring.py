@@ -0,0 +1,77 @@
+import random
+from dataclasses import dataclass, field
+
+import pytest
+
+from backend.services.matching_service import MatchingService
+
+STATES = [None, "Tamil Nadu", "Kerala", "Bihar", "Maharashtra"]
+SKILLS = ["python", "sql", "excel", "react", "ml", "design"]
+
+
+@dataclass
+class DummyJob:
+    id: str
+    job_location: str | None = None
+    state_priority: str | None = None
+    skills_required: list = field(default_factory=list)
+
+
+@dataclass
+class DummyUser:
+    social_category: str | None = None
+    location: str | None = None
+    region: str | None = None
+    state: str | None = None
+    skills: list = field(default_factory=list)
+
+
+def _pool(rng, size):
+    jobs, scores, snapshots = [], [], []
+    for position in range(size):
+        jobs.append(
+            DummyJob(
+                id=f"job-{position}",
+                job_location=rng.choice([None, "Chennai, Tamil Nadu", "Kochi, Kerala", "Pune"]),
+                state_priority=rng.choice(STATES),
+                skills_required=rng.sample(SKILLS, rng.randint(0, 4)) + rng.choice([[], ["sql"]]),
+            )
+        )
+        scores.append(rng.choice([None, 0.0, round(rng.random(), 4), rng.random()]))
+        remaining = {"sc": rng.randint(0, 1), "obc": rng.randint(0, 2)}
+        snapshots.append(
+            rng.choice(
+                [
+                    None,
+                    {},
+                    {"targets": remaining, "allocated": {}, "remaining": remaining},
+                    {"targets": {}, "allocated": {}, "remaining": {}},
+                ]
+            )
+        )
+    return jobs, scores, snapshots
+
+
+@pytest.mark.parametrize(
+    "candidate",
+    [
+        DummyUser(),
+        DummyUser(social_category="SC", location="chennai", skills=["python", "sql"]),
+        DummyUser(social_category="ews", state="Tamil Nadu", skills=["design"]),
+        DummyUser(social_category="obc", region="Tamil Nadu", location="Kerala"),
+    ],
+)
+def test_pool_scoring_matches_per_job_scoring(candidate):
+    matcher = MatchingService()
+    jobs, scores, snapshots = _pool(random.Random(3), 400)
+
+    expected = [
+        matcher._score_job(candidate, job, score, snapshot)
+        for job, score, snapshot in zip(jobs, scores, snapshots)
+    ]
+    expected.sort(key=lambda item: item.score, reverse=True)
+    ranked = matcher._score_pool(candidate, jobs, scores, snapshots, 25)
+
+    assert [(r.job.id, r.score, r.reasons) for r in ranked] == [
+        (r.job.id, r.score, r.reasons) for r in expected[:25]
+    ]
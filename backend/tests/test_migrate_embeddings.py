@@ -0,0 +1,96 @@
+import pickle
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+from sqlalchemy import inspect
+
+# Tables as created by releases before the embedding columns were added.
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id VARCHAR(36) PRIMARY KEY, created_at DATETIME, updated_at DATETIME,
+    name VARCHAR(120) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL, role VARCHAR(20) NOT NULL,
+    location VARCHAR(120), state VARCHAR(120), region VARCHAR(120),
+    social_category VARCHAR(60), skills JSON, preferences JSON, resume_text TEXT,
+    resume_url VARCHAR(255), avatar_url VARCHAR(255), vector_id VARCHAR(64), embedding BLOB
+);
+CREATE TABLE jobs (
+    id VARCHAR(36) PRIMARY KEY, created_at DATETIME, updated_at DATETIME,
+    employer_id VARCHAR(36) NOT NULL REFERENCES users (id), position VARCHAR(120) NOT NULL,
+    company VARCHAR(120) NOT NULL, job_location VARCHAR(160) NOT NULL, job_type VARCHAR(50),
+    status VARCHAR(50), job_description TEXT, image VARCHAR(255), tags JSON,
+    reservation_quota JSON, skills_required JSON, state_priority VARCHAR(120),
+    capacity INTEGER, salary VARCHAR(50), application_deadline DATETIME,
+    vector_id VARCHAR(64), embedding BLOB
+);
+CREATE TABLE applications (
+    id VARCHAR(36) PRIMARY KEY, created_at DATETIME, updated_at DATETIME,
+    user_id VARCHAR(36) NOT NULL REFERENCES users (id),
+    job_id VARCHAR(36) NOT NULL REFERENCES jobs (id), status VARCHAR(40),
+    match_score FLOAT, justification TEXT, metadata JSON,
+    CONSTRAINT uq_user_job UNIQUE (user_id, job_id)
+);
+"""
+
+
+@pytest.fixture
+def baseline_db(monkeypatch, tmp_path):
+    """An unmigrated SQLite database wired into the default ``Config``."""
+    monkeypatch.setenv("ZILLIZ_URI", "")
+    monkeypatch.setenv("ZILLIZ_TOKEN", "")
+    from backend.config import Config
+    from backend.services import vector_index
+
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(BASELINE_SCHEMA)
+        connection.execute(
+            "INSERT INTO users (id, name, email, password_hash, role) "
+            "VALUES ('employer', 'e', 'e@example.com', 'x', 'employer')"
+        )
+        connection.execute(
+            "INSERT INTO jobs (id, employer_id, position, company, job_location, embedding) "
+            "VALUES ('job-1', 'employer', 'Intern', 'Acme', 'Chennai', ?)",
+            (pickle.dumps([0.5, -1.25]),),
+        )
+        connection.execute(
+            "INSERT INTO users (id, name, email, password_hash, role, social_category) "
+            "VALUES ('candidate', 'c', 'c@example.com', 'x', 'applicant', 'SC')"
+        )
+        connection.execute(
+            "INSERT INTO applications (id, user_id, job_id, status) "
+            "VALUES ('application-1', 'candidate', 'job-1', 'matched')"
+        )
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{path}")
+    monkeypatch.setattr(Config, "EMBEDDING_CACHE_PATH", str(tmp_path / "embedding-cache"))
+    monkeypatch.setattr(vector_index, "_local_indexes", {})
+    return Config
+
+
+def test_migration_runs_against_a_baseline_database(baseline_db, monkeypatch):
+    from backend.extensions import db
+    from backend.models import Application, Job
+    from backend.scripts import migrate_embeddings
+    from backend.services.quota_service import quota_service
+
+    monkeypatch.setattr(sys, "argv", ["migrate_embeddings"])
+    migrate_embeddings.main()
+
+    with migrate_embeddings.create_app(migrate_embeddings.MigrationConfig).app_context():
+        columns = {column["name"] for column in inspect(db.engine).get_columns("jobs")}
+        assert {"embedding_status", "embedding_fingerprint"} <= columns
+        vector = db.session.get(Job, "job-1").embedding
+        assert vector.dtype == np.float32
+        assert vector.tolist() == [0.5, -1.25]
+        assert quota_service.current_allocations("job-1") == {"sc": 1}
+        assert db.session.get(Application, "application-1").quota_category == "sc"
+
+
+def test_app_starts_on_an_unmigrated_database(baseline_db, monkeypatch):
+    from backend.app import create_app
+
+    monkeypatch.setattr(baseline_db, "EMBEDDING_WARMUP", False)
+    app = create_app(baseline_db)
+    assert app.config["VECTOR_INDEX_PRELOAD"]
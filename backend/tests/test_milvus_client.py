@@ -0,0 +1,259 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from backend.services import milvus_client as milvus_module
+from backend.services.milvus_client import Milvus, index_settings
+from backend.services.vector_filters import VectorFilter
+
+
+class FakeHit:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.score = 0.9
+        self.entity = {"metadata": {"jobId": job_id}}
+
+
+class FakeField:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSchema:
+    fields = [FakeField(name) for name in ["id", "vector", "metadata", "state", "deadline"]]
+
+
+class FakeCollection:
+    failures = 0
+    error = ConnectionError("channel closed")
+    schema = FakeSchema()
+
+    def __init__(self, name, using=None, **kwargs):
+        self.loads = 0
+        self.upserts = []
+        self.flushes = 0
+
+    def load(self):
+        self.loads += 1
+
+    def upsert(self, columns):
+        self.upserts.append(columns)
+        return object()
+
+    def flush(self):
+        self.flushes += 1
+
+    def search(self, **kwargs):
+        if FakeCollection.failures:
+            FakeCollection.failures -= 1
+            raise FakeCollection.error
+        return [[FakeHit("job-1")]]
+
+
+class FakeConnections:
+    def __init__(self):
+        self.connects = 0
+
+    def connect(self, alias, uri, token):
+        self.connects += 1
+
+    def disconnect(self, alias):
+        pass
+
+
+class FakeUtility:
+    @staticmethod
+    def has_collection(name, using=None):
+        return True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    fake = FakeConnections()
+    monkeypatch.setattr(milvus_module, "_HAS_PYMILVUS", True)
+    monkeypatch.setattr(milvus_module, "connections", fake)
+    monkeypatch.setattr(milvus_module, "utility", FakeUtility)
+    monkeypatch.setattr(milvus_module, "Collection", FakeCollection)
+    return fake
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(MILVUS_URI="http://milvus:19530", MILVUS_COLLECTION="jobs")
+    return app
+
+
+def test_client_is_shared_and_connects_once(app, connections):
+    extension = Milvus()
+    extension.init_app(app)
+    with app.app_context():
+        assert extension.client is extension.client
+        extension.client.search([0.1, 0.2], 5)
+        extension.client.search([0.1, 0.2], 5)
+    assert connections.connects == 1
+    assert extension.client.collection.loads == 1
+
+
+def test_failed_call_reconnects_and_retries(app, connections):
+    with app.app_context():
+        client = Milvus().client
+        FakeCollection.failures = 1
+        assert client.search([0.1, 0.2], 5) == [("job-1", 0.9, {"jobId": "job-1"})]
+    assert connections.connects == 2
+
+
+class FakeRpcError(Exception):
+    def __init__(self, status):
+        self.status = status
+
+    def code(self):
+        return type("StatusCode", (), {"name": self.status})()
+
+
+@pytest.mark.parametrize(
+    "error, connects",
+    [
+        (FakeRpcError("UNAVAILABLE"), 2),
+        (FakeRpcError("INVALID_ARGUMENT"), 1),
+        (ValueError("bad filter expression"), 1),
+    ],
+)
+def test_only_connection_errors_reconnect(app, connections, monkeypatch, error, connects):
+    monkeypatch.setattr(FakeCollection, "error", error)
+    with app.app_context():
+        client = Milvus().client
+        FakeCollection.failures = 1
+        if connects == 1:
+            with pytest.raises(type(error)):
+                client.search([0.1, 0.2], 5)
+        else:
+            assert client.search([0.1, 0.2], 5)
+    assert connections.connects == connects
+
+
+def test_upsert_many_sends_one_column_major_batch_without_flush(app, connections):
+    with app.app_context():
+        client = Milvus().client
+        written = client.upsert_many(
+            ["job-1", "job-2"],
+            np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+            [{"jobId": "job-1", "state": "kerala"}, {"jobId": "job-2"}],
+        )
+    assert written == 2
+    assert client.collection.upserts == [
+        [
+            ["job-1", "job-2"],
+            [[1.0, 0.0], [0.0, 1.0]],
+            [{"jobId": "job-1", "state": "kerala"}, {"jobId": "job-2"}],
+            ["kerala", ""],
+            [0, 0],
+        ]
+    ]
+    assert client.collection.flushes == 0
+
+
+def test_filters_fall_back_to_json_paths_for_untyped_fields(app, connections, monkeypatch):
+    calls = []
+    monkeypatch.setattr(FakeCollection, "search", lambda self, **kwargs: calls.append(kwargs) or [[]])
+    with app.app_context():
+        client = Milvus().client
+        client.search([0.1, 0.2], 5, VectorFilter(states=["Kerala"], job_types=["Remote"]))
+    assert calls[0]["expr"] == 'state in ["kerala"] and metadata["job_type"] in ["remote"]'
+
+
+class FakeQueryIterator:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.closed = False
+
+    def next(self):
+        return self.pages.pop(0) if self.pages else []
+
+    def close(self):
+        self.closed = True
+
+
+def test_scan_pages_fingerprints_and_delete_by_id(app, connections, monkeypatch):
+    iterator = FakeQueryIterator(
+        [[{"id": "job-1", "metadata": {"fingerprint": "a"}}], [{"id": "job-2", "metadata": {}}]]
+    )
+    deletes = []
+    monkeypatch.setattr(FakeCollection, "query_iterator", lambda self, **kwargs: iterator, raising=False)
+    monkeypatch.setattr(FakeCollection, "delete", lambda self, expr: deletes.append(expr) or object(), raising=False)
+    with app.app_context():
+        client = Milvus().client
+        assert list(client.scan(1)) == [[("job-1", "a")], [("job-2", "")]]
+        assert client.delete(["job-1", "job-2"]) == 2
+    assert iterator.closed
+    assert deletes == ['id in ["job-1", "job-2"]']
+
+
+def test_index_settings_merge_defaults_and_validate():
+    assert index_settings({"MILVUS_INDEX_TYPE": "hnsw", "MILVUS_SEARCH_PARAMS": '{"ef": 128}'}) == (
+        "HNSW",
+        {"M": 16, "efConstruction": 200},
+        {"ef": 128},
+    )
+    with pytest.raises(ValueError, match="MILVUS_INDEX_TYPE"):
+        index_settings({"MILVUS_INDEX_TYPE": "DISKANN"})
+    with pytest.raises(ValueError, match="nprobe"):
+        index_settings({"MILVUS_INDEX_TYPE": "HNSW", "MILVUS_SEARCH_PARAMS": '{"nprobe": 8}'})
+    with pytest.raises(ValueError, match="divide"):
+        index_settings({"MILVUS_INDEX_TYPE": "IVF_PQ", "MILVUS_INDEX_PARAMS": '{"m": 10}'}, 384)
+
+
+def test_new_collection_uses_backend_dimension(app, connections, monkeypatch):
+    created = {}
+
+    class NewCollection(FakeCollection):
+        def __init__(self, name, schema=None, using=None, **kwargs):
+            super().__init__(name)
+            created["dim"] = [field for field in schema.fields if field.name == "vector"][0].dim
+
+        def create_index(self, field_name, index_params):
+            created.setdefault("indexes", {})[field_name] = index_params
+
+    monkeypatch.setattr(milvus_module.utility, "has_collection", lambda name, using=None: False)
+    monkeypatch.setattr(milvus_module, "Collection", NewCollection)
+    monkeypatch.setattr(milvus_module, "CollectionSchema", lambda fields, description: FakeSchemaOf(fields))
+    monkeypatch.setattr(milvus_module, "FieldSchema", FakeFieldSchema)
+    monkeypatch.setattr(milvus_module, "DataType", FakeDataType)
+    monkeypatch.setattr(milvus_module, "embedding_dimension", lambda: 384)
+    app.config.update(MILVUS_INDEX_TYPE="IVF_SQ8")
+    with app.app_context():
+        assert Milvus().client.collection is not None
+    assert created["dim"] == 384
+    assert created["indexes"]["vector"]["index_type"] == "IVF_SQ8"
+    assert created["indexes"]["vector"]["params"] == {"nlist": 1024}
+
+
+class FakeFieldSchema:
+    def __init__(self, name, dtype, dim=None, **kwargs):
+        self.name = name
+        self.dim = dim
+
+
+class FakeSchemaOf:
+    def __init__(self, fields):
+        self.fields = fields
+
+
+class FakeDataType:
+    VARCHAR = "varchar"
+    FLOAT_VECTOR = "float_vector"
+    JSON = "json"
+    INT64 = "int64"
+
+
+def test_check_dimension_validates_ivf_pq_against_the_backend():
+    app = Flask(__name__)
+    app.config.update(MILVUS_INDEX_TYPE="IVF_PQ", MILVUS_INDEX_PARAMS='{"m": 16}')
+    extension = Milvus()
+    extension.init_app(app)
+    extension.check_dimension(app, 384)
+    with pytest.raises(ValueError, match="divide"):
+        extension.check_dimension(app, 100)
+
+    app.config["MILVUS_DIMENSION"] = 384
+    extension.check_dimension(app, 100)
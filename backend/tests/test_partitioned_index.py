@@ -0,0 +1,91 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend.services.hnsw_index import _HAS_HNSWLIB, HnswIndex
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.partitioned_index import NATIONAL_PARTITION, PartitionedIndex
+from backend.services.vector_filters import VectorFilter
+
+
+class CountingIndex(LocalVectorIndex):
+    searches = 0
+
+    def search_many(self, vectors, limit, expr=None):
+        CountingIndex.searches += 1
+        return super().search_many(vectors, limit, expr)
+
+
+def test_upserts_route_by_state_and_move_between_partitions():
+    index = PartitionedIndex(LocalVectorIndex)
+    index.upsert("a", [1.0, 0.0], {"state": "Kerala"})
+    index.upsert("b", [0.0, 1.0], {"state": ""})
+    assert index.partitions == {"kerala": 1, NATIONAL_PARTITION: 1}
+
+    index.upsert("a", [1.0, 0.0], {"state": "goa"})
+    assert index.partitions == {"kerala": 0, NATIONAL_PARTITION: 1, "goa": 1}
+    assert index.delete(["a", "missing"]) == 1
+    assert len(index) == 1
+
+
+def test_state_filter_only_searches_named_partitions():
+    CountingIndex.searches = 0
+    index = PartitionedIndex(CountingIndex)
+    index.upsert("kerala-job", [1.0, 0.0], {"state": "kerala"})
+    index.upsert("goa-job", [1.0, 0.1], {"state": "goa"})
+    index.upsert("remote-job", [0.9, 0.2], {"state": ""})
+
+    hits = index.search([1.0, 0.0], 5, VectorFilter(states=["kerala", NATIONAL_PARTITION]))
+    assert [hit[0] for hit in hits] == ["kerala-job", "remote-job"]
+    assert CountingIndex.searches == 2
+
+    hits = index.search([1.0, 0.0], 2)
+    assert [hit[0] for hit in hits] == ["kerala-job", "goa-job"]
+
+
+@pytest.mark.skipif(not _HAS_HNSWLIB, reason="hnswlib is not installed")
+def test_hnsw_partitions_snapshot_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+
+    def factory():
+        return HnswIndex(m=4, seed=0)
+
+    index = PartitionedIndex(factory)
+    for position in range(40):
+        state = ["kerala", "goa", ""][position % 3]
+        index.upsert(f"job-{position}", rng.normal(size=6), {"state": state})
+    index.save(str(tmp_path))
+
+    reopened = PartitionedIndex(factory)
+    assert reopened.restore(str(tmp_path))
+    query = rng.normal(size=6)
+    assert reopened.search(query, 5) == index.search(query, 5)
+    assert reopened.partitions == index.partitions
+
+
+
+@pytest.mark.skipif(not _HAS_HNSWLIB, reason="hnswlib is not installed")
+def test_searches_run_while_a_partition_compacts():
+    rng = np.random.default_rng(3)
+    index = PartitionedIndex(lambda: HnswIndex(m=4, seed=0))
+    for position in range(60):
+        index.upsert(f"job-{position}", rng.normal(size=6), {"state": ["kerala", "goa"][position % 2]})
+    index.delete([f"job-{position}" for position in range(0, 20, 2)])
+
+    kerala = index._partitions["kerala"]
+    spawn = kerala._spawn
+    hits = []
+
+    def spawn_while_searching():
+        # Runs in the middle of compact(); a search must not wait for it.
+        searcher = threading.Thread(target=lambda: hits.append(index.search(rng.normal(size=6), 3)))
+        searcher.start()
+        searcher.join(timeout=5)
+        assert hits, "search blocked behind partition compaction"
+        return spawn()
+
+    kerala._spawn = spawn_while_searching
+    assert index.compact() == 10
+    assert len(hits[0]) == 3
+    assert index.tombstones == 0
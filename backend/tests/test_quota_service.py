@@ -9,6 +9,8 @@ class DummyJob:
     capacity: int = 1
     reservation_quota: dict | None = None
     state_priority: str | None = None
+    quota_targets: dict | None = None
+    quota_targets_version: str | None = None
 
 
 @dataclass
@@ -26,6 +28,21 @@ def test_reservation_targets_defaults():
     assert "sc" in targets and targets["sc"] >= 1
 
 
+def test_stored_targets_are_used_only_for_the_current_config():
+    service = QuotaService()
+    job = DummyJob(employer_id="seed", capacity=4, reservation_quota={"sc": "50%"})
+    assert service.reservation_targets(job) == {"sc": 2}
+
+    service.store_targets(job)
+    assert job.quota_targets == {"sc": 2}
+    assert job.quota_targets_version == service.config_version
+
+    job.quota_targets = {"sc": 3}
+    assert service.reservation_targets(job) == {"sc": 3}
+    job.quota_targets_version = "older-config"
+    assert service.reservation_targets(job) == {"sc": 2}
+
+
 def test_quota_bonus_prefers_open_slots():
     service = QuotaService()
     candidate = DummyUser(social_category="SC")
@@ -49,3 +66,138 @@ def test_region_bonus_uses_state_mapping():
     if bonus:
         assert "Tamil Nadu" in reason
 
+
+def test_reservation_snapshots_read_counters_in_one_query(app, make_job):
+    from sqlalchemy import event
+
+    from backend.extensions import db
+    from backend.models import Application, Job, User
+
+    with app.app_context():
+        jobs = [
+            make_job(f"job-{position}", capacity=4, reservation_quota={"sc": "25%"})
+            for position in range(3)
+        ]
+        users = [
+            User(id=f"user-{position}", name="u", email=f"u{position}@example.com",
+                 password_hash="x", social_category=category)
+            for position, category in enumerate(["SC", "sc", None])
+        ]
+        db.session.add_all(jobs + users)
+        db.session.add_all(
+            [
+                Application(user_id="user-0", job_id="job-0", status="matched"),
+                Application(user_id="user-1", job_id="job-0", status="selected"),
+                Application(user_id="user-2", job_id="job-1", status="matched"),
+                Application(user_id="user-2", job_id="job-2", status="pending"),
+            ]
+        )
+        db.session.commit()
+        service = QuotaService()
+        assert service.rebuild_counters() == 2
+        assert service.refresh_stored_targets(page_size=2) == 3
+        assert service.refresh_stored_targets() == 0
+        jobs = Job.query.order_by(Job.id).all()
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        snapshots = service.reservation_snapshots(jobs)
+        assert len(statements) == 1
+
+        assert snapshots["job-0"]["allocated"] == {"sc": 2}
+        assert snapshots["job-0"]["remaining"]["sc"] == 0
+        assert snapshots["job-1"]["allocated"] == {"general": 1}
+        assert snapshots["job-2"] == {
+            "targets": {"sc": 1},
+            "allocated": {},
+            "remaining": {"sc": 1},
+        }
+
+
+def test_status_changes_move_counters_in_the_same_transaction(app):
+    from backend.extensions import db
+    from backend.models import Application, JobQuotaCounter, User
+
+    with app.app_context():
+        service = QuotaService()
+        db.session.add_all(
+            [
+                User(id="u1", name="u", email="u1@example.com", password_hash="x", social_category="ST"),
+                User(id="u2", name="u", email="u2@example.com", password_hash="x", social_category="st"),
+            ]
+        )
+        applications = [
+            Application(id=f"a{position}", user_id=f"u{position}", job_id="job-1")
+            for position in (1, 2)
+        ]
+        db.session.add_all(applications)
+        db.session.commit()
+
+        def move(application, status):
+            previous = application.status
+            application.status = status
+            moved = service.record_status_change(application, previous)
+            db.session.commit()
+            return moved
+
+        assert move(applications[0], "matched")
+        assert move(applications[1], "selected")
+        assert not move(applications[0], "selected")
+        assert service.current_allocations("job-1") == {"st": 2}
+
+        move(applications[1], "declined")
+        previous = applications[0].status
+        applications[0].status = "pending"
+        service.record_status_change(applications[0], previous)
+        db.session.rollback()
+        assert service.current_allocations("job-1") == {"st": 1}
+
+        counts = {row.category: row.count for row in JobQuotaCounter.query}
+        service.rebuild_counters()
+        assert {row.category: row.count for row in JobQuotaCounter.query} == counts
+
+        # A drifted counter with nothing left to decrement stays at zero.
+        JobQuotaCounter.query.update({JobQuotaCounter.count: 0})
+        db.session.commit()
+        assert not move(applications[0], "declined")
+        assert [row.count for row in JobQuotaCounter.query] == [0]
+
+
+def test_unmatch_after_a_category_edit_decrements_the_counted_category(app):
+    from backend.extensions import db
+    from backend.models import Application, User
+
+    with app.app_context():
+        service = QuotaService()
+        candidate = User(id="u1", name="u", email="u1@example.com", password_hash="x", social_category="SC")
+        other = User(id="u2", name="u", email="u2@example.com", password_hash="x", social_category="ST")
+        applications = [
+            Application(id=f"a{position}", user_id=f"u{position}", job_id="job-1", status="pending")
+            for position in (1, 2)
+        ]
+        db.session.add_all([candidate, other] + applications)
+        db.session.commit()
+
+        for application in applications:
+            application.status = "matched"
+            service.record_status_change(application, "pending")
+        db.session.commit()
+        assert applications[0].quota_category == "sc"
+
+        candidate.social_category = "ST"
+        db.session.commit()
+        applications[0].status = "declined"
+        assert service.record_status_change(applications[0], "matched")
+        db.session.commit()
+
+        assert applications[0].quota_category is None
+        assert service.current_allocations("job-1") == {"st": 1}
+
+        applications[0].status = "selected"
+        service.record_status_change(applications[0], "declined")
+        db.session.commit()
+        candidate.social_category = None
+        db.session.commit()
+        assert service.rebuild_counters() == 2
+        assert service.current_allocations("job-1") == {"st": 1, "general": 1}
+        assert applications[0].quota_category == "general"
@@ -0,0 +1,73 @@
+import numpy as np
+
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.search_cache import CachedVectorIndex, SearchCache
+from backend.services.vector_filters import VectorFilter
+
+
+class CountingIndex(LocalVectorIndex):
+    def __init__(self):
+        super().__init__()
+        self.searches = 0
+
+    def search_many(self, vectors, limit, expr=None):
+        self.searches += len(vectors)
+        return super().search_many(vectors, limit, expr)
+
+
+def _cached(**kwargs):
+    index = CountingIndex()
+    index.upsert("job-1", [1.0, 0.0], {"state": "kerala"})
+    index.upsert("job-2", [0.0, 1.0], {"state": "goa"})
+    return index, CachedVectorIndex(index, SearchCache(**kwargs))
+
+
+def test_repeat_search_is_served_from_cache():
+    index, cached = _cached()
+    first = cached.search([1.0, 0.1], 1)
+    second = cached.search(np.array([1.0, 0.1]), 1)
+    assert first == second
+    assert first[0][0] == "job-1"
+    assert index.searches == 1
+    assert cached.cache.stats()["hitRate"] == 0.5
+
+
+def test_limit_and_filter_are_part_of_the_key():
+    index, cached = _cached()
+    cached.search([1.0, 0.0], 1)
+    cached.search([1.0, 0.0], 2)
+    cached.search([1.0, 0.0], 1, VectorFilter(states=["goa"]))
+    assert index.searches == 3
+
+
+def test_writes_bump_generation_and_invalidate():
+    index, cached = _cached()
+    cached.search([1.0, 0.0], 1)
+    cached.upsert("job-3", [1.0, 0.0], {"state": "goa"})
+    assert cached.cache.generation == 1
+    assert cached.search([1.0, 0.0], 1)[0][0] in {"job-1", "job-3"}
+    cached.delete(["job-3"])
+    cached.search([1.0, 0.0], 1)
+    assert index.searches == 3
+
+
+def test_search_many_only_queries_misses():
+    index, cached = _cached()
+    cached.search([1.0, 0.0], 1)
+    results = cached.search_many([[1.0, 0.0], [0.0, 1.0]], 1)
+    assert [hits[0][0] for hits in results] == ["job-1", "job-2"]
+    assert index.searches == 2
+
+
+def test_entries_expire_and_are_bounded():
+    index, cached = _cached(max_entries=1, ttl=0)
+    cached.search([1.0, 0.0], 1)
+    cached.search([1.0, 0.0], 1)
+    assert index.searches == 2
+
+    index, cached = _cached(max_entries=1, ttl=60)
+    cached.search([1.0, 0.0], 1)
+    cached.search([0.0, 1.0], 1)
+    cached.search([1.0, 0.0], 1)
+    assert index.searches == 3
+    assert cached.cache.stats()["entries"] == 1
@@ -0,0 +1,42 @@
+import numpy as np
+from flask import Flask
+
+from backend.services.embedding_service import encode_documents, encode_texts
+from backend.services.text_chunker import chunk_text
+
+
+def test_chunks_respect_token_budget_and_overlap():
+    text = " ".join(f"w{index}" for index in range(10))
+    chunks = chunk_text(text, max_tokens=4, overlap=1, source_id="L1")
+    assert [chunk.text for chunk in chunks] == [
+        "w0 w1 w2 w3",
+        "w3 w4 w5 w6",
+        "w6 w7 w8 w9",
+    ]
+    assert [chunk.chunk_id for chunk in chunks] == ["L1-0", "L1-1", "L1-2"]
+    assert all(chunk.tokens_estimate <= 4 for chunk in chunks)
+
+
+def test_document_cap_and_sanitizing():
+    chunks = chunk_text("<p>alpha   beta</p> gamma delta", max_tokens=10, max_document_tokens=3)
+    assert [chunk.text for chunk in chunks] == ["alpha beta gamma"]
+    assert chunk_text("   ", max_tokens=4) == []
+
+
+def test_encode_documents_pools_chunk_vectors():
+    app = Flask(__name__)
+    app.config.update(
+        EMBEDDING_BACKEND="hashing",
+        EMBEDDING_HASH_DIM=32,
+        EMBEDDING_CHUNK_TOKENS=2,
+        EMBEDDING_CHUNK_OVERLAP=0,
+    )
+    with app.app_context():
+        pooled = encode_documents(["python sql react java", "", "go"])
+        chunks = encode_texts(["python sql", "react java"])
+    expected = chunks.mean(axis=0)
+    expected /= np.linalg.norm(expected)
+    assert pooled.shape == (3, 32)
+    assert np.allclose(pooled[0], expected)
+    assert not pooled[1].any()
+    assert np.isclose(np.linalg.norm(pooled[2]), 1.0)
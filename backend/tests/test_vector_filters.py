@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.extensions import db
+from backend.models import Application, Job, User
+from backend.services.hnsw_index import _HAS_HNSWLIB, HnswIndex
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.quota_service import quota_service
+from backend.services.vector_filters import VectorFilter, epoch, job_state, job_vector_metadata_many
+
+
+def test_to_expr_renders_typed_fields():
+    filters = VectorFilter(states=["Kerala"], city="Kochi", open_at=100, has_capacity=True)
+    assert filters.to_expr() == (
+        'state in ["kerala"] and city == "kochi" '
+        "and (deadline == 0 or deadline >= 100) and capacity_open > 0"
+    )
+    assert not VectorFilter()
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        LocalVectorIndex,
+        pytest.param(
+            lambda: HnswIndex(m=4, seed=3),
+            marks=pytest.mark.skipif(not _HAS_HNSWLIB, reason="hnswlib is not installed"),
+        ),
+    ],
+)
+def test_local_indexes_only_return_matching_rows(factory):
+    index = factory()
+    rng = np.random.default_rng(5)
+    for position in range(60):
+        state = "kerala" if position % 3 == 0 else "goa"
+        index.upsert(f"job-{position}", rng.normal(size=8), {"state": state, "deadline": 0})
+    hits = index.search(rng.normal(size=8), 5, VectorFilter(states=["Kerala"]))
+    assert len(hits) == 5
+    assert all(hit[2]["state"] == "kerala" for hit in hits)
+    with pytest.raises(ValueError):
+        index.search(rng.normal(size=8), 5, 'state == "kerala"')
+
+
+def test_metadata_and_sql_filter_agree(app, make_job):
+    now = datetime.utcnow()
+    with app.app_context():
+        kerala = dict(job_location="Kochi, Kerala", capacity=1)
+        jobs = [
+            make_job("open", **kerala),
+            make_job("expired", application_deadline=now - timedelta(days=1), **kerala),
+            make_job("full", **kerala),
+            make_job("elsewhere", job_location="Pune", state_priority="Maharashtra", capacity=1),
+        ]
+        db.session.add_all(jobs)
+        db.session.add(User(id="u1", name="u", email="u1@example.com", password_hash="x"))
+        db.session.add(Application(user_id="u1", job_id="full", status="selected"))
+        db.session.commit()
+        quota_service.rebuild_counters()
+
+        filters = VectorFilter(states=["kerala"], open_at=epoch(now), has_capacity=True)
+        by_metadata = {
+            row["jobId"] for row in job_vector_metadata_many(jobs) if filters.matches(row)
+        }
+        by_sql = {job.id for job in filters.apply(Job.query).all()}
+        assert by_metadata == by_sql == {"open"}
+
+
+def test_job_state_ignores_a_trailing_country(make_job):
+    assert job_state(make_job(job_location="Kochi, Kerala")) == "kerala"
+    assert job_state(make_job(job_location="Bangalore, India")) == ""
+    assert job_state(make_job(job_location="Bangalore, India", state_priority="Karnataka")) == "karnataka"
+    assert job_state(make_job(job_location="Chennai")) == ""
@@ -0,0 +1,51 @@
+import numpy as np
+
+from backend.extensions import db
+from backend.services.local_vector_index import LocalVectorIndex
+from backend.services.vector_reconcile import reconcile
+
+
+def test_reconcile_repairs_only_the_difference(app, make_job):
+    def embedded(job_id, vector, fingerprint, status="pending"):
+        return make_job(
+            job_id,
+            embedding=np.array(vector, dtype=np.float32),
+            embedding_fingerprint=fingerprint,
+            status=status,
+        )
+
+    with app.app_context():
+        db.session.add_all(
+            [
+                embedded("in-sync", [1.0, 0.0], "fp-1"),
+                embedded("stale", [0.0, 1.0], "fp-2-new"),
+                embedded("missing", [1.0, 1.0], "fp-3"),
+                embedded("closed", [1.0, 0.5], "fp-4", status="declined"),
+            ]
+        )
+        db.session.commit()
+
+        index = LocalVectorIndex()
+        index.upsert("in-sync", [1.0, 0.0], {"fingerprint": "fp-1", "marker": True})
+        index.upsert("stale", [1.0, 0.0], {"fingerprint": "fp-2-old"})
+        index.upsert("orphan", [0.5, 0.5], {"fingerprint": "fp-9"})
+        index.upsert("closed", [1.0, 0.5], {"fingerprint": "fp-4"})
+        stages = []
+
+        report = reconcile(
+            index, page_size=2, repair=False, progress=lambda stage, count: stages.append(stage)
+        )
+        assert (report.database, report.indexed) == (3, 4)
+        assert (report.missing, report.stale, report.orphaned) == (1, 1, 2)
+        assert report.upserted == report.deleted == 0
+        assert {"database", "index"} <= set(stages)
+
+        report = reconcile(index, page_size=2)
+        assert (report.upserted, report.deleted) == (2, 2)
+        assert sorted(index._positions) == ["in-sync", "missing", "stale"]
+        # Rows already in sync are left alone.
+        assert index._metadata[index._positions["in-sync"]]["marker"] is True
+        assert index.search([0.0, 1.0], 1)[0][0] == "stale"
+
+        report = reconcile(index)
+        assert (report.missing, report.stale, report.orphaned) == (0, 0, 0)
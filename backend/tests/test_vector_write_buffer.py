@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+import pytest
+
+from backend.services.vector_index import VectorWriteBuffer
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.batches = []
+        self.deletes = []
+        self.compactions = 0
+
+    def upsert_many(self, ids, vectors, metadata):
+        self.batches.append((list(ids), vectors, list(metadata)))
+        return len(ids)
+
+    def delete(self, ids):
+        self.deletes.append(list(ids))
+        return len(ids)
+
+    def maybe_compact(self):
+        self.compactions += 1
+        return 0
+
+
+def test_buffer_sends_column_major_batches_by_size_and_on_close():
+    index = RecordingIndex()
+    with VectorWriteBuffer(index, max_rows=2, max_delay=0) as buffer:
+        for position in range(5):
+            buffer.add(f"job-{position}", np.full(3, position, dtype=np.float32), {"n": position})
+        assert [batch[0] for batch in index.batches] == [["job-0", "job-1"], ["job-2", "job-3"]]
+
+    assert index.batches[-1][0] == ["job-4"]
+    assert index.batches[0][1].shape == (2, 3)
+    assert index.batches[0][2] == [{"n": 0}, {"n": 1}]
+
+
+def test_buffer_keeps_latest_row_per_id():
+    index = RecordingIndex()
+    buffer = VectorWriteBuffer(index, max_rows=10, max_delay=0)
+    buffer.add("job-1", [1.0, 0.0], {"v": 1})
+    buffer.add("job-1", [0.0, 1.0], {"v": 2})
+    assert buffer.flush() == 1
+    ids, vectors, metadata = index.batches[0]
+    assert ids == ["job-1"]
+    assert vectors.tolist() == [[0.0, 1.0]]
+    assert metadata == [{"v": 2}]
+
+
+def test_removals_are_batched_and_cancel_buffered_rows():
+    index = RecordingIndex()
+    buffer = VectorWriteBuffer(index, max_rows=10, max_delay=0)
+    buffer.add("job-1", [1.0, 0.0], {})
+    buffer.add("job-2", [0.0, 1.0], {})
+    buffer.remove("job-1")
+    buffer.remove("job-3")
+    buffer.remove("job-2")
+    buffer.add("job-3", [1.0, 1.0], {})
+    assert len(buffer) == 3
+    assert buffer.flush() == 3
+    assert [batch[0] for batch in index.batches] == [["job-3"]]
+    assert index.deletes == [["job-1", "job-2"]]
+    assert index.compactions == 1
+
+
+def test_buffer_flushes_after_max_delay():
+    index = RecordingIndex()
+    buffer = VectorWriteBuffer(index, max_rows=100, max_delay=0.05)
+    buffer.add("job-1", [1.0, 0.0], {})
+    deadline = time.monotonic() + 2
+    while not index.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.batches[0][0] == ["job-1"]
+    assert len(buffer) == 0
+
+
+class FlakyIndex(RecordingIndex):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def upsert_many(self, ids, vectors, metadata):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("index unavailable")
+        return super().upsert_many(ids, vectors, metadata)
+
+
+def test_failed_batch_is_rebuffered_unless_a_newer_row_arrived():
+    index = FlakyIndex(failures=1)
+    buffer = VectorWriteBuffer(index, max_rows=10, max_delay=0, retry_delay=60)
+    buffer.add("job-1", [1.0, 0.0], {"v": 1})
+    buffer.add("job-2", [0.0, 1.0], {"v": 1})
+    buffer.remove("job-3")
+    upsert_many = index.upsert_many
+
+    def newer_row_arrives(ids, vectors, metadata):
+        # Written while the failing batch is outside the buffer lock.
+        buffer.add("job-2", [1.0, 1.0], {"v": 2})
+        return upsert_many(ids, vectors, metadata)
+
+    index.upsert_many = newer_row_arrives
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert buffer._timer is not None
+    assert len(buffer) == 3
+
+    index.upsert_many = upsert_many
+    assert buffer.flush() == 3
+    ids, vectors, metadata = index.batches[0]
+    assert sorted(zip(ids, metadata), key=lambda row: row[0]) == [
+        ("job-1", {"v": 1}),
+        ("job-2", {"v": 2}),
+    ]
+    assert index.deletes == [["job-3"]]
+    assert buffer._timer is None
+
+
+def test_retries_back_off_until_the_write_succeeds():
+    index = FlakyIndex(failures=2)
+    buffer = VectorWriteBuffer(index, max_rows=1, max_delay=0, retry_delay=0.01)
+    with pytest.raises(ConnectionError):
+        buffer.add("job-1", [1.0, 0.0], {})
+    # Full buffers wait for the scheduled retry instead of writing again.
+    buffer.add("job-2", [0.0, 1.0], {})
+    deadline = time.monotonic() + 2
+    while not index.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(index.batches[0][0]) == ["job-1", "job-2"]
+    assert len(buffer) == 0